@@ -15,6 +15,8 @@ import os
 import sqlite3
 import sys
 
+import scriptloader
+
 SIMILARITIES = [
     'ATC',
     'CHEMICAL',
@@ -25,6 +27,19 @@ SIMILARITIES = [
     'SIDEEFFECT',
 ]
 
+# The sample standard deviation of a column over each group is computed in SQL
+# (so SQLite does not have to call back into Python for every row, like it does for StdevFunc).
+# It is the same as StdevFunc: NULL if there are fewer than two (non-NULL) values.
+# It takes two passes, so large, nearly equal values do not cancel out:
+# AGGREGATE_QUERY selects from a subquery that adds the mean of each row's group (GROUP_MEAN_SQL),
+# and then sums the squared deviations from it.
+STDEV_SQL = '''CASE
+            WHEN COUNT(S.{0}) < 2 THEN NULL
+            ELSE SQRT(SUM((S.{0} - S.{0}_group_mean) * (S.{0} - S.{0}_group_mean)) / (COUNT(S.{0}) - 1))
+        END AS {0}_std'''
+
+GROUP_MEAN_SQL = "AVG(S.{0}) OVER GroupWindow AS {0}_group_mean"
+
 # Get the "baseline" (non-collective) rows.
 BASELINE_QUERY = '''
     SELECT *
@@ -41,12 +56,26 @@ AGGREGATE_QUERY = '''
         S.search_type,
         COUNT(*) AS aggregate_count,
         ''' + ', '.join(["AVG(S.%s_query_time) AS %s_query_time_mean" % (sim, sim) for sim in SIMILARITIES]) + ''',
-        ''' + ', '.join(["STDEV(S.%s_query_time) AS %s_query_time_std" % (sim, sim) for sim in SIMILARITIES]) + ''',
+        ''' + ', '.join([STDEV_SQL.format("%s_query_time" % (sim)) for sim in SIMILARITIES]) + ''',
         ''' + ', '.join(["AVG(S.%s_num_results) AS %s_num_results_mean" % (sim, sim) for sim in SIMILARITIES]) + ''',
-        ''' + ', '.join(["STDEV(S.%s_num_results) AS %s_num_results_std" % (sim, sim) for sim in SIMILARITIES]) + '''
+        ''' + ', '.join([STDEV_SQL.format("%s_num_results" % (sim)) for sim in SIMILARITIES]) + '''
     FROM
         (
-            ''' + BASELINE_QUERY + '''
+            SELECT
+                S.*,
+                ''' + ', '.join([GROUP_MEAN_SQL.format("%s_%s" % (sim, column)) for sim in SIMILARITIES for column in ['query_time', 'num_results']]) + '''
+            FROM
+                (
+                    ''' + BASELINE_QUERY + '''
+                ) S
+            WINDOW GroupWindow AS (
+                PARTITION BY
+                    S.example,
+                    S.collective,
+                    S.candidate_count,
+                    S.search_budget,
+                    S.search_type
+            )
         ) S
     GROUP BY
         S.example,
@@ -222,6 +251,7 @@ def main(mode, resultsPath):
 
     connection = sqlite3.connect(":memory:")
     connection.create_aggregate("STDEV", 1, StdevFunc)
+    scriptloader.loadScript('analyze-results').addSqrt(connection)
 
     connection.execute("CREATE TABLE Stats(%s)" % (', '.join(columnDefs)))
 
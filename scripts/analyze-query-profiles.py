@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+'''
+Rank the grounding queries.
+The input to this script should be the output from parse-query-profiles.py, ex:
+```
+./scripts/parse-query-profiles.py --output queries.txt --sql sql.txt
+./scripts/analyze-query-profiles.py queries.txt SQL
+```
+The SQL of a hash can then be looked up in sql.txt.
+'''
+
+import os
+import sqlite3
+import sys
+
+import scriptloader
+
+# Every query of every run.
+BASE_QUERY = '''
+    SELECT *
+    FROM Queries
+'''
+
+# The slowest queries of every run.
+QUERIES_QUERY = '''
+    SELECT *
+    FROM Queries
+    ORDER BY
+        query_time DESC,
+        example,
+        iteration,
+        split,
+        query_index
+'''
+
+# Aggregate each distinct query (SQL) over all the runs it was in.
+# The standard deviation is computed in two passes, like the analyzers do (see MEAN_STDEV_SQL in analyze-results.py).
+SQL_QUERY = '''
+    SELECT
+        Q.example,
+        Q.collective,
+        Q.sql_hash,
+        COUNT(*) AS aggregate_count,
+        SUM(Q.query_time) AS query_time_total,
+        AVG(Q.query_time) AS query_time_mean,
+        CASE
+            WHEN COUNT(Q.query_time) < 2 THEN NULL
+            ELSE SQRT(SUM((Q.query_time - Q.query_time_group_mean) * (Q.query_time - Q.query_time_group_mean)) / (COUNT(Q.query_time) - 1))
+        END AS query_time_std,
+        MAX(Q.query_time) AS query_time_max,
+        AVG(Q.num_rules) AS num_rules_mean,
+        AVG(Q.num_query_results) AS num_query_results_mean,
+        AVG(Q.num_ground_rules) AS num_ground_rules_mean
+    FROM
+        (
+            SELECT
+                Q.*,
+                AVG(Q.query_time) OVER GroupWindow AS query_time_group_mean
+            FROM Queries Q
+            WINDOW GroupWindow AS (
+                PARTITION BY
+                    Q.example,
+                    Q.collective,
+                    Q.sql_hash
+            )
+        ) Q
+    GROUP BY
+        Q.example,
+        Q.collective,
+        Q.sql_hash
+    ORDER BY
+        query_time_total DESC,
+        Q.example,
+        Q.collective,
+        Q.sql_hash
+'''
+
+# How the query time of each example is spread over its queries.
+EXAMPLE_QUERY = '''
+    SELECT
+        S.example,
+        S.collective,
+        COUNT(*) AS num_distinct_queries,
+        SUM(S.aggregate_count) AS num_queries,
+        SUM(S.query_time_total) AS query_time_total,
+        MAX(S.query_time_total) AS top_query_time_total,
+        MAX(S.query_time_total) / CAST(SUM(S.query_time_total) AS FLOAT) AS top_query_time_proportion
+    FROM
+        (
+            ''' + SQL_QUERY + '''
+        ) S
+    GROUP BY
+        S.example,
+        S.collective
+    ORDER BY
+        S.example,
+        S.collective
+'''
+
+BOOL_COLUMNS = {
+    'collective',
+}
+
+INT_COLUMNS = {
+    'iteration',
+    'candidate_count',
+    'search_budget',
+    'query_index',
+    'num_rules',
+    'query_time',
+    'num_query_results',
+    'num_ground_rules',
+}
+
+FLOAT_COLUMNS = {
+}
+
+# {key: (query, description), ...}
+RUN_MODES = {
+    'BASE': (
+        BASE_QUERY,
+        'Just get the base query profiles.',
+    ),
+    'QUERIES': (
+        QUERIES_QUERY,
+        'Every query of every run, slowest first.',
+    ),
+    'SQL': (
+        SQL_QUERY,
+        'Aggregate each distinct query (by SQL hash) over all runs, most total time first.',
+    ),
+    'EXAMPLE': (
+        EXAMPLE_QUERY,
+        'Per example, how much of the query time goes to its most expensive query.',
+    ),
+}
+
+# ([header, ...], [[value, ...], ...])
+def fetchResults(path):
+    rows = []
+    header = None
+
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip("\n ")
+            if (line == ''):
+                continue
+
+            row = line.split("\t")
+
+            # Get the header first.
+            if (header is None):
+                header = row
+                continue
+
+            assert(len(header) == len(row))
+
+            for i in range(len(row)):
+                if (row[i] == ''):
+                    row[i] = None
+                elif (header[i] in BOOL_COLUMNS):
+                    row[i] = (row[i].upper() == 'TRUE')
+                elif (header[i] in INT_COLUMNS):
+                    row[i] = int(row[i])
+                elif (header[i] in FLOAT_COLUMNS):
+                    row[i] = float(row[i])
+
+            rows.append(row)
+
+    return header, rows
+
+def main(mode, resultsPath):
+    columns, data = fetchResults(resultsPath)
+    if (len(data) == 0):
+        return
+
+    quotedColumns = ["'%s'" % column for column in columns]
+
+    columnDefs = []
+    for i in range(len(columns)):
+        column = columns[i]
+        quotedColumn = quotedColumns[i]
+
+        if (column in BOOL_COLUMNS):
+            columnDefs.append("%s INTEGER" % (quotedColumn))
+        elif (column in INT_COLUMNS):
+            columnDefs.append("%s INTEGER" % (quotedColumn))
+        elif (column in FLOAT_COLUMNS):
+            columnDefs.append("%s FLOAT" % (quotedColumn))
+        else:
+            columnDefs.append("%s TEXT" % (quotedColumn))
+
+    connection = sqlite3.connect(":memory:")
+    scriptloader.loadScript('analyze-results').addSqrt(connection)
+
+    connection.execute("CREATE TABLE Queries(%s)" % (', '.join(columnDefs)))
+
+    connection.executemany("INSERT INTO Queries(%s) VALUES (%s)" % (', '.join(columns), ', '.join(['?'] * len(columns))), data)
+
+    query = RUN_MODES[mode][0]
+    rows = connection.execute(query)
+
+    print("\t".join([column[0] for column in rows.description]))
+    for row in rows:
+        print("\t".join(map(str, row)))
+
+    connection.close()
+
+def _load_args(args):
+    executable = args.pop(0)
+    if (len(args) != 2 or ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args})):
+        print("USAGE: python3 %s <query profiles path> <mode>" % (executable), file = sys.stderr)
+        print("modes:", file = sys.stderr)
+        for (key, (query, description)) in RUN_MODES.items():
+            print("    %s - %s" % (key, description), file = sys.stderr)
+        sys.exit(1)
+
+    resultsPath = args.pop(0)
+    if (not os.path.isfile(resultsPath)):
+        raise ValueError("Can't find the specified query profiles path: " + resultsPath)
+
+    mode = args.pop(0).upper()
+    if (mode not in RUN_MODES):
+        raise ValueError("Unknown mode: '%s'." % (mode))
+
+    return mode, resultsPath
+
+if (__name__ == '__main__'):
+    main(*_load_args(sys.argv))
@@ -0,0 +1,1446 @@
+#!/usr/bin/env python3
+
+'''
+Analyze the results.
+The input to this script should be the output from parse-results.py, ex:
+```
+./scripts/parse-results.py > results.txt
+./scripts/analyze-results.py --validation iteration results.txt AGGREGATE
+```
+
+The runs used for hyperparameter selection (the validation runs) are chosen by a validation strategy (see VALIDATION_STRATEGIES).
+analyze-results-by-split.py and analyze-results-by-iteration.py are shortcuts for the two strategies.
+The results are only loaded once, so several modes can be run in one invocation.
+'''
+
+import math
+import multiprocessing.pool
+import os
+import sqlite3
+import sys
+import tempfile
+import urllib.request
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The mean and sample standard deviation of a column over each group are computed in SQL
+# (so SQLite does not have to call back into Python for every row, like it does for StdevFunc).
+# The standard deviation is the same as StdevFunc: NULL if there are fewer than two (non-NULL) values.
+# It takes two passes, so large, nearly equal values do not cancel out (like they do in SUM(x * x) - SUM(x) * AVG(x)):
+# an aggregating query selects from a subquery that adds the mean of each row's group
+# (a window over the GROUP BY columns, named GroupWindow), and then sums the squared deviations from it.
+MEAN_STDEV_SQL = '''
+        AVG(S.{0}) AS {0}_mean,
+        CASE
+            WHEN COUNT(S.{0}) < 2 THEN NULL
+            ELSE SQRT(SUM((S.{0} - S.{0}_group_mean) * (S.{0} - S.{0}_group_mean)) / (COUNT(S.{0}) - 1))
+        END AS {0}_std'''
+
+GROUP_MEAN_SQL = '''
+                AVG(S.{0}) OVER GroupWindow AS {0}_group_mean'''
+
+# The SELECT columns for the mean and standard deviation of each column.
+def getMeanStdevColumns(columns):
+    return ','.join([MEAN_STDEV_SQL.format(column) for column in columns])
+
+# The columns the source of an aggregating query adds for getMeanStdevColumns().
+def getGroupMeanColumns(columns):
+    return ','.join([GROUP_MEAN_SQL.format(column) for column in columns])
+
+# The columns that are aggregated (see MEAN_STDEV_SQL).
+STAT_COLUMNS = [
+    'runtime',
+    'runtime_proportional',
+    'memory',
+    'memory_proportional',
+]
+
+# The timing and count columns (only used by strategies with timing_columns).
+TIMING_COLUMNS = [
+    'search_time',
+    'query_time',
+    'grounding_time',
+]
+
+COUNT_COLUMNS = [
+    'num_rules',
+    'num_queries',
+    'num_query_results',
+    'num_ground_rules',
+]
+
+# Get the "baseline" (non-collective) rows.
+BASELINE_QUERY = '''
+    SELECT *
+    FROM Stats
+    WHERE collective = FALSE
+'''
+
+# Compare runs against their relevant baseline (non-collective) run.
+PROPORTIONAL_QUERY = '''
+    SELECT
+        S.example,
+        S.iteration,
+        S.split,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type,
+        S.runtime,
+        S.runtime / CAST(B.runtime AS FLOAT) AS runtime_proportional,
+        S.memory,
+        S.memory / CAST(B.memory AS FLOAT) AS memory_proportional,{proportional_timing_columns}
+        S.num_rules,
+        S.num_queries,
+        S.num_query_results,
+        S.num_ground_rules,{proportional_resource_columns}
+    FROM
+        Stats S
+        JOIN (
+            ''' + BASELINE_QUERY + '''
+        ) B ON
+            S.example = B.example
+            AND S.iteration = B.iteration
+            AND S.split = B.split
+    ORDER BY
+        S.example,
+        S.iteration,
+        S.split,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+'''
+
+# Aggregate over splits and iterations.
+AGGREGATE_QUERY = '''
+    SELECT
+        S.example,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type,
+        COUNT(*) AS aggregate_count,''' + getMeanStdevColumns(STAT_COLUMNS) + '''{aggregate_timing_columns},{aggregate_resource_columns}
+    FROM
+        (
+            SELECT
+                S.*,''' + getGroupMeanColumns(STAT_COLUMNS) + '''{aggregate_timing_means},{aggregate_resource_means}
+            FROM ProportionalStage S
+            WINDOW GroupWindow AS (
+                PARTITION BY
+                    S.example,
+                    S.collective,
+                    S.candidate_count,
+                    S.search_budget,
+                    S.search_type
+            )
+        ) S
+    GROUP BY
+        S.example,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+    ORDER BY
+        S.example,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+'''
+
+# Aggregate over iterations/splits, and pull out the best hyperparam collection per example.
+AGGREGATE_RANK_QUERY = '''
+    SELECT
+        A.example,
+        ROW_NUMBER() OVER ExampleWindow AS example_rank,
+        A.collective,
+        A.candidate_count,
+        A.search_budget,
+        A.search_type,
+        A.aggregate_count,
+        A.runtime_mean,
+        A.runtime_std,
+        A.runtime_proportional_mean,
+        A.runtime_proportional_std,
+        A.memory_mean,
+        A.memory_std,
+        A.memory_proportional_mean,
+        A.memory_proportional_std
+    FROM
+        (
+            ''' + AGGREGATE_QUERY + '''
+        ) A
+    WHERE A.collective = TRUE
+    WINDOW ExampleWindow AS (
+        PARTITION BY A.example
+        ORDER BY A.runtime_proportional_mean ASC
+    )
+    ORDER BY
+        ROW_NUMBER() OVER ExampleWindow,
+        A.example,
+        A.collective,
+        A.candidate_count,
+        A.search_budget,
+        A.search_type
+'''
+
+# Like the previous query, but also aggregate over examples.
+# Only report proportional numbers (since flat ones don't make sense across examples).
+EXAMPLE_AGGREGATE_QUERY = '''
+    SELECT
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type,
+        COUNT(*) AS aggregate_count,''' + getMeanStdevColumns(['runtime_proportional', 'memory_proportional']) + '''
+    FROM
+        (
+            SELECT
+                S.*,''' + getGroupMeanColumns(['runtime_proportional', 'memory_proportional']) + '''
+            FROM ProportionalStage S
+            WINDOW GroupWindow AS (
+                PARTITION BY
+                    S.collective,
+                    S.candidate_count,
+                    S.search_budget,
+                    S.search_type
+            )
+        ) S
+    GROUP BY
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+    ORDER BY
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+'''
+
+# Find the validation splits for each example (the first split in each example).
+VALIDATION_SPLITS_QUERY = '''
+    SELECT DISTINCT
+        example,
+        split
+    FROM
+        (
+            SELECT
+                S.example,
+                S.split,
+                ROW_NUMBER() OVER SplitWindow AS rank
+            FROM Stats S
+            WINDOW SplitWindow AS (
+                PARTITION BY S.example
+                ORDER BY S.split ASC
+            )
+        ) S
+    WHERE S.rank = 1
+'''
+
+# For the validation runs, aggregate over iterations, and rank the hyperparams.
+VALIDATION_AGGREGATEION_RANK_QUERY = '''
+    SELECT
+        S.example,
+        ROW_NUMBER() OVER ExampleWindow AS example_rank,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type,
+        COUNT(*) AS aggregate_count,''' + getMeanStdevColumns(STAT_COLUMNS) + '''
+    FROM
+        (
+            SELECT
+                S.*,''' + getGroupMeanColumns(STAT_COLUMNS) + '''
+            FROM ProportionalStage S
+            WHERE
+                S.collective = TRUE
+                AND {validation_condition}
+            WINDOW GroupWindow AS (
+                PARTITION BY
+                    S.example,
+                    S.collective,
+                    S.candidate_count,
+                    S.search_budget,
+                    S.search_type
+            )
+        ) S
+    GROUP BY
+        S.example,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+    WINDOW ExampleWindow AS (
+        PARTITION BY S.example
+        ORDER BY AVG(S.runtime_proportional) ASC
+    )
+    ORDER BY
+        ROW_NUMBER() OVER ExampleWindow,
+        S.example,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+'''
+
+# For the validation runs, aggregate over iterations / example, and rank the hyperparams.
+VALIDATION_AGGREGATEION_EXAMPLE_RANK_QUERY = '''
+    SELECT
+        ROW_NUMBER() OVER ParamWindow AS rank,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type,
+        COUNT(*) AS aggregate_count,''' + getMeanStdevColumns(STAT_COLUMNS) + '''
+    FROM
+        (
+            SELECT
+                S.*,''' + getGroupMeanColumns(STAT_COLUMNS) + '''
+            FROM ProportionalStage S
+            WHERE
+                S.collective = TRUE
+                AND {validation_condition}
+            WINDOW GroupWindow AS (
+                PARTITION BY
+                    S.collective,
+                    S.candidate_count,
+                    S.search_budget,
+                    S.search_type
+            )
+        ) S
+    GROUP BY
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+    WINDOW ParamWindow AS (
+        ORDER BY AVG(S.runtime_proportional) ASC
+    )
+    ORDER BY
+        ROW_NUMBER() OVER ParamWindow,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+'''
+
+# Aggregate over iterations / splits, but ignore the validation runs.
+NO_VALIDATION_AGGREGATEION_QUERY = '''
+    SELECT
+        S.example,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type,
+        COUNT(*) AS aggregate_count,''' + getMeanStdevColumns(STAT_COLUMNS) + ''',{no_validation_timing_columns}
+        AVG(S.num_rules) AS num_rules,
+        AVG(S.num_queries) AS num_queries_mean,
+        AVG(S.num_query_results) AS num_query_results_mean,
+        AVG(S.num_ground_rules) AS num_ground_rules_mean,{aggregate_resource_columns}
+    FROM
+        (
+            SELECT
+                S.*,''' + getGroupMeanColumns(STAT_COLUMNS) + '''{no_validation_timing_means},{aggregate_resource_means}
+            FROM ProportionalStage S
+            WHERE {test_condition}
+            WINDOW GroupWindow AS (
+                PARTITION BY
+                    S.example,
+                    S.collective,
+                    S.candidate_count,
+                    S.search_budget,
+                    S.search_type
+            )
+        ) S
+    GROUP BY
+        S.example,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+    ORDER BY
+        S.example,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+'''
+
+# Get the best set of hyperparams (for collective runs).
+# "Best" is determined by best overall and best per-example (using the validation set).
+BEST_HYPERPARAMS = '''
+    SELECT
+        'example' as param_type,
+        R.example,
+        R.candidate_count,
+        R.search_budget,
+        R.search_type
+    FROM
+        (
+            ''' + VALIDATION_AGGREGATEION_RANK_QUERY + '''
+        ) R
+    WHERE
+        R.collective = TRUE
+        AND R.example_rank = 1
+
+    UNION ALL
+
+    SELECT
+        'overall' as param_type,
+        NULL AS example,
+        R.candidate_count,
+        R.search_budget,
+        R.search_type
+    FROM
+        (
+            ''' + VALIDATION_AGGREGATEION_EXAMPLE_RANK_QUERY + '''
+        ) R
+    WHERE
+        R.collective = TRUE
+        AND R.rank = 1
+'''
+
+# Use the results from NO_VALIDATION_AGGREGATEION_QUERY, and choose the rows using the best hyperparams (BEST_HYPERPARAMS).
+BEST_RUNS_QUERY = '''
+    SELECT
+        H.param_type,
+        A.*
+    FROM
+        (
+            ''' + NO_VALIDATION_AGGREGATEION_QUERY + '''
+        ) A
+        JOIN (
+            ''' + BEST_HYPERPARAMS + '''
+
+            UNION ALL
+
+            SELECT
+                'baseline' as param_type,
+                NULL AS example,
+                NULL AS candidate_count,
+                NULL AS search_budget,
+                NULL AS search_type
+        ) H ON
+            (
+                H.param_type = 'baseline'
+                AND A.collective = FALSE
+            ) OR (
+                H.param_type = 'example'
+                AND H.example = A.example
+                AND H.candidate_count = A.candidate_count
+                AND H.search_budget = A.search_budget
+                AND H.search_type = A.search_type
+            ) OR (
+                H.param_type = 'overall'
+                AND H.candidate_count = A.candidate_count
+                AND H.search_budget = A.search_budget
+                AND H.search_type = A.search_type
+            )
+    ORDER BY
+        A.example,
+        H.param_type
+'''
+
+BEST_SUMMARY_QUERY = '''
+    SELECT
+        B.example AS 'Dataset',
+
+        CAST(CAST(B.runtime_mean AS INT) AS TEXT)
+            || ' ± '
+            || CAST(CAST(B.runtime_std AS INT) AS TEXT)
+            AS 'Absolute Standard Grounding',
+        CAST(CAST(E.runtime_mean AS INT) AS TEXT)
+            || ' ± '
+            || CAST(CAST(E.runtime_std AS INT) AS TEXT)
+            AS 'Absolute Collective Grounding (Per-Dataset Hyperparameters)',
+        CAST(CAST(O.runtime_mean AS INT) AS TEXT)
+            || ' ± '
+            || CAST(CAST(O.runtime_std AS INT) AS TEXT)
+            AS 'Absolute Collective Grounding (Overall Hyperparameters)',
+
+        CAST(ROUND(B.runtime_proportional_mean, 2) AS TEXT)
+            || ' ± '
+            || CAST(ROUND(B.runtime_proportional_std, 2) AS TEXT)
+            AS 'Percentage Standard Grounding',
+        CAST(ROUND(E.runtime_proportional_mean, 2) AS TEXT)
+            || ' ± '
+            || CAST(ROUND(E.runtime_proportional_std, 2) AS TEXT)
+            AS 'Percentage Collective Grounding (Per-Dataset Hyperparameters)',
+        CAST(ROUND(O.runtime_proportional_mean, 2) AS TEXT)
+            || ' ± '
+            || CAST(ROUND(O.runtime_proportional_std, 2) AS TEXT)
+            AS 'Percentage Collective Grounding (Overall Hyperparameters)'
+    FROM
+        BestRunsStage B
+        JOIN BestRunsStage E ON E.example = B.example
+        JOIN BestRunsStage O ON O.example = B.example
+    WHERE
+        B.param_type = 'baseline'
+        AND E.param_type = 'example'
+        AND O.param_type = 'overall'
+'''
+
+# Get all the unaggregated data for the best runs (so it can be taken elsewhere for significance testing).
+BEST_RUNS_RECORDS_QUERY_BASE = '''
+    SELECT
+        B.param_type,
+        S.example,
+        S.iteration,
+        S.split,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type,
+        S.runtime
+    FROM
+        Stats S
+        JOIN BestRunsStage B ON
+            S.example = B.example
+            AND (
+                (
+                    S.collective = FALSE
+                    AND B.param_type = 'baseline'
+                ) OR (
+                    S.collective = TRUE
+                    AND S.candidate_count = B.candidate_count
+                    AND S.search_budget = B.search_budget
+                    AND S.search_type = B.search_type
+                )
+            )
+    WHERE {test_condition}
+    ORDER BY
+        B.param_type,
+        S.example,
+        S.iteration,
+        S.split,
+        S.collective,
+        S.candidate_count,
+        S.search_budget,
+        S.search_type
+'''
+
+# Reformat BEST_RUNS_RECORDS_QUERY_BASE to use three parallel columns.
+BEST_RUNS_RECORDS_QUERY = '''
+    SELECT
+        Baseline.example,
+        Baseline.iteration,
+        Baseline.split,
+        Baseline.runtime AS 'IG',
+        CGDataset.runtime AS 'CG (dataset)',
+        CGOverall.runtime AS 'CG (overall)'
+    FROM
+        BestRunsRecordsStage Baseline
+        JOIN BestRunsRecordsStage CGDataset ON
+            Baseline.example = CGDataset.example
+            AND Baseline.iteration = CGDataset.iteration
+            AND Baseline.split = CGDataset.split
+        JOIN BestRunsRecordsStage CGOverall ON
+            Baseline.example = CGOverall.example
+            AND Baseline.iteration = CGOverall.iteration
+            AND Baseline.split = CGOverall.split
+    WHERE
+        Baseline.param_type = 'baseline'
+        AND CGDataset.param_type = 'example'
+        AND CGOverall.param_type = 'overall'
+'''
+
+# Intermediate results that are shared between (or used multiple times within) the queries above.
+# Instead of being inlined (and recomputed) everywhere they are used, each stage is computed once
+# into a temp table that the queries reference by name.
+# Stages may only reference stages that come before them.
+# [(table name, query), ...]
+STAGES = [
+    ('ProportionalStage', PROPORTIONAL_QUERY),
+    ('ValidationSplitsStage', VALIDATION_SPLITS_QUERY),
+    ('BestRunsStage', BEST_RUNS_QUERY),
+    ('BestRunsRecordsStage', BEST_RUNS_RECORDS_QUERY_BASE),
+]
+
+# The timing columns (from parse-results.py) that are carried through PROPORTIONAL, AGGREGATE, and NO_VALIDATION_AGGREGATE.
+PROPORTIONAL_TIMING_COLUMNS = '''
+        S.search_time,
+        S.query_time,
+        S.grounding_time,'''
+
+AGGREGATE_TIMING_COLUMNS = ',' + getMeanStdevColumns(TIMING_COLUMNS + COUNT_COLUMNS)
+AGGREGATE_TIMING_MEANS = ',' + getGroupMeanColumns(TIMING_COLUMNS + COUNT_COLUMNS)
+
+NO_VALIDATION_TIMING_COLUMNS = getMeanStdevColumns(TIMING_COLUMNS) + ','
+NO_VALIDATION_TIMING_MEANS = ',' + getGroupMeanColumns(TIMING_COLUMNS)
+
+# The resource usage columns (from the time.txt of each run, see parse-results.py) that are carried through
+# PROPORTIONAL, AGGREGATE, and NO_VALIDATION_AGGREGATE (for every validation strategy).
+# Each gets a proportional column (against the baseline run), so CG and IG can be compared on CPU and I/O (not just wall time).
+# Results parsed before these columns existed get them as NULLs.
+RESOURCE_COLUMNS = [
+    'max_rss',
+    'user_time',
+    'system_time',
+    'voluntary_context_switches',
+    'involuntary_context_switches',
+    'major_page_faults',
+    'fs_inputs',
+    'fs_outputs',
+]
+
+PROPORTIONAL_RESOURCE_COLUMNS = ','.join(['''
+        S.{0},
+        S.{0} / CAST(B.{0} AS FLOAT) AS {0}_proportional'''.format(column) for column in RESOURCE_COLUMNS])
+
+# Each resource column and its proportion, as aggregated by AGGREGATE and NO_VALIDATION_AGGREGATE.
+RESOURCE_STAT_COLUMNS = [name for column in RESOURCE_COLUMNS for name in [column, column + '_proportional']]
+
+AGGREGATE_RESOURCE_COLUMNS = getMeanStdevColumns(RESOURCE_STAT_COLUMNS)
+AGGREGATE_RESOURCE_MEANS = getGroupMeanColumns(RESOURCE_STAT_COLUMNS)
+
+# How the validation runs (the runs used to choose hyperparams) are picked out.
+# The conditions are used on ProportionalStage/Stats rows (aliased as S).
+# Runs that fail the validation condition (and pass the test condition) are used to report the final numbers.
+# {name: {option: value, ...}, ...}
+VALIDATION_STRATEGIES = {
+    'split': {
+        'description': 'validation split (the first split) for each example',
+        'validation_condition': 'EXISTS (SELECT 1 FROM ValidationSplitsStage V WHERE V.example = S.example AND V.split = S.split)',
+        'test_condition': 'NOT EXISTS (SELECT 1 FROM ValidationSplitsStage V WHERE V.example = S.example AND V.split = S.split)',
+        'timing_columns': False,
+    },
+    'iteration': {
+        'description': 'validation iteration (11)',
+        'validation_condition': 'S.iteration = 11',
+        'test_condition': 'S.iteration != 11',
+        'timing_columns': True,
+    },
+}
+
+DEFAULT_VALIDATION = 'split'
+
+# Used in place of a list of modes to run all of them.
+ALL_MODES = 'ALL'
+
+DEFAULT_OUTPUT_DIR = '.'
+DEFAULT_JOBS = 1
+
+# How the modes are computed.
+# 'sqlite' runs the queries above, 'numpy' computes the tables with array operations (see NUMPY_MODES).
+BACKENDS = ['sqlite', 'numpy']
+DEFAULT_BACKEND = 'sqlite'
+
+BOOL_COLUMNS = {
+    'collective',
+}
+
+INT_COLUMNS = {
+    'iteration',
+    'candidate_count',
+    'search_budget',
+    'runtime',
+    'search_time',
+    'query_time',
+    'grounding_time',
+    'memory',
+    'num_rules',
+    'num_queries',
+    'num_query_results',
+    'num_ground_rules',
+    'max_rss',
+    'user_time',
+    'system_time',
+    'voluntary_context_switches',
+    'involuntary_context_switches',
+    'major_page_faults',
+    'fs_inputs',
+    'fs_outputs',
+    'run_pss_peak',
+    'run_pss_peak_time',
+    'run_private_peak',
+    'run_private_peak_time',
+    'postgres_pss_peak',
+    'postgres_pss_peak_time',
+    'postgres_private_peak',
+    'postgres_private_peak_time',
+}
+
+FLOAT_COLUMNS = {
+}
+
+# {key: (query, description), ...}
+RUN_MODES = {
+    'PROPORTIONAL': (
+        PROPORTIONAL_QUERY,
+        'Just add proportional columns to the results.',
+    ),
+    'AGGREGATE': (
+        AGGREGATE_QUERY,
+        'Aggregate over iteration and split.',
+    ),
+    'AGGREGATE_RANK': (
+        AGGREGATE_RANK_QUERY,
+        'Aggregate over iteration and split, and show the rank of hyperparams for each example.',
+    ),
+    'EXAMPLE_AGGREGATE': (
+        EXAMPLE_AGGREGATE_QUERY,
+        'Aggregate over iteration, split, and example.',
+    ),
+    'VALIDATION_AGGREGATE_RANK': (
+        VALIDATION_AGGREGATEION_RANK_QUERY,
+        'Use only the {description}, aggregate over iteration, and rank hyperparams for each example.',
+    ),
+    'VALIDATION_AGGREGATE_EXAMPLE_RANK': (
+        VALIDATION_AGGREGATEION_EXAMPLE_RANK_QUERY,
+        'Use only the {description}, aggregate over iteration / example, and rank hyperparams for each example.',
+    ),
+    'NO_VALIDATION_AGGREGATE': (
+        NO_VALIDATION_AGGREGATEION_QUERY,
+        'Aggregate over iterations / splits, but ignore the {description}.',
+    ),
+    'BEST_RUNS': (
+        BEST_RUNS_QUERY,
+        'Use the results from NO_VALIDATION_AGGREGATE, and choose the rows using the best hyperparams overall (decided by EXAMPLE_AGGREGATE) and per-example (decided by VALIDATION_AGGREGATE_RANK).',
+    ),
+    'BEST_RUNS_SUMMARY': (
+        BEST_SUMMARY_QUERY,
+        'Provide a small summary table of BEST_RUNS.',
+    ),
+    'BEST_RUNS_RECORDS': (
+        BEST_RUNS_RECORDS_QUERY,
+        'Get the full (non-validation) records for all of BEST_RUNS. Useful for significance testing',
+    ),
+}
+
+# The keys used in the columnar (.npz) output of parse-results.py.
+COLUMNS_KEY = '__columns__'
+NULL_KEY_PREFIX = '__null__'
+
+# ([header, ...], [[value, ...], ...])
+def fetchResults(path):
+    if (path.endswith('.npz')):
+        return fetchColumnarResults(path)
+
+    rows = []
+    header = None
+
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip("\n ")
+            if (line == ''):
+                continue
+
+            row = line.split("\t")
+
+            # Get the header first.
+            if (header is None):
+                header = row
+                continue
+
+            assert(len(header) == len(row))
+
+            for i in range(len(row)):
+                if (row[i] == ''):
+                    row[i] = None
+                elif (header[i] in BOOL_COLUMNS):
+                    row[i] = (row[i].upper() == 'TRUE')
+                elif (header[i] in INT_COLUMNS):
+                    row[i] = int(row[i])
+                elif (header[i] in FLOAT_COLUMNS):
+                    row[i] = float(row[i])
+
+            rows.append(row)
+
+    return header, rows
+
+# Load the columnar (.npz) output of parse-results.py.
+# The columns are already typed, so all the conversion happens inside NumPy (no per-value Python work).
+# ([header, ...], [(value, ...), ...])
+def fetchColumnarResults(path):
+    if (numpy is None):
+        raise ImportError("The numpy package is required to load columnar (.npz) results.")
+
+    columns = []
+
+    with numpy.load(path) as data:
+        header = data[COLUMNS_KEY].tolist()
+
+        for column in header:
+            values = data[column].astype(object)
+
+            nullKey = NULL_KEY_PREFIX + column
+            if (nullKey in data):
+                values[data[nullKey]] = None
+
+            columns.append(values.tolist())
+
+    return header, list(zip(*columns))
+
+# Standard deviation UDF for sqlite3.
+# Taken from: https://www.alexforencich.com/wiki/en/scripts/python/stdev
+class StdevFunc:
+    def __init__(self):
+        self.M = 0.0
+        self.S = 0.0
+        self.k = 1
+
+    def step(self, value):
+        if value is None:
+            return
+        tM = self.M
+        self.M += (value - tM) / self.k
+        self.S += (value - tM) * (value - self.M)
+        self.k += 1
+
+    def finalize(self):
+        if self.k < 3:
+            return None
+        return math.sqrt(self.S / (self.k-2))
+
+# Not every build of SQLite has SQRT(), so fall back to Python (this is only called once per group).
+def addSqrt(connection):
+    try:
+        connection.execute("SELECT SQRT(1.0)")
+    except sqlite3.OperationalError:
+        connection.create_function("SQRT", 1, math.sqrt, deterministic = True)
+
+def addFunctions(connection):
+    connection.create_aggregate("STDEV", 1, StdevFunc)
+    addSqrt(connection)
+
+# Open an existing database without being able to write to it.
+# Any number of these connections can read the same database at once.
+def openReadOnly(dbPath):
+    connection = sqlite3.connect(getReadOnlyURI(dbPath), uri = True)
+    addFunctions(connection)
+    return connection
+
+def getReadOnlyURI(path):
+    return "file:%s?mode=ro" % (urllib.request.pathname2url(os.path.abspath(path)))
+
+# Indexes for the Stats table.
+# The first covers the run identifiers (used to join runs against their baseline),
+# and the second covers the hyperparameters (used to group runs and pick out the best runs).
+# {name: columns, ...}
+STATS_INDEXES = {
+    'StatsRunIndex': 'example, iteration, split, collective',
+    'StatsHyperparamIndex': 'example, collective, candidate_count, search_budget, search_type',
+}
+
+# Get a connection to a database with the results loaded into the Stats table.
+# If |dbPath| is given, then the database is kept on disk and only (re)built when the results file
+# (or the Stats schema) has changed since it was last loaded.
+# Returns None if there are no results.
+def openDatabase(resultsPath, dbPath = None):
+    if (dbPath is None):
+        connection = sqlite3.connect(":memory:")
+    else:
+        connection = sqlite3.connect(dbPath)
+
+    addFunctions(connection)
+
+    if (dbPath is not None and isDatabaseCurrent(connection, resultsPath)):
+        return connection
+
+    if (not loadStats(connection, resultsPath)):
+        connection.close()
+        return None
+
+    return connection
+
+def getStatsSource(resultsPath):
+    stat = os.stat(resultsPath)
+    return (os.path.abspath(resultsPath), stat.st_mtime_ns, stat.st_size)
+
+def isDatabaseCurrent(connection, resultsPath):
+    tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if (not {'Stats', 'StatsSource'} <= tables):
+        return False
+
+    row = connection.execute("SELECT path, mtime, size, schema FROM StatsSource").fetchone()
+    if (row is None):
+        return False
+
+    return row == getStatsSource(resultsPath) + (getStatsSchema(fetchResultsHeader(resultsPath)),)
+
+# Only read the header of the results (so we can check the schema without loading everything).
+def fetchResultsHeader(path):
+    if (path.endswith('.npz')):
+        if (numpy is None):
+            raise ImportError("The numpy package is required to load columnar (.npz) results.")
+
+        with numpy.load(path) as data:
+            return data[COLUMNS_KEY].tolist()
+
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip("\n ")
+            if (line != ''):
+                return line.split("\t")
+
+    return []
+
+def getStatsSchema(columns):
+    quotedColumns = ["'%s'" % column for column in columns]
+
+    columnDefs = []
+    for i in range(len(columns)):
+        column = columns[i]
+        quotedColumn = quotedColumns[i]
+
+        if (column in BOOL_COLUMNS):
+            columnDefs.append("%s INTEGER" % (quotedColumn))
+        elif (column in INT_COLUMNS):
+            columnDefs.append("%s INTEGER" % (quotedColumn))
+        elif (column in FLOAT_COLUMNS):
+            columnDefs.append("%s FLOAT" % (quotedColumn))
+        else:
+            columnDefs.append("%s TEXT" % (quotedColumn))
+
+    # Results parsed before the resource columns existed get them as NULLs.
+    for column in RESOURCE_COLUMNS:
+        if (column not in columns):
+            columnDefs.append("'%s' INTEGER" % (column))
+
+    return "CREATE TABLE Stats(%s)" % (', '.join(columnDefs))
+
+# Returns False if there are no results.
+def loadStats(connection, resultsPath):
+    columns, data = fetchResults(resultsPath)
+    if (len(data) == 0):
+        return False
+
+    schema = getStatsSchema(columns)
+
+    with connection:
+        connection.execute("DROP TABLE IF EXISTS Stats")
+        connection.execute("DROP TABLE IF EXISTS StatsSource")
+
+        connection.execute(schema)
+        connection.executemany("INSERT INTO Stats(%s) VALUES (%s)" % (', '.join(columns), ', '.join(['?'] * len(columns))), data)
+
+        for (name, indexColumns) in STATS_INDEXES.items():
+            connection.execute("CREATE INDEX %s ON Stats(%s)" % (name, indexColumns))
+
+        connection.execute("CREATE TABLE StatsSource(path TEXT, mtime INTEGER, size INTEGER, schema TEXT)")
+        connection.execute("INSERT INTO StatsSource(path, mtime, size, schema) VALUES (?, ?, ?, ?)", getStatsSource(resultsPath) + (schema,))
+
+    connection.execute("ANALYZE")
+
+    return True
+
+# The NumPy backend.
+# Instead of loading the results into SQLite, the columns are kept as arrays and the simple modes are computed directly:
+# the baseline join is a sort-merge join on factorized (example, iteration, split) keys,
+# and the aggregates are sums over factorized group keys (numpy.bincount).
+# The tables are the same as the ones from the matching queries (PROPORTIONAL_QUERY and AGGREGATE_QUERY), up to float rounding.
+# A column is kept as (values, nulls), where nulls is a boolean array (and the values under a null are meaningless).
+# A table is ([column name, ...], [column, ...]).
+
+NUMPY_JOIN_COLUMNS = ['example', 'iteration', 'split']
+NUMPY_ORDER_COLUMNS = ['example', 'iteration', 'split', 'collective', 'candidate_count', 'search_budget', 'search_type']
+NUMPY_GROUP_COLUMNS = ['example', 'collective', 'candidate_count', 'search_budget', 'search_type']
+NUMPY_PROPORTIONAL_COLUMNS = ['runtime', 'memory']
+NUMPY_TIMING_COLUMNS = ['search_time', 'query_time', 'grounding_time']
+NUMPY_COUNT_COLUMNS = ['num_rules', 'num_queries', 'num_query_results', 'num_ground_rules']
+
+# How many rows are converted back into Python values at a time.
+NUMPY_ROW_CHUNK_SIZE = 10000
+
+# Load the results as typed columns.
+# Returns ({column name: column, ...}, number of rows).
+def fetchResultArrays(path):
+    if (numpy is None):
+        raise ImportError("The numpy package is required for the numpy backend.")
+
+    columns = {}
+
+    if (path.endswith('.npz')):
+        with numpy.load(path) as data:
+            for name in data[COLUMNS_KEY].tolist():
+                values = data[name]
+                if (values.dtype == bool):
+                    values = values.astype(numpy.int64)
+
+                nulls = numpy.zeros(len(values), dtype = bool)
+                if ((NULL_KEY_PREFIX + name) in data):
+                    nulls = data[NULL_KEY_PREFIX + name]
+
+                columns[name] = (values, nulls)
+    else:
+        header, rows = fetchResults(path)
+
+        for i in range(len(header)):
+            rawValues = [row[i] for row in rows]
+            nulls = numpy.array([value is None for value in rawValues], dtype = bool)
+
+            if (header[i] in BOOL_COLUMNS or header[i] in INT_COLUMNS):
+                values = numpy.array([0 if value is None else int(value) for value in rawValues], dtype = numpy.int64)
+            elif (header[i] in FLOAT_COLUMNS):
+                values = numpy.array([0.0 if value is None else value for value in rawValues], dtype = numpy.float64)
+            else:
+                values = numpy.array(['' if value is None else value for value in rawValues], dtype = str)
+
+            columns[header[i]] = (values, nulls)
+
+    numRows = 0
+    if (len(columns) > 0):
+        numRows = len(next(iter(columns.values()))[0])
+
+    # Results parsed before the resource columns existed get them as NULLs.
+    for name in RESOURCE_COLUMNS:
+        if (name not in columns):
+            columns[name] = (numpy.zeros(numRows, dtype = numpy.int64), numpy.ones(numRows, dtype = bool))
+
+    return columns, numRows
+
+# Replace values with dense integer codes that sort the same way as SQLite (NULLs first, as -1).
+def factorize(column):
+    values, nulls = column
+
+    codes = numpy.full(len(values), -1, dtype = numpy.int64)
+    values = values[~nulls]
+
+    if (len(values) == 0):
+        return codes
+
+    # Integers in a small range (the usual case for ids and hyperparams) can be numbered without sorting.
+    if (values.dtype.kind in 'iu' and int(values.max()) - int(values.min()) <= len(values)):
+        offsets = values - values.min()
+        codes[~nulls] = (numpy.cumsum(numpy.bincount(offsets) > 0) - 1)[offsets]
+    else:
+        codes[~nulls] = numpy.unique(values, return_inverse = True)[1].reshape(-1)
+
+    return codes
+
+# Combine the codes of several columns into a single key per row that sorts the same way as the columns (in order) do.
+# Rows with the same key have the same codes in all the columns.
+def combineCodes(codesList):
+    radixes = [int(codes.max(initial = -1)) + 2 for codes in codesList]
+
+    # If the mixed-radix key could overflow, fall back to (slower) numbering the distinct rows.
+    if (math.prod(radixes) >= 2 ** 62):
+        return numpy.unique(numpy.stack(codesList, axis = 1), axis = 0, return_inverse = True)[1].reshape(-1)
+
+    keys = numpy.zeros(len(codesList[0]), dtype = numpy.int64)
+    for (codes, radix) in zip(codesList, radixes):
+        keys = keys * radix + (codes + 1)
+
+    return keys
+
+def takeColumn(column, indexes):
+    return (column[0][indexes], column[1][indexes])
+
+# Divide two columns the way SQLite does (NULL for a NULL input or a zero divisor).
+def divideColumns(numerator, denominator):
+    nulls = numerator[1] | denominator[1] | (denominator[0] == 0)
+
+    values = numpy.zeros(len(nulls), dtype = numpy.float64)
+    values[~nulls] = numerator[0][~nulls].astype(numpy.float64) / denominator[0][~nulls].astype(numpy.float64)
+
+    return (values, nulls)
+
+# Join every row against its baseline (non-collective) row(s) and sort the joined rows, like PROPORTIONAL_QUERY.
+# Returns (row indexes, baseline indexes, {column: codes (of the joined rows)}).
+def joinBaselines(columns):
+    codes = {name: factorize(columns[name]) for name in NUMPY_ORDER_COLUMNS}
+
+    joinCodes = [codes[name] for name in NUMPY_JOIN_COLUMNS]
+    keys = combineCodes(joinCodes)
+
+    # NULL keys never join.
+    keys[numpy.any([joinCode == -1 for joinCode in joinCodes], axis = 0)] = -1
+
+    collective, collectiveNulls = columns['collective']
+    baselineIndexes = numpy.flatnonzero((collective == 0) & ~collectiveNulls & (keys != -1))
+
+    # Sort-merge join: sort the baseline rows by key, and find the range of matching baseline rows for every row.
+    baselineIndexes = baselineIndexes[numpy.argsort(keys[baselineIndexes], kind = 'stable')]
+    baselineKeys = keys[baselineIndexes]
+
+    starts = numpy.searchsorted(baselineKeys, keys, side = 'left')
+    counts = numpy.searchsorted(baselineKeys, keys, side = 'right') - starts
+    counts[keys == -1] = 0
+
+    rowIndexes = numpy.repeat(numpy.arange(len(keys)), counts)
+    offsets = numpy.arange(len(rowIndexes)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    baselineIndexes = baselineIndexes[numpy.repeat(starts, counts) + offsets]
+
+    # ORDER BY.
+    order = numpy.argsort(combineCodes([codes[name][rowIndexes] for name in NUMPY_ORDER_COLUMNS]), kind = 'stable')
+    rowIndexes = rowIndexes[order]
+    baselineIndexes = baselineIndexes[order]
+
+    return rowIndexes, baselineIndexes, {name: codes[name][rowIndexes] for name in NUMPY_ORDER_COLUMNS}
+
+def getProportionalColumn(columns, name, rowIndexes, baselineIndexes):
+    if (name.endswith('_proportional')):
+        baseName = name[:-len('_proportional')]
+        return divideColumns(takeColumn(columns[baseName], rowIndexes), takeColumn(columns[baseName], baselineIndexes))
+
+    return takeColumn(columns[name], rowIndexes)
+
+# The same table as PROPORTIONAL_QUERY.
+def computeProportional(columns, validation):
+    rowIndexes, baselineIndexes, _ = joinBaselines(columns)
+
+    header = list(NUMPY_ORDER_COLUMNS)
+    for name in NUMPY_PROPORTIONAL_COLUMNS:
+        header += [name, name + '_proportional']
+
+    if (VALIDATION_STRATEGIES[validation]['timing_columns']):
+        header += NUMPY_TIMING_COLUMNS
+
+    header += NUMPY_COUNT_COLUMNS
+
+    header += RESOURCE_STAT_COLUMNS
+
+    return header, [getProportionalColumn(columns, name, rowIndexes, baselineIndexes) for name in header]
+
+# The same table as AGGREGATE_QUERY.
+def computeAggregate(columns, validation):
+    rowIndexes, baselineIndexes, codes = joinBaselines(columns)
+
+    # Groups are numbered in ORDER BY order.
+    groupKeys = combineCodes([codes[name] for name in NUMPY_GROUP_COLUMNS])
+    _, firstIndexes, groups = numpy.unique(groupKeys, return_index = True, return_inverse = True)
+    groups = groups.reshape(-1)
+    numGroups = len(firstIndexes)
+
+    header = list(NUMPY_GROUP_COLUMNS) + ['aggregate_count']
+    outColumns = [takeColumn(columns[name], rowIndexes[firstIndexes]) for name in NUMPY_GROUP_COLUMNS]
+
+    counts = numpy.bincount(groups, minlength = numGroups)
+    outColumns.append((counts, numpy.zeros(numGroups, dtype = bool)))
+
+    statColumns = []
+    for name in NUMPY_PROPORTIONAL_COLUMNS:
+        statColumns += [name, name + '_proportional']
+
+    if (VALIDATION_STRATEGIES[validation]['timing_columns']):
+        statColumns += NUMPY_TIMING_COLUMNS + NUMPY_COUNT_COLUMNS
+
+    statColumns += RESOURCE_STAT_COLUMNS
+
+    for name in statColumns:
+        header += [name + '_mean', name + '_std']
+        outColumns += groupMeanStdev(getProportionalColumn(columns, name, rowIndexes, baselineIndexes), groups, numGroups)
+
+    return header, outColumns
+
+# Compute AVG() and STDEV() (see MEAN_STDEV_SQL) for each group.
+# Returns [mean column, standard deviation column].
+def groupMeanStdev(column, groups, numGroups):
+    values, nulls = column
+    values = numpy.where(nulls, 0.0, values.astype(numpy.float64))
+
+    counts = numpy.bincount(groups, weights = (~nulls).astype(numpy.float64), minlength = numGroups)
+    sums = numpy.bincount(groups, weights = values, minlength = numGroups)
+
+    meanNulls = (counts == 0)
+    stdevNulls = (counts < 2)
+
+    with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+        means = sums / counts
+
+        # Two passes (deviations from the group mean), so large, nearly equal values do not cancel out.
+        deviations = numpy.where(nulls, 0.0, values - means[groups])
+        variances = numpy.bincount(groups, weights = deviations * deviations, minlength = numGroups) / (counts - 1)
+
+    return [(numpy.where(meanNulls, 0.0, means), meanNulls), (numpy.sqrt(numpy.where(stdevNulls, 0.0, variances)), stdevNulls)]
+
+# Convert a table's columns back into rows of Python values (None for NULL), a chunk at a time.
+def iterateRows(columns):
+    numRows = 0
+    if (len(columns) > 0):
+        numRows = len(columns[0][0])
+
+    for start in range(0, numRows, NUMPY_ROW_CHUNK_SIZE):
+        end = min(numRows, start + NUMPY_ROW_CHUNK_SIZE)
+
+        chunk = []
+        for (values, nulls) in columns:
+            chunkValues = values[start:end].tolist()
+            for i in numpy.flatnonzero(nulls[start:end]).tolist():
+                chunkValues[i] = None
+            chunk.append(chunkValues)
+
+        yield from zip(*chunk)
+
+# {mode: function(columns, validation) -> table, ...}
+NUMPY_MODES = {
+    'PROPORTIONAL': computeProportional,
+    'AGGREGATE': computeAggregate,
+}
+
+def runNumpyModes(modes, resultsPath, validation, outputDir):
+    columns, numRows = fetchResultArrays(resultsPath)
+    if (numRows == 0):
+        return
+
+    for i in range(len(modes)):
+        header, tableColumns = NUMPY_MODES[modes[i]](columns, validation)
+
+        if (outputDir is None):
+            if (i > 0):
+                print()
+
+            writeTable(header, iterateRows(tableColumns), sys.stdout)
+        else:
+            outputPath = getOutputPath(outputDir, modes[i])
+            with open(outputPath, 'w') as file:
+                writeTable(header, iterateRows(tableColumns), file)
+
+            print("Wrote %s to %s." % (modes[i], outputPath), file = sys.stderr)
+
+# Fill in a query (or mode description) for a validation strategy.
+def formatQuery(query, validation):
+    strategy = VALIDATION_STRATEGIES[validation]
+
+    options = {
+        'description': strategy['description'],
+        'validation_condition': strategy['validation_condition'],
+        'test_condition': strategy['test_condition'],
+        'proportional_timing_columns': '',
+        'aggregate_timing_columns': '',
+        'aggregate_timing_means': '',
+        'no_validation_timing_columns': '',
+        'no_validation_timing_means': '',
+        'proportional_resource_columns': PROPORTIONAL_RESOURCE_COLUMNS,
+        'aggregate_resource_columns': AGGREGATE_RESOURCE_COLUMNS,
+        'aggregate_resource_means': AGGREGATE_RESOURCE_MEANS,
+    }
+
+    if (strategy['timing_columns']):
+        options['proportional_timing_columns'] = PROPORTIONAL_TIMING_COLUMNS
+        options['aggregate_timing_columns'] = AGGREGATE_TIMING_COLUMNS
+        options['aggregate_timing_means'] = AGGREGATE_TIMING_MEANS
+        options['no_validation_timing_columns'] = NO_VALIDATION_TIMING_COLUMNS
+        options['no_validation_timing_means'] = NO_VALIDATION_TIMING_MEANS
+
+    return query.format(**options)
+
+# Get the full SQL for a mode (ready to be run once its stages exist).
+def getModeQuery(mode, validation):
+    return formatQuery(RUN_MODES[mode][0], validation)
+
+# Create the tables for all the stages that a query (directly or indirectly) uses.
+# The tables are made in |schema| (by default, as temp tables that only this connection can see).
+# Stages that already exist in the schema are reused,
+# so the stages shared between modes are only computed once per connection.
+def materializeStages(connection, query, validation, schema = 'temp'):
+    queries = [query]
+    neededStages = []
+
+    for (name, stageQuery) in reversed(STAGES):
+        stageQuery = formatQuery(stageQuery, validation)
+        if (any([name in otherQuery for otherQuery in queries])):
+            neededStages.append((name, stageQuery))
+            queries.append(stageQuery)
+
+    for (name, stageQuery) in reversed(neededStages):
+        connection.execute("CREATE TABLE IF NOT EXISTS %s.%s AS %s" % (schema, name, stageQuery))
+
+# Write the results of a query (as a TSV with a header) to |file|.
+def writeRows(connection, query, file):
+    rows = connection.execute(query)
+    writeTable([column[0] for column in rows.description], rows, file)
+
+def writeTable(header, rows, file):
+    print("\t".join(header), file = file)
+    for row in rows:
+        print("\t".join(map(str, row)), file = file)
+
+# Run a mode and write its results to |file|.
+def runMode(connection, mode, validation, file = sys.stdout):
+    query = getModeQuery(mode, validation)
+    materializeStages(connection, query, validation)
+    writeRows(connection, query, file)
+
+def getOutputPath(outputDir, mode):
+    return os.path.join(outputDir, "%s.tsv" % (mode))
+
+# Run the modes one after another on a single connection, each into its own file in |outputDir|.
+def runModes(connection, modes, validation, outputDir):
+    for mode in modes:
+        outputPath = getOutputPath(outputDir, mode)
+        with open(outputPath, 'w') as file:
+            runMode(connection, mode, validation, file)
+
+        print("Wrote %s to %s." % (mode, outputPath), file = sys.stderr)
+
+# Run the modes concurrently, each on its own read-only connection (and thread) and into its own file in |outputDir|.
+# All the stages that the modes need are first computed once into a shared (attached) database,
+# so the modes themselves only ever read.
+# SQLite releases the GIL while it runs a query, so the threads run in parallel.
+def runModesConcurrently(connection, dbPath, modes, validation, outputDir, jobs):
+    with tempfile.TemporaryDirectory() as tempDir:
+        stagesPath = os.path.join(tempDir, 'stages.db')
+
+        connection.execute("ATTACH DATABASE ? AS Stages", (stagesPath,))
+        for mode in modes:
+            materializeStages(connection, getModeQuery(mode, validation), validation, schema = 'Stages')
+        connection.commit()
+        connection.execute("DETACH DATABASE Stages")
+
+        work = [(mode, validation, dbPath, stagesPath, getOutputPath(outputDir, mode)) for mode in modes]
+
+        with multiprocessing.pool.ThreadPool(jobs) as pool:
+            for (mode, outputPath) in pool.imap(runModeReadOnly, work):
+                print("Wrote %s to %s." % (mode, outputPath), file = sys.stderr)
+
+# Returns (mode, output path).
+def runModeReadOnly(args):
+    mode, validation, dbPath, stagesPath, outputPath = args
+
+    connection = openReadOnly(dbPath)
+    connection.execute("ATTACH DATABASE ? AS Stages", (getReadOnlyURI(stagesPath),))
+
+    with open(outputPath, 'w') as file:
+        writeRows(connection, getModeQuery(mode, validation), file)
+
+    connection.close()
+
+    return mode, outputPath
+
+# Load the results once and run every mode in |modes| on them.
+# Without |outputDir|, the tables are printed (in order) to stdout, separated by an empty line.
+# With |outputDir|, each mode is written to <outputDir>/<mode>.tsv (using up to |jobs| modes at once).
+def main(modes, resultsPath, validation = DEFAULT_VALIDATION, dbPath = None, outputDir = None, jobs = DEFAULT_JOBS, backend = DEFAULT_BACKEND):
+    if (backend == 'numpy'):
+        if (outputDir is not None):
+            os.makedirs(outputDir, exist_ok = True)
+
+        runNumpyModes(modes, resultsPath, validation, outputDir)
+        return
+
+    jobs = min(jobs, len(modes))
+
+    # Concurrent modes need the results in a database file that each connection can open.
+    tempDir = None
+    if (jobs > 1 and dbPath is None):
+        tempDir = tempfile.TemporaryDirectory()
+        dbPath = os.path.join(tempDir.name, 'stats.db')
+
+    connection = openDatabase(resultsPath, dbPath)
+    if (connection is None):
+        return
+
+    if (outputDir is None):
+        for i in range(len(modes)):
+            if (i > 0):
+                print()
+
+            runMode(connection, modes[i], validation)
+    else:
+        os.makedirs(outputDir, exist_ok = True)
+
+        if (jobs > 1):
+            runModesConcurrently(connection, dbPath, modes, validation, outputDir, jobs)
+        else:
+            runModes(connection, modes, validation, outputDir)
+
+    connection.close()
+
+    if (tempDir is not None):
+        tempDir.cleanup()
+
+# |validation| is set by the scripts that fix the validation strategy (in which case --validation is not accepted).
+def _usage(executable, validation = None):
+    options = "[--backend <%s>] [--db <database path>] [--modes <mode>[,<mode> ...]|ALL [--output-dir <dir>] [--jobs <num jobs>]]" % ('|'.join(BACKENDS))
+
+    if (validation is None):
+        print("USAGE: python3 %s [--validation <%s>] %s <results path> [<mode> ...]" % (executable, '|'.join(VALIDATION_STRATEGIES), options), file = sys.stderr)
+        print("    --validation - How the validation runs are chosen. Default: %s." % (DEFAULT_VALIDATION), file = sys.stderr)
+        for (name, strategy) in VALIDATION_STRATEGIES.items():
+            print("        %s - Use the %s." % (name, strategy['description']), file = sys.stderr)
+    else:
+        print("USAGE: python3 %s %s <results path> [<mode> ...]" % (executable, options), file = sys.stderr)
+
+    print("    --backend - How the modes are computed. The numpy backend only supports: %s. Default: %s." % (', '.join(NUMPY_MODES), DEFAULT_BACKEND), file = sys.stderr)
+    print("    --db - Keep the loaded results in a database file that is reused until the results change.", file = sys.stderr)
+    print("    --modes - Run these modes (or all of them), writing each to <output dir>/<mode>.tsv instead of stdout.", file = sys.stderr)
+    print("    --output-dir - Where --modes writes its output. Default: %s." % (DEFAULT_OUTPUT_DIR), file = sys.stderr)
+    print("    --jobs - The number of --modes to run at once (0 for one per core). Default: %d." % (DEFAULT_JOBS), file = sys.stderr)
+    print("Modes given after the results path are printed to stdout (in order, separated by an empty line).", file = sys.stderr)
+    print("modes:", file = sys.stderr)
+    for (key, (query, description)) in RUN_MODES.items():
+        print("    %s - %s" % (key, formatQuery(description, validation or DEFAULT_VALIDATION)), file = sys.stderr)
+    sys.exit(1)
+
+def _parse_modes(text):
+    if (text.upper() == ALL_MODES):
+        return list(RUN_MODES)
+
+    modes = [mode.strip().upper() for mode in text.split(',') if mode.strip() != '']
+    for mode in modes:
+        if (mode not in RUN_MODES):
+            raise ValueError("Unknown mode: '%s'." % (mode))
+
+    return modes
+
+def _load_args(args, validation = None):
+    executable = args.pop(0)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable, validation)
+
+    fixedValidation = validation
+
+    options = {
+        'validation': DEFAULT_VALIDATION if validation is None else validation,
+    }
+
+    while (len(args) > 0 and args[0].startswith('--')):
+        arg = args.pop(0)
+
+        if (arg == '--validation' and fixedValidation is None and len(args) > 0):
+            options['validation'] = args.pop(0).lower()
+            if (options['validation'] not in VALIDATION_STRATEGIES):
+                raise ValueError("Unknown validation strategy: '%s'." % (options['validation']))
+        elif (arg == '--backend' and len(args) > 0):
+            options['backend'] = args.pop(0).lower()
+            if (options['backend'] not in BACKENDS):
+                raise ValueError("Unknown backend: '%s'." % (options['backend']))
+        elif (arg == '--db' and len(args) > 0):
+            options['dbPath'] = args.pop(0)
+        elif (arg == '--modes' and len(args) > 0):
+            options['modes'] = _parse_modes(args.pop(0))
+            options.setdefault('outputDir', DEFAULT_OUTPUT_DIR)
+        elif (arg == '--output-dir' and len(args) > 0):
+            options['outputDir'] = args.pop(0)
+        elif (arg == '--jobs' and len(args) > 0):
+            options['jobs'] = int(args.pop(0))
+            if (options['jobs'] < 0):
+                raise ValueError("Number of jobs must be non-negative, got: %d." % (options['jobs']))
+
+            if (options['jobs'] == 0):
+                options['jobs'] = os.cpu_count()
+        else:
+            _usage(executable, fixedValidation)
+
+    if (len(args) == 0):
+        _usage(executable, fixedValidation)
+
+    options['resultsPath'] = args.pop(0)
+    if (not os.path.isfile(options['resultsPath'])):
+        raise ValueError("Can't find the specified results path: " + options['resultsPath'])
+
+    # Modes are either given with --modes (to files), or after the results path (to stdout).
+    if (('modes' in options) == (len(args) > 0)):
+        _usage(executable, fixedValidation)
+
+    if ('modes' not in options):
+        options['modes'] = _parse_modes(','.join(args))
+
+    if ((('outputDir' in options) or ('jobs' in options)) and len(args) > 0):
+        _usage(executable, fixedValidation)
+
+    if (options.get('backend') == 'numpy'):
+        for mode in options['modes']:
+            if (mode not in NUMPY_MODES):
+                raise ValueError("The numpy backend does not support mode: '%s'." % (mode))
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+# Benchmark the numpy backend of analyze-results.py against the (default) SQLite backend.
+# A synthetic columnar (.npz) results file is written out, and then the modes that the numpy backend supports
+# are computed with each backend.
+# The tables from both backends are checked to be the same (within float tolerance),
+# and the load and compute time of each backend is reported.
+
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy
+
+import scriptloader
+
+DEFAULT_NUM_ROWS = 1000000
+DEFAULT_VALIDATION = 'iteration'
+
+NUM_EXAMPLES = 10
+NUM_SPLITS = 10
+CANDIDATE_COUNTS = [1, 3, 5]
+SEARCH_BUDGETS = [1, 3, 5, 10, 20]
+SEARCH_TYPES = ['BFS', 'BoundedDFS', 'DFS', 'UCS']
+
+# Some values are NULL (e.g. runs that did not find a candidate), to exercise the NULL cases.
+NULL_CHANCE = 0.01
+
+RELATIVE_TOLERANCE = 1e-9
+ABSOLUTE_TOLERANCE = 1e-6
+
+SEED = 4
+
+# Write |numRows| (about) synthetic runs in the same layout as parse-results.py --output results.npz.
+# Each (example, iteration, split) gets one baseline run and one collective run per hyperparam setting.
+def writeResults(analyzer, path, numRows):
+    rng = numpy.random.default_rng(SEED)
+
+    hyperparams = [(None, None, None)]
+    for candidateCount in CANDIDATE_COUNTS:
+        for searchBudget in SEARCH_BUDGETS:
+            for searchType in SEARCH_TYPES:
+                hyperparams.append((candidateCount, searchBudget, searchType))
+
+    numKeys = max(1, numRows // len(hyperparams))
+    numRows = numKeys * len(hyperparams)
+
+    keys = numpy.repeat(numpy.arange(numKeys), len(hyperparams))
+    settings = numpy.tile(numpy.arange(len(hyperparams)), numKeys)
+
+    columns = {
+        'example': (numpy.array(["example-%02d" % (i) for i in range(NUM_EXAMPLES)])[keys % NUM_EXAMPLES], None),
+        'iteration': (keys // (NUM_EXAMPLES * NUM_SPLITS), None),
+        'split': (((keys // NUM_EXAMPLES) % NUM_SPLITS).astype(str), None),
+        'collective': (settings != 0, None),
+    }
+
+    baselines = (settings == 0)
+    for (index, name, values) in [(0, 'candidate_count', CANDIDATE_COUNTS), (1, 'search_budget', SEARCH_BUDGETS), (2, 'search_type', SEARCH_TYPES)]:
+        column = numpy.array([values[0] if setting[index] is None else setting[index] for setting in hyperparams])[settings]
+        columns[name] = (column, baselines)
+
+    for (name, scale) in [('runtime', 1e4), ('search_time', 1e2), ('query_time', 1e3), ('grounding_time', 1e3), ('memory', 1e9),
+            ('num_rules', 10), ('num_queries', 10), ('num_query_results', 1e4), ('num_ground_rules', 1e4),
+            ('max_rss', 1e9), ('user_time', 1e4), ('system_time', 1e3), ('voluntary_context_switches', 1e4),
+            ('involuntary_context_switches', 1e3), ('major_page_faults', 1), ('fs_inputs', 1e3), ('fs_outputs', 1e4)]:
+        values = (rng.lognormal(0.0, 0.5, numRows) * scale).astype(numpy.int64)
+        columns[name] = (values, rng.random(numRows) < NULL_CHANCE)
+
+    header = list(columns)
+    arrays = {analyzer.COLUMNS_KEY: numpy.array(header)}
+
+    for name in header:
+        values, nulls = columns[name]
+        arrays[name] = values
+
+        if (nulls is not None and nulls.any()):
+            arrays[analyzer.NULL_KEY_PREFIX + name] = nulls
+
+    with open(path, 'wb') as file:
+        numpy.savez(file, **arrays)
+
+    return numRows
+
+def timeIt(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+def compareRows(mode, sqliteRows, numpyRows):
+    count = 0
+
+    for (sqliteRow, numpyRow) in zip(sqliteRows, numpyRows):
+        count += 1
+
+        for (sqliteValue, numpyValue) in zip(sqliteRow, numpyRow):
+            if (isinstance(sqliteValue, float) or isinstance(numpyValue, float)):
+                same = (sqliteValue is None and numpyValue is None) or (
+                        sqliteValue is not None and numpyValue is not None
+                        and math.isclose(sqliteValue, numpyValue, rel_tol = RELATIVE_TOLERANCE, abs_tol = ABSOLUTE_TOLERANCE))
+            else:
+                same = (sqliteValue == numpyValue)
+
+            if (not same):
+                raise ValueError("Backends disagree on %s. SQLite: %s, NumPy: %s." % (mode, sqliteRow, numpyRow))
+
+    return count
+
+def main(numRows, validation):
+    analyzer = scriptloader.loadScript('analyze-results')
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        resultsPath = os.path.join(tempDir, 'results.npz')
+        numRows = writeResults(analyzer, resultsPath, numRows)
+        print("Wrote %d synthetic runs to %s." % (numRows, resultsPath), file = sys.stderr)
+
+        connection, sqliteLoadSeconds = timeIt(lambda: analyzer.openDatabase(resultsPath))
+        (columns, _), numpyLoadSeconds = timeIt(lambda: analyzer.fetchResultArrays(resultsPath))
+
+        print("backend\tmode\tseconds")
+        print("sqlite\tLOAD\t%.2f" % (sqliteLoadSeconds))
+        print("numpy\tLOAD\t%.2f" % (numpyLoadSeconds))
+
+        for (mode, function) in analyzer.NUMPY_MODES.items():
+            query = analyzer.getModeQuery(mode, validation)
+
+            def runSQLite():
+                analyzer.materializeStages(connection, query, validation)
+                return connection.execute(query).fetchall()
+
+            sqliteRows, sqliteSeconds = timeIt(runSQLite)
+            (header, tableColumns), numpySeconds = timeIt(lambda: function(columns, validation))
+
+            print("sqlite\t%s\t%.2f" % (mode, sqliteSeconds))
+            print("numpy\t%s\t%.2f" % (mode, numpySeconds))
+
+            count = compareRows(mode, sqliteRows, analyzer.iterateRows(tableColumns))
+            if (count != len(sqliteRows) or count != len(tableColumns[0][0])):
+                raise ValueError("Backends disagree on the number of %s rows. SQLite: %d, NumPy: %d." % (mode, len(sqliteRows), len(tableColumns[0][0])))
+
+        connection.close()
+
+def _load_args(args):
+    executable = args.pop(0)
+    if (len(args) > 2 or ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args})):
+        print("USAGE: python3 %s [num rows [validation strategy]]" % (executable), file = sys.stderr)
+        print("The synthetic results have %d rows and use the '%s' validation strategy by default." % (DEFAULT_NUM_ROWS, DEFAULT_VALIDATION), file = sys.stderr)
+        sys.exit(1)
+
+    numRows = DEFAULT_NUM_ROWS
+    if (len(args) > 0):
+        numRows = int(args.pop(0))
+
+    validation = DEFAULT_VALIDATION
+    if (len(args) > 0):
+        validation = args.pop(0)
+
+    return numRows, validation
+
+if (__name__ == '__main__'):
+    main(*_load_args(sys.argv))
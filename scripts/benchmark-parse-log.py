@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+# Benchmark the log parser in parse-results.py against the original (one re.search per pattern per line) parser.
+# A synthetic TRACE-level log (in the PSL 2.3.2 format) is written out and then parsed by both parsers.
+# The results of both parsers are checked to be the same, and the throughput (lines/sec) of each is reported.
+
+import os
+import re
+import sys
+import tempfile
+import time
+
+import scriptloader
+
+# Keep the synthetic log out of the results directory so it never gets picked up by parse-results.py.
+DEFAULT_LOG_PATH = os.path.join(tempfile.gettempdir(), 'collective-grounding-benchmark', 'out.txt')
+DEFAULT_SIZE_GB = 4.0
+
+BYTES_PER_GB = 1024 ** 3
+
+# The number of TRACE lines that follow each grounding query.
+TRACE_LINES_PER_QUERY = 200
+
+TRACE_LINE = "%d [main] TRACE org.linqs.psl.database.rdbms.RDBMSDatabase  - SELECT DISTINCT T0.STRING_0 AS A, T1.STRING_1 AS B, T2.STRING_1 AS C FROM SIMILAR_PREDICATE T0, LINK_PREDICATE T1, LINK_PREDICATE T2 WHERE T0.STRING_1 = T1.STRING_0 AND T1.STRING_1 = T2.STRING_0 AND T0.PARTITION_ID IN (%d, 1) AND T1.PARTITION_ID IN (0, 1)\n"
+
+# The parser before the single-pass matcher, kept verbatim as a baseline.
+def legacyParseLog(logPath):
+    results = {}
+
+    for (key, value) in re.findall(r'([\w\-]+)::([\w\-]+)', logPath):
+        results[key] = value
+
+    groundTimeStart = None
+    searchTimeStart = None
+    queryTimeStart = None
+
+    rules = 0
+    queries = 0
+    queryResults = 0
+    groundRules = 0
+
+    with open(logPath, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if (line == ''):
+                continue
+
+            match = re.search(r'^(\d+)\s+\[', line)
+            if (match is not None):
+                time = int(match.group(1))
+
+            match = re.search(r'INFO  org.linqs.psl.application.inference.InferenceApplication  - Grounding out model.', line)
+            if (match is not None):
+                groundTimeStart = time
+
+            match = re.search(r'DEBUG org.linqs.psl.grounding.Grounding  - Generating candidates.', line)
+            if (match is not None):
+                searchTimeStart = time
+
+            match = re.search(r'DEBUG org.linqs.psl.grounding.Grounding  - Generated (\d+) candidates', line)
+            if (match is not None and searchTimeStart is not None):
+                results['search_time'] = time - searchTimeStart
+                queryTimeStart = time
+
+            match = re.search(r'DEBUG org.linqs.psl.grounding.Grounding  - Grounding (\d+) rule\(s\) with query:', line)
+            if (match is not None):
+                queries += 1
+                rules += int(match.group(1))
+
+            match = re.search(r'DEBUG org.linqs.psl.grounding.Grounding  - Generated (\d+) ground rules from (\d+) query results.', line)
+            if (match is not None):
+                queryResults += int(match.group(2))
+
+            match = re.search(r'org.linqs.psl.application.inference.InferenceApplication  - Generated (\d+) ground rules.', line)
+            if (match is not None):
+                groundRules = int(match.group(1))
+
+            match = re.search(r'INFO  org.linqs.psl.application.inference.InferenceApplication  - Grounding complete.', line)
+            if (match is not None):
+                results['grounding_time'] = time - groundTimeStart
+
+                if (queryTimeStart is None):
+                    results['search_time'] = 0
+                    results['query_time'] = time - groundTimeStart
+                else:
+                    results['query_time'] = time - queryTimeStart
+
+            match = re.search(r'INFO  org.linqs.psl.util.RuntimeStats  - Used Memory \(bytes\)  -- Min:\s*(\d+), Max:\s*(\d+), Mean:\s*(\d+), Count:\s*(\d+)$', line)
+            if (match is not None):
+                results['runtime'] = time
+                results['memory'] = int(match.group(2))
+
+    if ('runtime' not in results):
+        return None
+
+    results['num_rules'] = rules
+    results['num_queries'] = queries
+    results['num_query_results'] = queryResults
+    results['num_ground_rules'] = groundRules
+
+    return results
+
+# Write a synthetic CG log of (about) |sizeBytes| bytes.
+# Returns the number of lines written.
+def writeLog(path, sizeBytes):
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+
+    lineCount = 0
+    time = 0
+
+    with open(path, 'w') as file:
+        def write(line):
+            nonlocal lineCount
+            file.write(line)
+            lineCount += line.count("\n")
+
+        write("%d [main] INFO  org.linqs.psl.cli.Launcher  - Running PSL CLI Version 2.3.2\n" % (time))
+        write("%d [main] INFO  org.linqs.psl.application.inference.InferenceApplication  - Grounding out model.\n" % (time))
+        write("%d [main] DEBUG org.linqs.psl.grounding.Grounding  - Generating candidates.\n" % (time))
+        time += 250
+        write("%d [main] DEBUG org.linqs.psl.grounding.Grounding  - Generated 5 candidates.\n" % (time))
+
+        query = 0
+        while (file.tell() < sizeBytes):
+            time += 10
+            write("%d [main] DEBUG org.linqs.psl.grounding.Grounding  - Grounding 2 rule(s) with query: [%d].\n" % (time, query))
+            write(''.join([TRACE_LINE % (time, i) for i in range(TRACE_LINES_PER_QUERY)]))
+            time += 10
+            write("%d [main] DEBUG org.linqs.psl.grounding.Grounding  - Generated 20 ground rules from 10 query results.\n" % (time))
+            query += 1
+
+        write("%d [main] INFO  org.linqs.psl.application.inference.InferenceApplication  - Generated %d ground rules.\n" % (time, query * 20))
+        write("%d [main] INFO  org.linqs.psl.application.inference.InferenceApplication  - Grounding complete.\n" % (time))
+        time += 100
+        write("%d [main] INFO  org.linqs.psl.util.RuntimeStats  - Used Memory (bytes)  -- Min: 1024, Max: 4096, Mean: 2048, Count: 10\n" % (time))
+
+    return lineCount
+
+def countLines(path):
+    count = 0
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            count += block.count(b"\n")
+    return count
+
+def benchmark(name, function, logPath, lineCount):
+    start = time.perf_counter()
+    results = function(logPath)
+    seconds = time.perf_counter() - start
+
+    print("%s\t%.2f\t%d" % (name, seconds, int(lineCount / seconds)))
+    return results
+
+def main(logPath, sizeGB):
+    if (not os.path.isfile(logPath)):
+        print("Writing a %.2f GB synthetic log to: %s" % (sizeGB, logPath), file = sys.stderr)
+        lineCount = writeLog(logPath, int(sizeGB * BYTES_PER_GB))
+    else:
+        print("Using existing log: %s" % (logPath), file = sys.stderr)
+        lineCount = countLines(logPath)
+
+    parser = scriptloader.loadScript('parse-results')
+
+    print("parser\tseconds\tlines_per_second")
+    before = benchmark('before', legacyParseLog, logPath, lineCount)
+    after = benchmark('after', parser.parseLog, logPath, lineCount)
+
+    if (before != after):
+        raise ValueError("Parsers disagree. Before: %s, After: %s." % (before, after))
+
+def _load_args(args):
+    executable = args.pop(0)
+    if (len(args) > 2 or ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args})):
+        print("USAGE: python3 %s [log path [size (GB)]]" % (executable), file = sys.stderr)
+        print("If the log does not exist, a synthetic one of the given size (default: %.1f GB) will be written." % (DEFAULT_SIZE_GB), file = sys.stderr)
+        sys.exit(1)
+
+    logPath = DEFAULT_LOG_PATH
+    if (len(args) > 0):
+        logPath = args.pop(0)
+
+    sizeGB = DEFAULT_SIZE_GB
+    if (len(args) > 0):
+        sizeGB = float(args.pop(0))
+
+    return logPath, sizeGB
+
+if (__name__ == '__main__'):
+    main(*_load_args(sys.argv))
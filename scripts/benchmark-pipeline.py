@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+# Benchmark the whole results pipeline, one stage at a time:
+# generating a synthetic results tree (generate-results.py), parsing it (parse-results.py, parse-predicate-timings.py, parse-ddi-sim-results.py),
+# and analyzing the parsed results (analyze-results.py, analyze-ddi-results.py).
+# Every stage is run as its own process (the same way it would be run by hand),
+# and the wall time, throughput, and peak memory (max RSS) of each stage is reported.
+# An existing results tree can be benchmarked instead of a synthetic one with --results-dir.
+
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+THIS_DIR = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+
+GENERATE_RESULTS_PATH = os.path.join(THIS_DIR, 'generate-results.py')
+PARSE_RESULTS_PATH = os.path.join(THIS_DIR, 'parse-results.py')
+PARSE_DDI_PATH = os.path.join(THIS_DIR, 'parse-ddi-sim-results.py')
+PARSE_PREDICATES_PATH = os.path.join(THIS_DIR, 'parse-predicate-timings.py')
+ANALYZE_RESULTS_PATH = os.path.join(THIS_DIR, 'analyze-results.py')
+ANALYZE_DDI_PATH = os.path.join(THIS_DIR, 'analyze-ddi-results.py')
+
+DEFAULT_JOBS = 1
+
+DDI_EXAMPLE_DIRNAME = 'example::drug-drug-interaction'
+LOG_FILENAME_PATTERN = 'out.txt*'
+
+BYTES_PER_MB = 1024 ** 2
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class Stage:
+    def __init__(self, name, command, unit, outputPath = None):
+        self.name = name
+        self.command = command
+        self.unit = unit
+        self.outputPath = outputPath
+
+# Run a command and wait for it with wait4(), so we get the resource usage of just that process (and its children).
+# Returns (seconds, peak RSS (bytes)).
+def runStage(stage):
+    stdout = subprocess.DEVNULL
+    if (stage.outputPath is not None):
+        stdout = open(stage.outputPath, 'w')
+
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable] + stage.command, stdout = stdout)
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+
+    # Let Popen know the process is gone.
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    if (stage.outputPath is not None):
+        stdout.close()
+
+    if (process.returncode != 0):
+        raise RuntimeError("Stage '%s' failed (exit code %d): %s" % (stage.name, process.returncode, ' '.join(stage.command)))
+
+    # Linux reports max RSS in KB.
+    return seconds, usage.ru_maxrss * 1024
+
+def countLogs(resultsDir):
+    paths = glob.glob("%s/**/%s" % (glob.escape(resultsDir), LOG_FILENAME_PATTERN), recursive = True)
+    return len(paths), sum([os.path.getsize(path) for path in paths])
+
+# The number of data rows in a TSV.
+def countRows(path):
+    with open(path, 'r') as file:
+        return max(0, sum(1 for line in file if line.strip() != '') - 1)
+
+def findDDIDir(resultsDir):
+    paths = sorted(glob.glob(os.path.join(glob.escape(resultsDir), '*', DDI_EXAMPLE_DIRNAME)))
+    if (len(paths) == 0):
+        return None
+
+    return paths[0]
+
+def getStages(resultsDir, workDir, jobs):
+    tsvPath = os.path.join(workDir, 'results.txt')
+    npzPath = os.path.join(workDir, 'results.npz')
+    cachePath = os.path.join(workDir, 'parse-cache.db')
+    ddiPath = os.path.join(workDir, 'ddi.txt')
+    predicatesPath = os.path.join(workDir, 'predicates.db')
+
+    # [(stage, what to count as the items the stage processed), ...]
+    # 'logs' counts all the logs in the results tree, a dir counts the logs in that dir, and a file counts the rows of that TSV.
+    stages = [
+        (Stage('parse', [PARSE_RESULTS_PATH, '--results-dir', resultsDir, '--jobs', str(jobs), '--output', tsvPath], 'logs'), 'logs'),
+        (Stage('parse (cold cache)', [PARSE_RESULTS_PATH, '--results-dir', resultsDir, '--jobs', str(jobs), '--cache', cachePath, '--output', tsvPath], 'logs'), 'logs'),
+        (Stage('parse (warm cache)', [PARSE_RESULTS_PATH, '--results-dir', resultsDir, '--jobs', str(jobs), '--cache', cachePath, '--output', tsvPath], 'logs'), 'logs'),
+    ]
+
+    if (numpy is not None):
+        stages.append((Stage('parse (npz)', [PARSE_RESULTS_PATH, '--results-dir', resultsDir, '--jobs', str(jobs), '--output', npzPath], 'logs'), 'logs'))
+
+    stages.append((Stage('parse predicates', [PARSE_PREDICATES_PATH, '--results-dir', resultsDir, '--jobs', str(jobs), '--db', predicatesPath], 'logs'), 'logs'))
+
+    stages.append((Stage('analyze (all modes)', [ANALYZE_RESULTS_PATH, '--modes', 'ALL', '--output-dir', os.path.join(workDir, 'analysis'), tsvPath], 'runs'), tsvPath))
+
+    if (numpy is not None):
+        stages.append((Stage('analyze (all modes, npz)', [ANALYZE_RESULTS_PATH, '--modes', 'ALL', '--output-dir', os.path.join(workDir, 'analysis-npz'), npzPath], 'runs'), tsvPath))
+        stages.append((Stage('analyze (numpy backend)', [ANALYZE_RESULTS_PATH, '--backend', 'numpy', '--modes', 'PROPORTIONAL,AGGREGATE', '--output-dir', os.path.join(workDir, 'analysis-numpy'), npzPath], 'runs'), tsvPath))
+
+    ddiDir = findDDIDir(resultsDir)
+    if (ddiDir is not None):
+        stages.append((Stage('parse ddi', [PARSE_DDI_PATH, '--results-dir', ddiDir], 'logs', outputPath = ddiPath), ddiDir))
+        stages.append((Stage('analyze ddi', [ANALYZE_DDI_PATH, ddiPath, 'AGGREGATE'], 'runs'), ddiPath))
+
+    return stages
+
+def main(resultsDir = None, jobs = DEFAULT_JOBS, keep = False):
+    workDir = tempfile.mkdtemp(prefix = 'collective-grounding-benchmark-')
+
+    try:
+        print("stage\tseconds\titems\titems_per_second\tmb_per_second\tpeak_rss_mb")
+
+        def report(name, seconds, items, unit, numBytes, peakRSS):
+            mbPerSecond = ''
+            if (numBytes is not None):
+                mbPerSecond = "%.1f" % (numBytes / BYTES_PER_MB / seconds)
+
+            print("%s\t%.2f\t%d %s\t%.1f\t%s\t%.1f" % (name, seconds, items, unit, items / seconds, mbPerSecond, peakRSS / BYTES_PER_MB))
+            sys.stdout.flush()
+
+        if (resultsDir is None):
+            resultsDir = os.path.join(workDir, 'results')
+            stage = Stage('generate', [GENERATE_RESULTS_PATH, '--results-dir', resultsDir], 'logs')
+
+            seconds, peakRSS = runStage(stage)
+            numLogs, numBytes = countLogs(resultsDir)
+            report(stage.name, seconds, numLogs, stage.unit, numBytes, peakRSS)
+
+        numLogs, numBytes = countLogs(resultsDir)
+
+        for (stage, itemSource) in getStages(resultsDir, workDir, jobs):
+            seconds, peakRSS = runStage(stage)
+
+            if (itemSource == 'logs'):
+                items, itemBytes = numLogs, numBytes
+            elif (os.path.isdir(itemSource)):
+                items, itemBytes = countLogs(itemSource)
+            else:
+                items, itemBytes = countRows(itemSource), os.path.getsize(itemSource)
+
+            report(stage.name, seconds, items, stage.unit, itemBytes, peakRSS)
+    finally:
+        if (keep):
+            print("Kept the benchmark output in: %s" % (workDir), file = sys.stderr)
+        else:
+            shutil.rmtree(workDir)
+
+def _usage(executable):
+    print("USAGE: python3 %s [--results-dir <dir>] [--jobs <num jobs>] [--keep]" % (executable), file = sys.stderr)
+    print("    --results-dir - Benchmark an existing results tree instead of generating one (with generate-results.py defaults).", file = sys.stderr)
+    print("    --jobs - The number of processes to parse with (0 for one per core). Default: %d." % (DEFAULT_JOBS), file = sys.stderr)
+    print("    --keep - Keep the generated results and the output of each stage (the path is printed at the end).", file = sys.stderr)
+    sys.exit(1)
+
+def _load_args(args):
+    executable = args.pop(0)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable)
+
+    options = {}
+
+    while (len(args) > 0):
+        arg = args.pop(0)
+
+        if (arg == '--results-dir' and len(args) > 0):
+            options['resultsDir'] = os.path.abspath(args.pop(0))
+            if (not os.path.isdir(options['resultsDir'])):
+                raise ValueError("Can't find the specified results dir: " + options['resultsDir'])
+        elif (arg == '--jobs' and len(args) > 0):
+            options['jobs'] = int(args.pop(0))
+            if (options['jobs'] < 0):
+                raise ValueError("Number of jobs must be non-negative, got: %d." % (options['jobs']))
+
+            if (options['jobs'] == 0):
+                options['jobs'] = os.cpu_count()
+        elif (arg == '--keep'):
+            options['keep'] = True
+        else:
+            _usage(executable)
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
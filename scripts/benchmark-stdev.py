@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# Benchmark the SQL standard deviation of the analyzers (MEAN_STDEV_SQL) against the original Python aggregate (StdevFunc).
+# A synthetic Stats-like table is filled with random values and grouped the same way the AGGREGATE modes group runs,
+# then the mean and standard deviation of every column are computed once with each implementation.
+# The results of both implementations are checked to be the same (within float tolerance), and the time of each is reported.
+
+import math
+import random
+import sqlite3
+import sys
+import time
+
+import scriptloader
+
+DEFAULT_NUM_ROWS = 1000000
+NUM_GROUPS = 1000
+NUM_COLUMNS = 6
+
+# Rows are occasionally NULL and some groups only get a single row, to exercise the NULL cases.
+NULL_CHANCE = 0.01
+
+# One group only gets these (large, nearly equal) values, where computing the variance from sums of squares cancels out to zero.
+NEAR_CONSTANT_VALUES = [3284926464, 3284926465, 3284926466]
+
+RELATIVE_TOLERANCE = 1e-9
+ABSOLUTE_TOLERANCE = 1e-6
+
+SEED = 4
+
+def buildDatabase(numRows):
+    rng = random.Random(SEED)
+    columns = ["value_%d" % (i) for i in range(NUM_COLUMNS)]
+
+    connection = sqlite3.connect(':memory:')
+    connection.execute("CREATE TABLE Stats (groupId INT, %s)" % (', '.join(["%s INT" % (column) for column in columns])))
+
+    def rows():
+        for value in NEAR_CONSTANT_VALUES:
+            yield [NUM_GROUPS - 2] + [value] * NUM_COLUMNS
+
+        for i in range(numRows):
+            # The last group only ever gets one row.
+            groupId = rng.randrange(NUM_GROUPS - 2)
+            if (i == 0):
+                groupId = NUM_GROUPS - 1
+
+            values = []
+            for column in range(NUM_COLUMNS):
+                if (rng.random() < NULL_CHANCE):
+                    values.append(None)
+                else:
+                    # Magnitudes similar to the real columns (ms runtimes up to byte counts).
+                    values.append(int(rng.lognormvariate(10 + column * 2, 1)))
+
+            yield [groupId] + values
+
+    connection.executemany("INSERT INTO Stats VALUES (%s)" % (', '.join(['?'] * (NUM_COLUMNS + 1))), rows())
+    connection.commit()
+
+    return connection, columns
+
+# The same query as the analyzers would run, with the UDF (STDEV()) or in plain SQL (like the analyzers).
+def getQueries(analyzer, columns):
+    udfQuery = "SELECT groupId, %s FROM Stats GROUP BY groupId ORDER BY groupId" % (', '.join(["AVG(%s), STDEV(%s)" % (column, column) for column in columns]))
+
+    sqlQuery = '''
+        SELECT
+            S.groupId,''' + analyzer.getMeanStdevColumns(columns) + '''
+        FROM
+            (
+                SELECT
+                    S.*,''' + analyzer.getGroupMeanColumns(columns) + '''
+                FROM Stats S
+                WINDOW GroupWindow AS (
+                    PARTITION BY S.groupId
+                )
+            ) S
+        GROUP BY S.groupId
+        ORDER BY S.groupId
+    '''
+
+    return udfQuery, sqlQuery
+
+def benchmark(name, connection, query):
+    start = time.perf_counter()
+    rows = connection.execute(query).fetchall()
+    seconds = time.perf_counter() - start
+
+    print("%s\t%.2f" % (name, seconds))
+    return rows
+
+def main(numRows):
+    analyzer = scriptloader.loadScript('analyze-results')
+
+    print("Building a synthetic Stats table with %d rows." % (numRows), file = sys.stderr)
+    connection, columns = buildDatabase(numRows)
+    udfQuery, sqlQuery = getQueries(analyzer, columns)
+
+    connection.create_aggregate("STDEV", 1, analyzer.StdevFunc)
+    analyzer.addSqrt(connection)
+
+    print("stdev\tseconds")
+    before = benchmark('python', connection, udfQuery)
+    after = benchmark('sql', connection, sqlQuery)
+
+    if (len(before) != len(after)):
+        raise ValueError("Implementations disagree on the number of groups. Python: %d, SQL: %d." % (len(before), len(after)))
+
+    for (beforeRow, afterRow) in zip(before, after):
+        for (beforeValue, afterValue) in zip(beforeRow, afterRow):
+            if (beforeValue is None or afterValue is None):
+                same = (beforeValue is None and afterValue is None)
+            else:
+                same = math.isclose(beforeValue, afterValue, rel_tol = RELATIVE_TOLERANCE, abs_tol = ABSOLUTE_TOLERANCE)
+
+            if (not same):
+                raise ValueError("Implementations disagree. Python: %s, SQL: %s." % (beforeRow, afterRow))
+
+def _load_args(args):
+    executable = args.pop(0)
+    if (len(args) > 1 or ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args})):
+        print("USAGE: python3 %s [num rows]" % (executable), file = sys.stderr)
+        print("The synthetic Stats table has %d rows by default." % (DEFAULT_NUM_ROWS), file = sys.stderr)
+        sys.exit(1)
+
+    numRows = DEFAULT_NUM_ROWS
+    if (len(args) > 0):
+        numRows = int(args.pop(0))
+
+    return numRows,
+
+if (__name__ == '__main__'):
+    main(*_load_args(sys.argv))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+# Calibrate the cost model of the search space viz (viz/search-space) from measured runs.
+# The viz estimates the time of a query from Postgres' estimates of its cost and rows:
+#   time = QUERY_COST_MULTIPLIER * cost + INSTANTIATION_COST_MULTIPLIER * rows
+# (with optimistic and pessimistic multipliers).
+# This fits those multipliers for each example, using the grounding queries that have been replayed with explain-queries.py:
+# the estimated cost and rows come from each query's plan (explain.json),
+# and the measured time is the average time of the query in the run's log (explain.txt, from parse-query-profiles.py).
+#
+# The multipliers are fit with (non-negative) least squares.
+# The optimistic and pessimistic multipliers are the fit scaled by the OPTIMISTIC_QUANTILE and PESSIMISTIC_QUANTILE
+# of the ratios between the measured and fit times (so about half of the queries fall between them).
+#
+# The output is JSON that the viz loads (viz/search-space/calibration.json by default):
+#   {'examples': {example: {
+#       'samples': number of queries, 'r2': R^2 of the fit,
+#       'fit' | 'optimistic' | 'pessimistic': {'query_cost_multiplier': value, 'instantiation_cost_multiplier': value},
+#   }, ...}}
+
+import glob
+import json
+import os
+import sys
+
+import scriptloader
+
+THIS_DIR = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+RESULTS_DIR = os.path.join(THIS_DIR, '..', 'results')
+DEFAULT_OUTPUT_PATH = os.path.join(THIS_DIR, '..', 'viz', 'search-space', 'calibration.json')
+
+# Examples with fewer (replayed) queries than this are not calibrated.
+MIN_SAMPLES = 3
+
+OPTIMISTIC_QUANTILE = 0.25
+PESSIMISTIC_QUANTILE = 0.75
+
+# Read the replayed queries of a run (the output of explain-queries.py).
+# Returns [(estimated cost, estimated rows, measured time (ms)), ...].
+def readRun(runDir):
+    explainer = scriptloader.loadScript('explain-queries')
+
+    summaryPath = os.path.join(runDir, explainer.SUMMARY_FILENAME)
+    if (not os.path.isfile(summaryPath)):
+        return []
+
+    with open(os.path.join(runDir, explainer.PLANS_FILENAME), 'r') as file:
+        plans = json.load(file)
+
+    samples = []
+
+    with open(summaryPath, 'r') as file:
+        header = None
+        for line in file:
+            row = line.rstrip("\n").split("\t")
+
+            if (header is None):
+                header = row
+                continue
+
+            row = dict(zip(header, row))
+
+            plan = plans.get(row['sql_hash'], {}).get('plan')
+            if (plan is None or row['num_queries'] in ('', '0')):
+                continue
+
+            samples.append((
+                float(plan['Plan']['Total Cost']),
+                float(plan['Plan']['Plan Rows']),
+                int(row['query_time']) / int(row['num_queries']),
+            ))
+
+    return samples
+
+# {example: [(estimated cost, estimated rows, measured time), ...], ...}
+def fetchSamples(resultsDir = RESULTS_DIR):
+    plansFilename = scriptloader.loadScript('explain-queries').PLANS_FILENAME
+    parser = scriptloader.loadScript('parse-results')
+    samples = {}
+
+    for path in sorted(glob.glob("%s/**/%s" % (glob.escape(resultsDir), plansFilename), recursive = True)):
+        identifiers = parser.getIdentifiersFromPath(path)
+        if ('example' not in identifiers):
+            continue
+
+        samples.setdefault(identifiers['example'], []).extend(readRun(os.path.dirname(path)))
+
+    return samples
+
+def getSSE(samples, queryMultiplier, instantiationMultiplier):
+    return sum([(time - queryMultiplier * cost - instantiationMultiplier * rows) ** 2 for (cost, rows, time) in samples])
+
+# Fit time = a * cost + b * rows (with a, b >= 0) by least squares.
+# Returns (a, b).
+def fit(samples):
+    costCost = sum([cost * cost for (cost, rows, time) in samples])
+    costRows = sum([cost * rows for (cost, rows, time) in samples])
+    rowsRows = sum([rows * rows for (cost, rows, time) in samples])
+    costTime = sum([cost * time for (cost, rows, time) in samples])
+    rowsTime = sum([rows * time for (cost, rows, time) in samples])
+
+    # The non-negative solution is either the unconstrained one, one with a single multiplier, or zero.
+    candidates = [(0.0, 0.0)]
+
+    if (costCost > 0.0):
+        candidates.append((costTime / costCost, 0.0))
+
+    if (rowsRows > 0.0):
+        candidates.append((0.0, rowsTime / rowsRows))
+
+    determinant = costCost * rowsRows - costRows * costRows
+    if (determinant > 0.0):
+        candidates.append((
+            (costTime * rowsRows - rowsTime * costRows) / determinant,
+            (rowsTime * costCost - costTime * costRows) / determinant,
+        ))
+
+    candidates = [candidate for candidate in candidates if candidate[0] >= 0.0 and candidate[1] >= 0.0]
+    return min(candidates, key = lambda candidate: getSSE(samples, *candidate))
+
+# A quantile (with linear interpolation) of some values.
+def quantile(values, q):
+    values = sorted(values)
+
+    position = q * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def getMultipliers(queryMultiplier, instantiationMultiplier, scale = 1.0):
+    return {
+        'query_cost_multiplier': queryMultiplier * scale,
+        'instantiation_cost_multiplier': instantiationMultiplier * scale,
+    }
+
+def calibrate(samples):
+    queryMultiplier, instantiationMultiplier = fit(samples)
+
+    meanTime = sum([time for (cost, rows, time) in samples]) / len(samples)
+    totalSS = sum([(time - meanTime) ** 2 for (cost, rows, time) in samples])
+
+    r2 = None
+    if (totalSS > 0.0):
+        r2 = 1.0 - getSSE(samples, queryMultiplier, instantiationMultiplier) / totalSS
+
+    ratios = []
+    for (cost, rows, time) in samples:
+        estimate = queryMultiplier * cost + instantiationMultiplier * rows
+        if (estimate > 0.0):
+            ratios.append(time / estimate)
+
+    optimisticScale = 1.0
+    pessimisticScale = 1.0
+    if (len(ratios) > 0):
+        optimisticScale = quantile(ratios, OPTIMISTIC_QUANTILE)
+        pessimisticScale = quantile(ratios, PESSIMISTIC_QUANTILE)
+
+    return {
+        'samples': len(samples),
+        'r2': r2,
+        'fit': getMultipliers(queryMultiplier, instantiationMultiplier),
+        'optimistic': getMultipliers(queryMultiplier, instantiationMultiplier, optimisticScale),
+        'pessimistic': getMultipliers(queryMultiplier, instantiationMultiplier, pessimisticScale),
+    }
+
+def main(resultsDir = RESULTS_DIR, outputPath = DEFAULT_OUTPUT_PATH):
+    calibrations = {}
+
+    for (example, samples) in sorted(fetchSamples(resultsDir).items()):
+        if (len(samples) < MIN_SAMPLES):
+            print("Skipping %s, only %d replayed queries (need %d)." % (example, len(samples), MIN_SAMPLES), file = sys.stderr)
+            continue
+
+        calibrations[example] = calibrate(samples)
+
+        print("%s -- Samples: %d, Query cost multiplier: %.6f, Instantiation cost multiplier: %.6f." % (
+                example, len(samples), calibrations[example]['fit']['query_cost_multiplier'],
+                calibrations[example]['fit']['instantiation_cost_multiplier']), file = sys.stderr)
+
+    if (len(calibrations) == 0):
+        print("No examples have enough replayed queries (see explain-queries.py), nothing written.", file = sys.stderr)
+        return
+
+    with open(outputPath, 'w') as file:
+        json.dump({'examples': calibrations}, file, indent = 4)
+
+def _usage(executable):
+    print("USAGE: python3 %s [--results-dir <dir>] [--output <path>]" % (executable), file = sys.stderr)
+    print("    --results-dir - Where to look for runs replayed with explain-queries.py. Default: %s." % (RESULTS_DIR), file = sys.stderr)
+    print("    --output - Where to write the calibration (JSON). Default: %s." % (DEFAULT_OUTPUT_PATH), file = sys.stderr)
+    sys.exit(1)
+
+def _load_args(args):
+    executable = args.pop(0)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable)
+
+    options = {}
+
+    while (len(args) > 0):
+        arg = args.pop(0)
+
+        if (arg == '--results-dir' and len(args) > 0):
+            options['resultsDir'] = args.pop(0)
+            if (not os.path.isdir(options['resultsDir'])):
+                raise ValueError("Can't find the specified results dir: " + options['resultsDir'])
+        elif (arg == '--output' and len(args) > 0):
+            options['outputPath'] = args.pop(0)
+        else:
+            _usage(executable)
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
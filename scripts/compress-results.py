@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+# Compress the large outputs of finished runs in place.
+# The logs (out.txt, out.err) and inferred predicates of every finished run are replaced with compressed copies.
+# The parsers (parse-results.py and parse-ddi-sim-results.py) read the compressed logs directly,
+# and the run scripts will not re-run a run that has a compressed log.
+# A run is considered finished if its log has the final RuntimeStats line and /usr/bin/time has written its output.
+
+import glob
+import gzip
+import multiprocessing
+import os
+import shutil
+import sys
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+import scriptloader
+
+THIS_DIR = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+RESULTS_DIR = os.path.join(THIS_DIR, '..', 'results')
+
+LOG_FILENAME = 'out.txt'
+ERR_FILENAME = 'out.err'
+TIME_FILENAME = 'time.txt'
+INFERRED_PREDICATES_DIRNAME = 'inferred-predicates'
+
+DEFAULT_JOBS = 1
+DEFAULT_FORMAT = 'gz'
+
+# {format: (extension, default level), ...}
+FORMATS = {
+    'gz': ('.gz', 6),
+    'zst': ('.zst', 10),
+}
+
+BUFFER_SIZE = 1024 * 1024
+
+# Get all the run directories that have finished and still have an uncompressed log.
+def findRuns(parser, resultsDir = RESULTS_DIR):
+    runDirs = []
+
+    for logPath in sorted(glob.glob("%s/**/%s" % (glob.escape(resultsDir), LOG_FILENAME), recursive = True)):
+        runDir = os.path.dirname(logPath)
+
+        if (not os.path.isfile(os.path.join(runDir, TIME_FILENAME))):
+            continue
+
+        if (not parser.isFinished(logPath)):
+            continue
+
+        runDirs.append(runDir)
+
+    return runDirs
+
+# Compress a single file, replacing the original.
+# The compressed file is written under a temp name and moved into place before the original is removed,
+# so a crash never leaves a run without a complete log.
+# Returns the number of bytes saved.
+def compressFile(path, format, level):
+    extension = FORMATS[format][0]
+    outPath = path + extension
+    tempPath = outPath + '.tmp'
+
+    with open(path, 'rb') as inFile:
+        if (format == 'gz'):
+            with gzip.open(tempPath, 'wb', compresslevel = level) as outFile:
+                shutil.copyfileobj(inFile, outFile, BUFFER_SIZE)
+        else:
+            with open(tempPath, 'wb') as outFile:
+                zstandard.ZstdCompressor(level = level).copy_stream(inFile, outFile, read_size = BUFFER_SIZE, write_size = BUFFER_SIZE)
+
+    # Keep the original mtime so the compressed log does not look like new output.
+    shutil.copystat(path, tempPath)
+    os.replace(tempPath, outPath)
+
+    savedBytes = os.path.getsize(path) - os.path.getsize(outPath)
+    os.remove(path)
+
+    return savedBytes
+
+# Returns (run dir, bytes saved).
+def compressRun(args):
+    runDir, format, level = args
+
+    paths = [os.path.join(runDir, ERR_FILENAME)]
+    paths += sorted(glob.glob(os.path.join(runDir, INFERRED_PREDICATES_DIRNAME, '*')))
+
+    savedBytes = 0
+
+    for path in paths:
+        if (os.path.isfile(path) and not path.endswith(FORMATS[format][0])):
+            savedBytes += compressFile(path, format, level)
+
+    # The log goes last, since it marks the run as still needing compression.
+    savedBytes += compressFile(os.path.join(runDir, LOG_FILENAME), format, level)
+
+    return runDir, savedBytes
+
+def main(jobs = DEFAULT_JOBS, format = DEFAULT_FORMAT, level = None, resultsDir = RESULTS_DIR):
+    if (format == 'zst' and zstandard is None):
+        raise ImportError("The zstandard package is required to compress with zstd.")
+
+    if (level is None):
+        level = FORMATS[format][1]
+
+    runDirs = findRuns(scriptloader.loadScript('parse-results'), resultsDir)
+    work = [(runDir, format, level) for runDir in runDirs]
+
+    totalSavedBytes = 0
+
+    with multiprocessing.Pool(jobs) as pool:
+        for (runDir, savedBytes) in pool.imap_unordered(compressRun, work):
+            totalSavedBytes += savedBytes
+            print("Compressed %s (saved %d bytes)." % (runDir, savedBytes))
+
+    print("Compressed %d runs, saved %d bytes total." % (len(runDirs), totalSavedBytes))
+
+def _usage(executable):
+    print("USAGE: python3 %s [--results-dir <dir>] [--jobs <num jobs>] [--format <%s>] [--level <level>]" % (executable, '|'.join(FORMATS)), file = sys.stderr)
+    print("    --results-dir - Where to look for finished runs. Default: %s." % (RESULTS_DIR), file = sys.stderr)
+    print("    --jobs - The number of runs to compress at once (0 for one per core). Default: %d." % (DEFAULT_JOBS), file = sys.stderr)
+    print("    --format - The compression format. Default: %s." % (DEFAULT_FORMAT), file = sys.stderr)
+    print("    --level - The compression level. Default: %s." % (', '.join(["%s: %d" % (format, level) for (format, (extension, level)) in FORMATS.items()])), file = sys.stderr)
+    sys.exit(1)
+
+def _load_args(args):
+    executable = args.pop(0)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable)
+
+    options = {}
+
+    while (len(args) > 0):
+        arg = args.pop(0)
+
+        if (arg == '--jobs' and len(args) > 0):
+            options['jobs'] = int(args.pop(0))
+            if (options['jobs'] < 0):
+                raise ValueError("Number of jobs must be non-negative, got: %d." % (options['jobs']))
+
+            if (options['jobs'] == 0):
+                options['jobs'] = os.cpu_count()
+        elif (arg == '--results-dir' and len(args) > 0):
+            options['resultsDir'] = args.pop(0)
+            if (not os.path.isdir(options['resultsDir'])):
+                raise ValueError("Can't find the specified results dir: " + options['resultsDir'])
+        elif (arg == '--format' and len(args) > 0):
+            options['format'] = args.pop(0).lower()
+            if (options['format'] not in FORMATS):
+                raise ValueError("Unknown format: '%s'." % (options['format']))
+        elif (arg == '--level' and len(args) > 0):
+            options['level'] = int(args.pop(0))
+        else:
+            _usage(executable)
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+# Replay the grounding queries of runs with EXPLAIN (ANALYZE, BUFFERS), to see why queries are slow (not just that they are).
+# The distinct grounding SQL of a run is pulled out of its log (the same way as parse-query-profiles.py, so only finished runs are replayed),
+# and each query is explained against a Postgres database with the example's data loaded (through psql).
+# PSL's tables (and the partitions in the SQL) must match the run, so the simplest way to get such a database is to replay right after a run of the same example
+# (e.g. with `./scripts/run-parallel.py`, each worker's database is left as it was after its last run).
+# Note that EXPLAIN ANALYZE actually runs every query, so use --timeout to cap the time spent on any one query.
+#
+# The output is written next to each run:
+#  - explain.json - {sql hash: {'sql': sql, 'plan': plan (Postgres' JSON format) or None, 'error': error or None}, ...}
+#  - explain.txt - A TSV with a row per distinct query (slowest in the log first): the time PSL spent on it,
+#    the planning and execution time of the replay, the estimated and actual rows of the result,
+#    the worst row estimate error of any node in the plan (max(estimated, actual) / min(estimated, actual), per loop),
+#    and the shared buffer hits/reads and temp blocks written.
+
+import json
+import os
+import subprocess
+import sys
+
+import scriptloader
+
+POSTGRES_DB = 'psl'
+POSTGRES_USER = 'psl'
+
+DEFAULT_TIMEOUT_SECONDS = 600
+
+PLANS_FILENAME = 'explain.json'
+SUMMARY_FILENAME = 'explain.txt'
+
+EXPLAIN_COMMAND = 'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) '
+
+HEADER = [
+    'sql_hash',
+    'num_queries',
+    'query_time',
+    'planning_time',
+    'execution_time',
+    'estimated_rows',
+    'actual_rows',
+    'max_estimate_error',
+    'max_estimate_error_node',
+    'shared_hit_blocks',
+    'shared_read_blocks',
+    'temp_written_blocks',
+    'error',
+]
+
+# Get the log of a run dir (or just use the given log).
+def findLog(path):
+    if (os.path.isfile(path)):
+        return path
+
+    for filename in scriptloader.loadScript('parse-results').LOG_FILENAMES:
+        logPath = os.path.join(path, filename)
+        if (os.path.isfile(logPath)):
+            return logPath
+
+    return None
+
+# Get the distinct queries of a run, slowest (by total time in the log) first.
+# Returns [(sql hash, sql, number of times it was run, total time), ...] or None if the run did not finish.
+def getQueries(logPath):
+    profiler = scriptloader.loadScript('parse-query-profiles')
+    result = profiler.parseLog(logPath)
+    if (result is None):
+        return None
+
+    rows, statements = result
+
+    hashIndex = profiler.HEADER.index('sql_hash')
+    timeIndex = profiler.HEADER.index('query_time')
+
+    # {sql hash: [count, time], ...}
+    totals = {}
+    for row in rows:
+        if (row[hashIndex] == ''):
+            continue
+
+        total = totals.setdefault(row[hashIndex], [0, 0])
+        total[0] += 1
+        if (row[timeIndex] != ''):
+            total[1] += row[timeIndex]
+
+    queries = [(sqlHash, statements[sqlHash], count, time) for (sqlHash, (count, time)) in totals.items()]
+    return sorted(queries, key = lambda query: (-query[3], query[0]))
+
+# Run EXPLAIN on a query through psql.
+# Returns (plan, error), one of which is None.
+def explain(sql, database, timeoutSeconds):
+    env = dict(os.environ)
+    env['PGOPTIONS'] = ("%s -c statement_timeout=%d" % (env.get('PGOPTIONS', ''), timeoutSeconds * 1000)).strip()
+
+    command = ['psql', '-U', POSTGRES_USER, '-d', database, '-X', '-q', '-A', '-t', '-v', 'ON_ERROR_STOP=1', '-c', EXPLAIN_COMMAND + sql]
+    process = subprocess.run(command, stdout = subprocess.PIPE, stderr = subprocess.PIPE, universal_newlines = True, env = env)
+
+    if (process.returncode != 0):
+        lines = process.stderr.strip().splitlines()
+        return None, (lines[0] if len(lines) > 0 else "psql exited with %d." % (process.returncode))
+
+    return json.loads(process.stdout)[0], None
+
+def getNodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from getNodes(child)
+
+# Get the summary columns (everything in HEADER after the query time) of an explained query.
+def summarizePlan(plan):
+    root = plan['Plan']
+
+    worstError = None
+    worstNode = None
+
+    for node in getNodes(root):
+        # Both are per loop.
+        estimated = max(1.0, float(node['Plan Rows']))
+        actual = max(1.0, float(node['Actual Rows']))
+
+        error = max(estimated, actual) / min(estimated, actual)
+        if (worstError is None or error > worstError):
+            worstError = error
+            worstNode = node['Node Type']
+
+    return [
+        plan.get('Planning Time', ''),
+        plan.get('Execution Time', ''),
+        root['Plan Rows'],
+        root['Actual Rows'] * root['Actual Loops'],
+        "%.2f" % (worstError),
+        worstNode,
+        root.get('Shared Hit Blocks', ''),
+        root.get('Shared Read Blocks', ''),
+        root.get('Temp Written Blocks', ''),
+        '',
+    ]
+
+def explainRun(path, database = POSTGRES_DB, timeoutSeconds = DEFAULT_TIMEOUT_SECONDS, limit = None):
+    logPath = findLog(path)
+    if (logPath is None):
+        print("Could not find a log for: %s" % (path), file = sys.stderr)
+        return
+
+    queries = getQueries(logPath)
+    if (queries is None):
+        print("Skipping unfinished run: %s" % (logPath), file = sys.stderr)
+        return
+
+    if (limit is not None):
+        queries = queries[:limit]
+
+    plans = {}
+    rows = []
+
+    for (i, (sqlHash, sql, count, time)) in enumerate(queries):
+        print("Explaining query %d of %d (%s) for %s." % (i + 1, len(queries), sqlHash, logPath), file = sys.stderr)
+
+        plan, error = explain(sql, database, timeoutSeconds)
+        plans[sqlHash] = {'sql': sql, 'plan': plan, 'error': error}
+
+        row = [sqlHash, count, time]
+        if (plan is None):
+            row += [''] * (len(HEADER) - len(row) - 1) + [error.replace("\t", ' ')]
+        else:
+            row += summarizePlan(plan)
+
+        rows.append(row)
+
+    outDir = os.path.dirname(logPath)
+
+    with open(os.path.join(outDir, PLANS_FILENAME), 'w') as file:
+        json.dump(plans, file, indent = 4)
+
+    with open(os.path.join(outDir, SUMMARY_FILENAME), 'w') as file:
+        print("\t".join(HEADER), file = file)
+        for row in rows:
+            print("\t".join(map(str, row)), file = file)
+
+def main(paths, database = POSTGRES_DB, timeoutSeconds = DEFAULT_TIMEOUT_SECONDS, limit = None):
+    for path in paths:
+        explainRun(path, database = database, timeoutSeconds = timeoutSeconds, limit = limit)
+
+def _usage(executable):
+    print("USAGE: python3 %s [--database <name>] [--timeout <seconds>] [--limit <num queries>] <run dir> [<run dir> ...]" % (executable), file = sys.stderr)
+    print("    --database - The Postgres database (with the example's data loaded) to replay against. Default: %s." % (POSTGRES_DB), file = sys.stderr)
+    print("    --timeout - Stop replaying a query after this many seconds. Default: %d." % (DEFAULT_TIMEOUT_SECONDS), file = sys.stderr)
+    print("    --limit - Only replay this many of the slowest (in the log) distinct queries of each run.", file = sys.stderr)
+    print("    <run dir> - The output dir of a run (or its log).", file = sys.stderr)
+    sys.exit(1)
+
+def _load_args(args):
+    executable = args.pop(0)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable)
+
+    options = {}
+
+    while (len(args) > 0 and args[0].startswith('--')):
+        arg = args.pop(0)
+
+        if (arg == '--database' and len(args) > 0):
+            options['database'] = args.pop(0)
+        elif (arg == '--timeout' and len(args) > 0):
+            options['timeoutSeconds'] = int(args.pop(0))
+            if (options['timeoutSeconds'] <= 0):
+                raise ValueError("Timeout must be positive, got: %d." % (options['timeoutSeconds']))
+        elif (arg == '--limit' and len(args) > 0):
+            options['limit'] = int(args.pop(0))
+            if (options['limit'] <= 0):
+                raise ValueError("Limit must be positive, got: %d." % (options['limit']))
+        else:
+            _usage(executable)
+
+    if (len(args) == 0):
+        _usage(executable)
+
+    options['paths'] = args
+    for path in options['paths']:
+        if (not os.path.exists(path)):
+            raise ValueError("Can't find the specified run: " + path)
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
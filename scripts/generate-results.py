@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+
+# Generate a synthetic results tree, laid out the same way as the output of the run scripts:
+#   <results dir>/experiment::<experiment>/example::<example>/iteration::<iteration>/split::<split>/collective::false/
+#   <results dir>/experiment::<experiment>/example::<example>/iteration::<iteration>/split::<split>/collective::true/candidate_count::<count>/search_budget::<budget>/search_type::<type>/
+# Each run gets an out.txt (a PSL 2.3.2 log with the lines that parse-results.py looks for and TRACE-level SQL noise),
+# an empty out.err, and a time.txt (in the format of /usr/bin/time -v).
+# The drug-drug-interaction runs also query each of the similarity predicates (for parse-ddi-sim-results.py).
+# A small fraction of runs are left unfinished (cut off after grounding, without a time.txt).
+# This is meant for benchmarking the parse and analysis scripts without running real experiments.
+
+import os
+import random
+import sys
+import tempfile
+
+# Keep the synthetic results out of the real results directory so they never get mixed in with real runs.
+DEFAULT_RESULTS_DIR = os.path.join(tempfile.gettempdir(), 'collective-grounding-synthetic-results')
+
+DEFAULT_EXPERIMENT = 'first-split'
+
+# The example that parse-ddi-sim-results.py looks at is always generated first.
+DDI_EXAMPLE = 'drug-drug-interaction'
+EXAMPLES = [
+    DDI_EXAMPLE,
+    'citeseer',
+    'cora',
+    'epinions',
+    'friendship',
+    'imdb-er',
+    'jester',
+    'knowledge-graph-identification',
+    'lastfm',
+    'yelp',
+]
+
+# The same as parse-ddi-sim-results.py.
+DDI_SIMILARITIES = [
+    'ATC',
+    'CHEMICAL',
+    'DIST',
+    'GO',
+    'LIGAND',
+    'SEQ',
+    'SIDEEFFECT',
+]
+
+# The hyperparams from run-all-splits.sh.
+# The ones that parse-ddi-sim-results.py uses for collective runs go first, so they are always generated.
+CANDIDATE_COUNTS = ['05', '01', '02', '03', '04']
+SEARCH_BUDGETS = ['05', '01', '03', '07', '09']
+SEARCH_TYPES = ['BoundedDFS', 'BFS', 'DFS', 'UCS', 'BoundedUCS']
+
+DEFAULT_NUM_EXAMPLES = len(EXAMPLES)
+DEFAULT_NUM_ITERATIONS = 11
+DEFAULT_NUM_SPLITS = 1
+DEFAULT_NUM_HYPERPARAMS = 25
+DEFAULT_NUM_QUERIES = 20
+DEFAULT_TRACE_LINES = 10
+DEFAULT_UNFINISHED_RATE = 0.01
+
+SEED = 4
+
+LOG_FILENAME = 'out.txt'
+ERR_FILENAME = 'out.err'
+TIME_FILENAME = 'time.txt'
+
+LINE_FORMAT = "%-4d [main] %s\n"
+
+QUERY_LINE = "TRACE org.linqs.psl.database.rdbms.RDBMSDatabase  - SELECT DISTINCT T0.STRING_0 AS A, T1.STRING_1 AS B FROM %s T0, %s T1 WHERE T0.STRING_1 = T1.STRING_0 AND T0.PARTITION_ID IN (%d, 1) AND T1.PARTITION_ID IN (0, 1)"
+NOISE_LINE = "TRACE org.linqs.psl.database.rdbms.RDBMSDatabase  - INSERT INTO %s (STRING_0, STRING_1, VALUE, PARTITION_ID) VALUES ('%d', '%d', %.4f, 2)"
+PREDICATES = ['LINK_PREDICATE', 'SIMILAR_PREDICATE', 'LABEL_PREDICATE', 'KNOWS_PREDICATE']
+
+TIME_TEMPLATE = '''\tCommand being timed: "./run.sh %s"
+\tUser time (seconds): %.2f
+\tSystem time (seconds): %.2f
+\tPercent of CPU this job got: %d%%
+\tElapsed (wall clock) time (h:mm:ss or m:ss): %d:%05.2f
+\tAverage shared text size (kbytes): 0
+\tAverage unshared data size (kbytes): 0
+\tAverage stack size (kbytes): 0
+\tAverage total size (kbytes): 0
+\tMaximum resident set size (kbytes): %d
+\tAverage resident set size (kbytes): 0
+\tMajor (requiring I/O) page faults: %d
+\tMinor (reclaiming a frame) page faults: %d
+\tVoluntary context switches: %d
+\tInvoluntary context switches: %d
+\tSwaps: 0
+\tFile system inputs: %d
+\tFile system outputs: %d
+\tSocket messages sent: 0
+\tSocket messages received: 0
+\tSignals delivered: 0
+\tPage size (bytes): 4096
+\tExit status: 0
+'''
+
+# Get the (collective, out dir suffix, PSL options) for every run of one (example, iteration, split).
+def getRunSettings(numHyperparams):
+    settings = [(False, 'collective::false', '-D grounding.collective=false')]
+
+    for searchType in SEARCH_TYPES:
+        for searchBudget in SEARCH_BUDGETS:
+            for candidateCount in CANDIDATE_COUNTS:
+                if (len(settings) > numHyperparams):
+                    return settings
+
+                outDir = os.path.join('collective::true', 'candidate_count::' + candidateCount, 'search_budget::' + searchBudget, 'search_type::' + searchType)
+                options = "-D grounding.collective=true -D grounding.collective.candidate.count=%s -D grounding.collective.candidate.search.budget=%s -D grounding.collective.candidate.search.type=%s" % (candidateCount, searchBudget, searchType)
+                settings.append((True, outDir, options))
+
+    return settings
+
+# Build the log of a single run.
+# Returns (log text, finished, runtime (ms), max memory (bytes)).
+def buildLog(rng, example, collective, numQueries, traceLines, scale, unfinishedRate):
+    lines = []
+    time = 0
+
+    def add(text):
+        lines.append(LINE_FORMAT % (time, text))
+
+    add("INFO  org.linqs.psl.cli.Launcher  - Running PSL CLI Version 2.3.2")
+    time += rng.randint(200, 800)
+    add("INFO  org.linqs.psl.cli.Launcher  - Loading data")
+    time += int(rng.uniform(500, 2000) * scale)
+    add("INFO  org.linqs.psl.cli.Launcher  - Data loading complete")
+    add("INFO  org.linqs.psl.cli.Launcher  - Model loading complete")
+    add("INFO  org.linqs.psl.cli.Launcher  - Starting inference with class: org.linqs.psl.application.inference.MPEInference")
+    add("INFO  org.linqs.psl.application.inference.InferenceApplication  - Grounding out model.")
+
+    if (collective):
+        add("DEBUG org.linqs.psl.grounding.Grounding  - Generating candidates.")
+        time += int(rng.uniform(10, 100) * scale)
+        add("DEBUG org.linqs.psl.grounding.Grounding  - Generated %d candidates." % (rng.randint(1, 5)))
+
+    # DDI runs query each similarity (once) before the rest of their queries.
+    queryPredicates = []
+    if (example == DDI_EXAMPLE):
+        queryPredicates += [similarity + 'SIMILARITY_PREDICATE' for similarity in DDI_SIMILARITIES]
+
+    while (len(queryPredicates) < numQueries):
+        queryPredicates.append(rng.choice(PREDICATES))
+
+    totalGroundRules = 0
+
+    for i in range(len(queryPredicates)):
+        add("DEBUG org.linqs.psl.grounding.Grounding  - Grounding %d rule(s) with query: [(A, B), (B, C)]." % (rng.randint(1, 3)))
+        add(QUERY_LINE % (queryPredicates[i], rng.choice(PREDICATES), i + 2))
+
+        for j in range(traceLines):
+            add(NOISE_LINE % (rng.choice(PREDICATES), i, j, rng.random()))
+
+        time += int(rng.uniform(5, 50) * scale)
+
+        numResults = int(rng.uniform(10, 1000) * scale)
+        numGroundRules = int(numResults * rng.uniform(0.5, 2.0))
+        totalGroundRules += numGroundRules
+
+        add("DEBUG org.linqs.psl.grounding.Grounding  - Generated %d ground rules from %d query results." % (numGroundRules, numResults))
+
+    add("INFO  org.linqs.psl.application.inference.InferenceApplication  - Generated %d ground rules." % (totalGroundRules))
+    add("INFO  org.linqs.psl.application.inference.InferenceApplication  - Grounding complete.")
+
+    if (rng.random() < unfinishedRate):
+        return ''.join(lines), False, None, None
+
+    add("INFO  org.linqs.psl.application.inference.InferenceApplication  - Inference skipped.")
+    time += rng.randint(50, 200)
+
+    memory = int(rng.uniform(2e8, 2e9) * scale)
+    lines.append("\n")
+    add("INFO  org.linqs.psl.util.RuntimeStats  - Used Memory (bytes)  -- Min: %d, Max: %d, Mean: %d, Count: %d" % (memory // 4, memory, memory // 2, rng.randint(10, 100)))
+
+    return ''.join(lines), True, time, memory
+
+def buildTime(rng, options, runtime, memory):
+    seconds = runtime / 1000.0
+    userSeconds = seconds * rng.uniform(1.0, 2.5)
+    systemSeconds = seconds * rng.uniform(0.05, 0.2)
+    cpuPercent = int(100 * (userSeconds + systemSeconds) / max(seconds, 0.01))
+
+    return TIME_TEMPLATE % (
+        options, userSeconds, systemSeconds, cpuPercent, int(seconds // 60), seconds % 60,
+        memory // 1024 + rng.randint(100000, 200000),
+        rng.randint(0, 20), rng.randint(10000, 500000),
+        rng.randint(1000, 50000), rng.randint(100, 5000),
+        rng.randint(0, 10000), rng.randint(100, 100000))
+
+# Returns (number of runs, number of bytes written).
+def generate(resultsDir = DEFAULT_RESULTS_DIR, experiment = DEFAULT_EXPERIMENT,
+        numExamples = DEFAULT_NUM_EXAMPLES, numIterations = DEFAULT_NUM_ITERATIONS, numSplits = DEFAULT_NUM_SPLITS,
+        numHyperparams = DEFAULT_NUM_HYPERPARAMS, numQueries = DEFAULT_NUM_QUERIES, traceLines = DEFAULT_TRACE_LINES,
+        unfinishedRate = DEFAULT_UNFINISHED_RATE):
+    rng = random.Random(SEED)
+    settings = getRunSettings(numHyperparams)
+
+    numRuns = 0
+    numBytes = 0
+
+    for exampleIndex in range(numExamples):
+        example = EXAMPLES[exampleIndex % len(EXAMPLES)]
+        if (exampleIndex >= len(EXAMPLES)):
+            example = "%s-%d" % (example, exampleIndex // len(EXAMPLES))
+
+        # Examples differ in size by orders of magnitude.
+        scale = 10 ** rng.uniform(-1, 1)
+
+        for iteration in range(1, numIterations + 1):
+            for split in range(numSplits):
+                baseDir = os.path.join(resultsDir, 'experiment::' + experiment, 'example::' + example,
+                        "iteration::%02d" % (iteration), "split::%02d" % (split))
+
+                for (collective, outDir, options) in settings:
+                    outDir = os.path.join(baseDir, outDir)
+                    os.makedirs(outDir, exist_ok = True)
+
+                    log, finished, runtime, memory = buildLog(rng, example, collective, numQueries, traceLines, scale, unfinishedRate)
+
+                    with open(os.path.join(outDir, LOG_FILENAME), 'w') as file:
+                        file.write(log)
+
+                    open(os.path.join(outDir, ERR_FILENAME), 'w').close()
+
+                    if (finished):
+                        with open(os.path.join(outDir, TIME_FILENAME), 'w') as file:
+                            file.write(buildTime(rng, options, runtime, memory))
+
+                    numRuns += 1
+                    numBytes += len(log)
+
+    return numRuns, numBytes
+
+def main(**options):
+    numRuns, numBytes = generate(**options)
+    print("Generated %d runs (%.1f MB of logs) in %s." % (numRuns, numBytes / (1024 ** 2), options.get('resultsDir', DEFAULT_RESULTS_DIR)), file = sys.stderr)
+
+def _usage(executable):
+    print("USAGE: python3 %s [--results-dir <dir>] [--experiment <name>] [--examples <num>] [--iterations <num>] [--splits <num>] [--hyperparams <num>] [--queries <num>] [--trace-lines <num>] [--unfinished <rate>]" % (executable), file = sys.stderr)
+    print("    --results-dir - Where to write the results. Default: %s." % (DEFAULT_RESULTS_DIR), file = sys.stderr)
+    print("    --experiment - The experiment name used in the results paths. Default: %s." % (DEFAULT_EXPERIMENT), file = sys.stderr)
+    print("    --examples - The number of examples. Default: %d." % (DEFAULT_NUM_EXAMPLES), file = sys.stderr)
+    print("    --iterations - The number of iterations of each example. Default: %d." % (DEFAULT_NUM_ITERATIONS), file = sys.stderr)
+    print("    --splits - The number of splits of each example. Default: %d." % (DEFAULT_NUM_SPLITS), file = sys.stderr)
+    print("    --hyperparams - The number of collective hyperparam settings (at most %d) run next to each non-collective run. Default: %d." % (len(CANDIDATE_COUNTS) * len(SEARCH_BUDGETS) * len(SEARCH_TYPES), DEFAULT_NUM_HYPERPARAMS), file = sys.stderr)
+    print("    --queries - The number of grounding queries in each run. Default: %d." % (DEFAULT_NUM_QUERIES), file = sys.stderr)
+    print("    --trace-lines - The number of TRACE lines after each grounding query. Default: %d." % (DEFAULT_TRACE_LINES), file = sys.stderr)
+    print("    --unfinished - The fraction of runs that are left unfinished. Default: %s." % (DEFAULT_UNFINISHED_RATE), file = sys.stderr)
+    sys.exit(1)
+
+def _load_args(args):
+    executable = args.pop(0)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable)
+
+    # {flag: (option, type), ...}
+    flags = {
+        '--results-dir': ('resultsDir', str),
+        '--experiment': ('experiment', str),
+        '--examples': ('numExamples', int),
+        '--iterations': ('numIterations', int),
+        '--splits': ('numSplits', int),
+        '--hyperparams': ('numHyperparams', int),
+        '--queries': ('numQueries', int),
+        '--trace-lines': ('traceLines', int),
+        '--unfinished': ('unfinishedRate', float),
+    }
+
+    options = {}
+
+    while (len(args) > 0):
+        arg = args.pop(0)
+
+        if (arg not in flags or len(args) == 0):
+            _usage(executable)
+
+        option, optionType = flags[arg]
+        options[option] = optionType(args.pop(0))
+
+        if (optionType != str and options[option] < 0):
+            raise ValueError("%s must be non-negative, got: %s." % (arg, options[option]))
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
@@ -2,12 +2,13 @@
 
 # Parse out the results for the DDI similarity comparison.
 # We will need DDI per-rule information for both IG and a specific run of CG (whatever final hyperparams are chosen).
+# The query timings come from parse-predicate-timings.py, this just picks out the similarity predicates of the chosen runs.
 
-import glob
 import os
-import re
 import sys
 
+import scriptloader
+
 THIS_DIR = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
 RESULTS_DIR = os.path.join(THIS_DIR, '..', 'results', 'experiment::first-split', 'example::drug-drug-interaction')
 
@@ -17,8 +18,6 @@ COLLECTIVE_HYPERPARAMS = {
     'search_type': 'BoundedDFS',
 }
 
-LOG_FILENAME = 'out.txt'
-
 SIMILARITIES = [
     'ATC',
     'CHEMICAL',
@@ -29,6 +28,9 @@ SIMILARITIES = [
     'SIDEEFFECT',
 ]
 
+# The predicate of a similarity is the similarity followed by this.
+SIMILARITY_SUFFIX = 'SIMILARITY'
+
 HEADER = [
     # Identifiers
     'example',
@@ -43,58 +45,33 @@ HEADER = [
 # Results
 HEADER += [sim + suffix for sim in SIMILARITIES for suffix in ['_query_time', '_num_results']]
 
-def parseLog(logPath):
-    results = getIdentifiersFromPath(logPath)
-
-    sims = []
-    currentSim = None
-    queryStartTime = None
-
-    with open(logPath, 'r') as file:
-        for line in file:
-            line = line.strip()
-            if (line == ''):
-                continue
-
-            match = re.search(r'^(\d+)\s+\[', line)
-            if (match is not None):
-                time = int(match.group(1))
-
-            match = re.search(r'TRACE org.linqs.psl.database.rdbms.RDBMSDatabase  - SELECT .* (\w+)SIMILARITY_PREDICATE .*$', line)
-            if (match is not None):
-                currentSim = match.group(1)
-                queryStartTime = time
-
-            match = re.search(r'DEBUG .* - Generated (\d+) ground rules from (\d+) query results.', line)
-            if (match is not None and currentSim is not None):
-                results[currentSim + '_query_time'] = time - queryStartTime
-                results[currentSim + '_num_results'] = int(match.group(2))
-
-                sims.append(currentSim)
-                currentSim = None
-                queryStartTime = None
-
-    # Check for incomplete runs.
-    if (len(sims) != len(SIMILARITIES)):
+# The time and results of a similarity are summed over all of its queries.
+# Returns None if the run did not finish or does not have a query for every similarity.
+def parseLog(timings, logPath):
+    result = timings.parseLog(logPath)
+    if (result is None):
         return None
 
-    return results
+    results, predicates = result
 
-def getIdentifiersFromPath(logPath):
-    results = {}
+    for sim in SIMILARITIES:
+        stats = predicates.get(sim + SIMILARITY_SUFFIX)
+        if (stats is None):
+            return None
 
-    # Fetch the run identifiers off of the path.
-    for (key, value) in re.findall(r'([\w\-]+)::([\w\-]+)', logPath):
-        results[key] = value
+        results[sim + '_query_time'] = stats[1]
+        results[sim + '_num_results'] = stats[2]
 
     return results
 
 # [{key, value, ...}, ...]
-def fetchResults():
+def fetchResults(resultsDir = RESULTS_DIR):
+    timings = scriptloader.loadScript('parse-predicate-timings')
+    parser = scriptloader.loadScript('parse-results')
     runs = []
 
-    for logPath in glob.glob("%s/**/%s" % (RESULTS_DIR, LOG_FILENAME), recursive = True):
-        props = getIdentifiersFromPath(logPath)
+    for logPath in parser.findLogs(resultsDir):
+        props = parser.getIdentifiersFromPath(logPath)
 
         if (props['example'] != 'drug-drug-interaction'):
             continue
@@ -110,14 +87,14 @@ def fetchResults():
             if (not keep):
                 continue
 
-        run = parseLog(logPath)
+        run = parseLog(timings, logPath)
         if (run is not None):
             runs.append(run)
 
     return runs
 
-def main():
-    runs = fetchResults()
+def main(resultsDir = RESULTS_DIR):
+    runs = fetchResults(resultsDir)
     if (len(runs) == 0):
         return
 
@@ -131,10 +108,19 @@ def main():
 
 def _load_args(args):
     executable = args.pop(0)
-    if (len(args) != 0 or ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args})):
-        print("USAGE: python3 %s" % (executable), file = sys.stderr)
+    if (len(args) not in (0, 2) or (len(args) == 2 and args[0] != '--results-dir') or ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args})):
+        print("USAGE: python3 %s [--results-dir <dir>]" % (executable), file = sys.stderr)
+        print("    --results-dir - Where to look for the DDI run logs. Default: %s." % (RESULTS_DIR), file = sys.stderr)
         sys.exit(1)
 
+    options = {}
+
+    if (len(args) == 2):
+        options['resultsDir'] = args[1]
+        if (not os.path.isdir(options['resultsDir'])):
+            raise ValueError("Can't find the specified results dir: " + options['resultsDir'])
+
+    return options
+
 if (__name__ == '__main__'):
-    _load_args(sys.argv)
-    main()
+    main(**_load_args(sys.argv))
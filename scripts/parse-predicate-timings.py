@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+# Parse out how much query time goes to each predicate, for every run of every example.
+# Every traced grounding SELECT is paired with the "Generated X ground rules from Y query results." line that follows it,
+# and the query's time (ms from the SELECT to its results line) and number of results are attributed to every predicate the SELECT reads from.
+# Predicates are found from the tables in the SQL (<NAME>_PREDICATE), so nothing about an example needs to be known ahead of time.
+# Since a query counts toward every predicate it reads, the times of a run's predicates add up to more than the run's query time.
+# Only finished runs (with the final RuntimeStats line) are included.
+#
+# Each run gets a row per predicate: the run's identifiers, the predicate, and the number of queries, query time, and number of results of that predicate.
+# Rows are written as each run is parsed, either as TSV (stdout or --output) or into the PredicateStats table of a SQLite database (--db).
+# The database can be the same one given to the analysis scripts with --db (e.g. results.db), so the predicates can be joined against the Stats table.
+# Re-parsing a run replaces its rows.
+
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+
+import scriptloader
+
+THIS_DIR = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+RESULTS_DIR = os.path.join(THIS_DIR, '..', 'results')
+
+DEFAULT_JOBS = 1
+
+# Logs vary in size by orders of magnitude, so they are handed to jobs one at a time.
+CHUNK_SIZE = 1
+
+# How many runs are written to the database between commits.
+DB_BATCH_SIZE = 100
+
+IDENTIFIERS = [
+    'example',
+    'iteration',
+    'split',
+    'collective',
+    'candidate_count',
+    'search_budget',
+    'search_type',
+]
+
+HEADER = IDENTIFIERS + [
+    'predicate',
+    'num_queries',
+    'query_time',
+    'num_results',
+]
+
+# Types for the database, any column not listed is a string.
+BOOL_COLUMNS = {
+    'collective',
+}
+
+INT_COLUMNS = {
+    'iteration',
+    'candidate_count',
+    'search_budget',
+    'num_queries',
+    'query_time',
+    'num_results',
+}
+
+DB_TABLE = 'PredicateStats'
+DB_INDEX = 'PredicateStatsIndex'
+
+# The lines we care about: the TRACE of a SELECT, the DEBUG line reporting the results of that query,
+# and the final RuntimeStats line (to check that the run finished).
+# Logs are searched as bytes (by the scanners of parse-results.py), with lines anchored on the newline before them
+# (the first line of a log is never interesting).
+EVENT_REGEX = re.compile(
+    rb'\n(?P<time>\d+)[ \t]+\[[^\]\n]*\][ \t]+(?:'
+    + rb'(?P<query>TRACE org\.linqs\.psl\.database\.rdbms\.RDBMSDatabase  - (?P<statement>SELECT [^\r\n]*))'
+    + rb'|(?P<query_results>DEBUG .* - Generated (?P<num_ground_rules>\d+) ground rules from (?P<num_results>\d+) query results\.)'
+    + rb'|(?P<finished>INFO  org\.linqs\.psl\.util\.RuntimeStats  - Used Memory)'
+    + rb')',
+    re.MULTILINE)
+
+# Every predicate is stored in a table named after it.
+PREDICATE_TABLE_REGEX = re.compile(rb'\b(\w+)_PREDICATE\b')
+
+# Parse a single log.
+# Finding, opening, and scanning logs is shared with parse-results.py.
+# Returns ({identifier: value, ...}, {predicate: [num queries, query time, num results], ...}), or None if the run did not finish.
+def parseLog(logPath):
+    parser = scriptloader.loadScript('parse-results')
+    identifiers = parser.getIdentifiersFromPath(logPath)
+
+    extension = os.path.splitext(logPath)[1]
+    if (extension in parser.COMPRESSED_LOG_OPENERS):
+        with parser.COMPRESSED_LOG_OPENERS[extension](logPath) as file:
+            predicates = parseEvents(parser.scanStream(file, EVENT_REGEX, None))
+    else:
+        predicates = parseEvents(parser.scanMapped(logPath, EVENT_REGEX, None))
+
+    if (predicates is None):
+        return None
+
+    return identifiers, predicates
+
+def parseEvents(events):
+    predicates = {}
+    finished = False
+
+    # The predicates of the last query (and when it started), waiting on its results line.
+    currentPredicates = None
+    queryStartTime = None
+
+    for match in events:
+        event = match.lastgroup
+        time = int(match.group('time'))
+
+        if (event == 'query'):
+            currentPredicates = {name.decode() for name in PREDICATE_TABLE_REGEX.findall(match.group('statement'))}
+            queryStartTime = time
+        elif (event == 'query_results'):
+            if (currentPredicates is None):
+                continue
+
+            for predicate in currentPredicates:
+                stats = predicates.setdefault(predicate, [0, 0, 0])
+                stats[0] += 1
+                stats[1] += time - queryStartTime
+                stats[2] += int(match.group('num_results'))
+
+            currentPredicates = None
+            queryStartTime = None
+        elif (event == 'finished'):
+            finished = True
+
+    if (not finished):
+        return None
+
+    return predicates
+
+# Parse logs (in order), possibly in parallel.
+# Yields the result of parseLog() for each log as soon as it (and every log before it) is parsed.
+def parseLogs(logPaths, jobs = DEFAULT_JOBS):
+    if (jobs == 1 or len(logPaths) <= 1):
+        yield from map(parseLog, logPaths)
+        return
+
+    with multiprocessing.Pool(jobs) as pool:
+        # imap keeps the input order.
+        yield from pool.imap(parseLog, logPaths, chunksize = CHUNK_SIZE)
+
+# Yield the rows ([value, ...], in HEADER order) of each parsed run, one run at a time.
+# The predicates of a run are in sorted order.
+def fetchRuns(jobs = DEFAULT_JOBS, resultsDir = RESULTS_DIR):
+    for result in parseLogs(scriptloader.loadScript('parse-results').findLogs(resultsDir), jobs = jobs):
+        if (result is None):
+            continue
+
+        identifiers, predicates = result
+        prefix = [identifiers.get(key, '') for key in IDENTIFIERS]
+
+        yield [prefix + [predicate] + predicates[predicate] for predicate in sorted(predicates)]
+
+def writeTSV(runs, file):
+    print("\t".join(HEADER), file = file)
+
+    for rows in runs:
+        for row in rows:
+            print("\t".join(map(str, row)), file = file)
+
+# Convert a TSV value to its database type (like the analysis scripts do).
+def convertValue(column, value):
+    if (value == ''):
+        return None
+
+    if (column in BOOL_COLUMNS):
+        return (value.upper() == 'TRUE')
+
+    if (column in INT_COLUMNS):
+        return int(value)
+
+    return value
+
+def getDBSchema():
+    columnDefs = []
+    for column in HEADER:
+        if (column in BOOL_COLUMNS or column in INT_COLUMNS):
+            columnDefs.append("%s INTEGER" % (column))
+        else:
+            columnDefs.append("%s TEXT" % (column))
+
+    return "CREATE TABLE IF NOT EXISTS %s(%s)" % (DB_TABLE, ', '.join(columnDefs))
+
+def writeDB(runs, dbPath):
+    connection = sqlite3.connect(dbPath)
+
+    deleteQuery = "DELETE FROM %s WHERE %s" % (DB_TABLE, ' AND '.join(["%s IS ?" % (column) for column in IDENTIFIERS]))
+    insertQuery = "INSERT INTO %s(%s) VALUES (%s)" % (DB_TABLE, ', '.join(HEADER), ', '.join(['?'] * len(HEADER)))
+
+    count = 0
+
+    try:
+        with connection:
+            connection.execute(getDBSchema())
+            connection.execute("CREATE INDEX IF NOT EXISTS %s ON %s(example, predicate)" % (DB_INDEX, DB_TABLE))
+
+        for rows in runs:
+            if (len(rows) == 0):
+                continue
+
+            rows = [[convertValue(HEADER[i], row[i]) for i in range(len(HEADER))] for row in rows]
+
+            # Replace any rows from a previous parse of this run.
+            connection.execute(deleteQuery, rows[0][0:len(IDENTIFIERS)])
+            connection.executemany(insertQuery, rows)
+
+            count += 1
+            if (count % DB_BATCH_SIZE == 0):
+                connection.commit()
+
+        connection.commit()
+    finally:
+        connection.close()
+
+    print("Wrote the predicates of %d runs to %s." % (count, dbPath), file = sys.stderr)
+
+def main(jobs = DEFAULT_JOBS, outputPath = None, dbPath = None, resultsDir = RESULTS_DIR):
+    runs = fetchRuns(jobs = jobs, resultsDir = resultsDir)
+
+    if (dbPath is not None):
+        writeDB(runs, dbPath)
+    elif (outputPath is None):
+        writeTSV(runs, sys.stdout)
+    else:
+        with open(outputPath, 'w') as file:
+            writeTSV(runs, file)
+
+def _usage(executable):
+    print("USAGE: python3 %s [--results-dir <dir>] [--jobs <num jobs>] [--output <path> | --db <path>]" % (executable), file = sys.stderr)
+    print("    --results-dir - Where to look for run logs. Default: %s." % (RESULTS_DIR), file = sys.stderr)
+    print("    --jobs - The number of processes to parse logs with (0 for one per core). Default: %d." % (DEFAULT_JOBS), file = sys.stderr)
+    print("    --output - Where to write the predicate timings (TSV) instead of stdout.", file = sys.stderr)
+    print("    --db - Write the predicate timings into the %s table of this SQLite database instead (e.g. the --db of the analysis scripts)." % (DB_TABLE), file = sys.stderr)
+    sys.exit(1)
+
+def _load_args(args):
+    executable = args.pop(0)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable)
+
+    options = {}
+
+    while (len(args) > 0):
+        arg = args.pop(0)
+
+        if (arg == '--jobs' and len(args) > 0):
+            options['jobs'] = int(args.pop(0))
+            if (options['jobs'] < 0):
+                raise ValueError("Number of jobs must be non-negative, got: %d." % (options['jobs']))
+
+            if (options['jobs'] == 0):
+                options['jobs'] = os.cpu_count()
+        elif (arg == '--results-dir' and len(args) > 0):
+            options['resultsDir'] = args.pop(0)
+            if (not os.path.isdir(options['resultsDir'])):
+                raise ValueError("Can't find the specified results dir: " + options['resultsDir'])
+        elif (arg == '--output' and len(args) > 0):
+            options['outputPath'] = args.pop(0)
+        elif (arg == '--db' and len(args) > 0):
+            options['dbPath'] = args.pop(0)
+        else:
+            _usage(executable)
+
+    if ('outputPath' in options and 'dbPath' in options):
+        _usage(executable)
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
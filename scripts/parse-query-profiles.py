@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+# Parse out a profile of every grounding query.
+# Where parse-results.py sums up the queries of a run, this gives a row per query:
+# each "Grounding N rule(s) with query:" line paired with the "Generated X ground rules from Y query results." line that follows it.
+# Each row has the run's identifiers, the index of the query in the run, the number of rules it grounds,
+# a hash of its SQL (the first traced SELECT after the query line), its time (ms from the query line to its results line),
+# and its number of results and ground rules.
+# A query without a results line (e.g. the last query of a run that was cut off) gets empty counts.
+# Only finished runs (with the final RuntimeStats line) are included.
+#
+# With --sql <path>, the distinct SQL of every hash is also written out (so the expensive queries can be looked up).
+# Use analyze-query-profiles.py to rank the queries.
+
+import hashlib
+import multiprocessing
+import os
+import re
+import sys
+
+import scriptloader
+
+THIS_DIR = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+RESULTS_DIR = os.path.join(THIS_DIR, '..', 'results')
+
+DEFAULT_JOBS = 1
+
+# Logs vary in size by orders of magnitude, so they are handed to jobs one at a time.
+CHUNK_SIZE = 1
+
+# The number of hex digits of the SHA-1 of the SQL that are kept.
+SQL_HASH_LENGTH = 16
+
+IDENTIFIERS = [
+    'example',
+    'iteration',
+    'split',
+    'collective',
+    'candidate_count',
+    'search_budget',
+    'search_type',
+]
+
+HEADER = IDENTIFIERS + [
+    'query_index',
+    'num_rules',
+    'sql_hash',
+    'query_time',
+    'num_query_results',
+    'num_ground_rules',
+]
+
+SQL_HEADER = [
+    'sql_hash',
+    'sql',
+]
+
+# The lines we care about: the start of a grounding query, the TRACE of the SQL it runs,
+# the DEBUG line reporting its results, and the final RuntimeStats line (to check that the run finished).
+# Logs are searched as bytes (by the scanners of parse-results.py), with lines anchored on the newline before them
+# (the first line of a log is never interesting).
+EVENT_REGEX = re.compile(
+    rb'\n(?P<time>\d+)[ \t]+\[[^\]\n]*\][ \t]+(?:'
+    + rb'(?P<query>DEBUG org\.linqs\.psl\.grounding\.Grounding  - Grounding (?P<num_rules>\d+) rule\(s\) with query:)'
+    + rb'|(?P<sql>TRACE org\.linqs\.psl\.database\.rdbms\.RDBMSDatabase  - (?P<statement>SELECT [^\r\n]*))'
+    + rb'|(?P<query_results>DEBUG org\.linqs\.psl\.grounding\.Grounding  - Generated (?P<num_ground_rules>\d+) ground rules from (?P<num_results>\d+) query results\.)'
+    + rb'|(?P<finished>INFO  org\.linqs\.psl\.util\.RuntimeStats  - Used Memory)'
+    + rb')',
+    re.MULTILINE)
+
+# Finding, opening, and scanning logs is shared with parse-results.py.
+# Returns ([query row, ...], {sql hash: sql, ...}), or None if the run did not finish.
+def parseLog(logPath):
+    parser = scriptloader.loadScript('parse-results')
+    identifiers = parser.getIdentifiersFromPath(logPath)
+
+    extension = os.path.splitext(logPath)[1]
+    if (extension in parser.COMPRESSED_LOG_OPENERS):
+        with parser.COMPRESSED_LOG_OPENERS[extension](logPath) as file:
+            return parseEvents(parser.scanStream(file, EVENT_REGEX, None), identifiers)
+
+    return parseEvents(parser.scanMapped(logPath, EVENT_REGEX, None), identifiers)
+
+def parseEvents(events, identifiers):
+    prefix = [identifiers.get(key, '') for key in IDENTIFIERS]
+
+    rows = []
+    statements = {}
+    finished = False
+
+    # The query waiting on its results line.
+    current = None
+    queryStartTime = None
+
+    for match in events:
+        event = match.lastgroup
+        time = int(match.group('time'))
+
+        if (event == 'query'):
+            if (current is not None):
+                rows.append(current)
+
+            current = prefix + [len(rows), int(match.group('num_rules')), '', '', '', '']
+            queryStartTime = time
+        elif (event == 'sql'):
+            # Only the first SELECT after the query line is the query itself.
+            if (current is None or current[-4] != ''):
+                continue
+
+            statement = match.group('statement').decode(errors = 'replace').strip()
+            sqlHash = hashlib.sha1(statement.encode()).hexdigest()[:SQL_HASH_LENGTH]
+
+            statements[sqlHash] = statement
+            current[-4] = sqlHash
+        elif (event == 'query_results'):
+            if (current is None):
+                continue
+
+            current[-3] = time - queryStartTime
+            current[-2] = int(match.group('num_results'))
+            current[-1] = int(match.group('num_ground_rules'))
+
+            rows.append(current)
+            current = None
+        elif (event == 'finished'):
+            finished = True
+
+    if (current is not None):
+        rows.append(current)
+
+    if (not finished):
+        return None
+
+    return rows, statements
+
+# Parse logs (in order), possibly in parallel.
+# Yields the result of parseLog() for each log as soon as it (and every log before it) is parsed,
+# so the rows of a large results dir never need to all be in memory at once.
+def parseLogs(logPaths, jobs = DEFAULT_JOBS):
+    if (jobs == 1 or len(logPaths) <= 1):
+        yield from map(parseLog, logPaths)
+        return
+
+    with multiprocessing.Pool(jobs) as pool:
+        # imap keeps the input order.
+        yield from pool.imap(parseLog, logPaths, chunksize = CHUNK_SIZE)
+
+def main(jobs = DEFAULT_JOBS, outputPath = None, sqlPath = None, resultsDir = RESULTS_DIR):
+    file = sys.stdout
+    if (outputPath is not None):
+        file = open(outputPath, 'w')
+
+    # {sql hash: sql, ...}
+    statements = {}
+
+    try:
+        print("\t".join(HEADER), file = file)
+
+        for result in parseLogs(scriptloader.loadScript('parse-results').findLogs(resultsDir), jobs = jobs):
+            if (result is None):
+                continue
+
+            rows, runStatements = result
+            statements.update(runStatements)
+
+            for row in rows:
+                print("\t".join(map(str, row)), file = file)
+    finally:
+        if (outputPath is not None):
+            file.close()
+
+    if (sqlPath is not None):
+        with open(sqlPath, 'w') as sqlFile:
+            print("\t".join(SQL_HEADER), file = sqlFile)
+            for (sqlHash, statement) in sorted(statements.items()):
+                print("%s\t%s" % (sqlHash, statement), file = sqlFile)
+
+def _usage(executable):
+    print("USAGE: python3 %s [--results-dir <dir>] [--jobs <num jobs>] [--output <path>] [--sql <path>]" % (executable), file = sys.stderr)
+    print("    --results-dir - Where to look for run logs. Default: %s." % (RESULTS_DIR), file = sys.stderr)
+    print("    --jobs - The number of processes to parse logs with (0 for one per core). Default: %d." % (DEFAULT_JOBS), file = sys.stderr)
+    print("    --output - Where to write the query profiles (TSV) instead of stdout.", file = sys.stderr)
+    print("    --sql - Also write the SQL of every distinct query (by hash) to this path (TSV).", file = sys.stderr)
+    sys.exit(1)
+
+def _load_args(args):
+    executable = args.pop(0)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable)
+
+    options = {}
+
+    while (len(args) > 0):
+        arg = args.pop(0)
+
+        if (arg == '--jobs' and len(args) > 0):
+            options['jobs'] = int(args.pop(0))
+            if (options['jobs'] < 0):
+                raise ValueError("Number of jobs must be non-negative, got: %d." % (options['jobs']))
+
+            if (options['jobs'] == 0):
+                options['jobs'] = os.cpu_count()
+        elif (arg == '--results-dir' and len(args) > 0):
+            options['resultsDir'] = args.pop(0)
+            if (not os.path.isdir(options['resultsDir'])):
+                raise ValueError("Can't find the specified results dir: " + options['resultsDir'])
+        elif (arg == '--output' and len(args) > 0):
+            options['outputPath'] = args.pop(0)
+        elif (arg == '--sql' and len(args) > 0):
+            options['sqlPath'] = args.pop(0)
+        else:
+            _usage(executable)
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
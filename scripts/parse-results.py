@@ -1,17 +1,66 @@
 #!/usr/bin/env python3
 
 # Parse out the results.
+# Along with the PSL log (out.txt), the resource usage of each run is pulled out of the output of `/usr/bin/time -v` (time.txt),
+# and the peak memory of the run and of Postgres (and when they peaked) out of the samples taken while it ran (resources.bin, see sample-resources.py).
 # TODO(eriq): This does not properly parse number of query results for IG runs (but we only need that data in one place).
 
+import functools
 import glob
+import gzip
+import itertools
+import json
+import mmap
+import multiprocessing
 import os
 import re
+import sqlite3
 import sys
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+import scriptloader
+
 THIS_DIR = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
 RESULTS_DIR = os.path.join(THIS_DIR, '..', 'results')
 
 LOG_FILENAME = 'out.txt'
+TIME_FILENAME = 'time.txt'
+RESOURCES_FILENAME = 'resources.bin'
+
+# Files next to the log that also get parsed (so a change to any of them means the run needs to be parsed again).
+SIDE_FILENAMES = [TIME_FILENAME, RESOURCES_FILENAME]
+
+# Finished runs may have their logs compressed (see compress-results.py).
+# {extension: function to open a binary stream, ...}
+COMPRESSED_LOG_OPENERS = {
+    '.gz': lambda path: gzip.open(path, 'rb'),
+    '.zst': lambda path: openZstd(path),
+}
+
+# The preferred order of log filenames when a run has more than one (e.g. while it is being compressed).
+LOG_FILENAMES = [LOG_FILENAME] + [LOG_FILENAME + extension for extension in COMPRESSED_LOG_OPENERS]
+
+DEFAULT_JOBS = 1
+
+# When parsing in parallel, each job gets about this many chunks of logs (so long logs do not leave other jobs idle).
+CHUNKS_PER_JOB = 8
+MAX_CHUNK_SIZE = 256
+
+# A cache of parsed runs, so repeated parses only need to read new or changed logs.
+CACHE_FILENAME = 'parse-cache.db'
+DEFAULT_CACHE_PATH = os.path.join(RESULTS_DIR, CACHE_FILENAME)
+
+# Bump this whenever parseLog changes what it extracts, so old cache entries get ignored.
+CACHE_VERSION = 4
 
 HEADER = [
     # Identifiers
@@ -32,76 +81,393 @@ HEADER = [
     'num_queries',
     'num_query_results',
     'num_ground_rules',
+    # Resource usage (from time.txt)
+    'max_rss',
+    'user_time',
+    'system_time',
+    'voluntary_context_switches',
+    'involuntary_context_switches',
+    'major_page_faults',
+    'fs_inputs',
+    'fs_outputs',
+    # Peak memory (from resources.bin)
+    'run_pss_peak',
+    'run_pss_peak_time',
+    'run_private_peak',
+    'run_private_peak_time',
+    'postgres_pss_peak',
+    'postgres_pss_peak_time',
+    'postgres_private_peak',
+    'postgres_private_peak_time',
 ]
 
-def parseLog(logPath):
+# The fields of the output of `/usr/bin/time -v` that get parsed.
+# Times are converted to milliseconds (like the log timings) and memory to bytes (like the log memory).
+# File system inputs/outputs are left as the number of (512 byte) blocks.
+# {label: (column, multiplier), ...}
+TIME_FIELDS = {
+    'Maximum resident set size (kbytes)': ('max_rss', 1024),
+    'User time (seconds)': ('user_time', 1000),
+    'System time (seconds)': ('system_time', 1000),
+    'Voluntary context switches': ('voluntary_context_switches', 1),
+    'Involuntary context switches': ('involuntary_context_switches', 1),
+    'Major (requiring I/O) page faults': ('major_page_faults', 1),
+    'File system inputs': ('fs_inputs', 1),
+    'File system outputs': ('fs_outputs', 1),
+}
+
+# The sampled series whose peaks get parsed.
+# The peak is in bytes, and the time of the peak in milliseconds since sampling started (about when the run started).
+# {series: (peak column, peak time column), ...}
+PEAK_FIELDS = {
+    'run_pss': ('run_pss_peak', 'run_pss_peak_time'),
+    'run_private': ('run_private_peak', 'run_private_peak_time'),
+    'postgres_pss': ('postgres_pss_peak', 'postgres_pss_peak_time'),
+    'postgres_private': ('postgres_private_peak', 'postgres_private_peak_time'),
+}
+
+# Types for the columnar (.npz) output, any column not listed is a string.
+BOOL_COLUMNS = {
+    'collective',
+}
+
+INT_COLUMNS = {
+    'iteration',
+    'candidate_count',
+    'search_budget',
+    'runtime',
+    'search_time',
+    'query_time',
+    'grounding_time',
+    'memory',
+    'num_rules',
+    'num_queries',
+    'num_query_results',
+    'num_ground_rules',
+    'max_rss',
+    'user_time',
+    'system_time',
+    'voluntary_context_switches',
+    'involuntary_context_switches',
+    'major_page_faults',
+    'fs_inputs',
+    'fs_outputs',
+    'run_pss_peak',
+    'run_pss_peak_time',
+    'run_private_peak',
+    'run_private_peak_time',
+    'postgres_pss_peak',
+    'postgres_pss_peak_time',
+    'postgres_private_peak',
+    'postgres_private_peak_time',
+}
+
+# In the columnar output, the ordered column names are stored under COLUMNS_KEY,
+# and columns with missing values get a boolean array under NULL_KEY_PREFIX + column.
+COLUMNS_KEY = '__columns__'
+NULL_KEY_PREFIX = '__null__'
+
+# How much of the end of a log to look at for the final RuntimeStats line (when using the tail fast path).
+# PSL only prints a few lines after it.
+TAIL_SIZE = 64 * 1024
+
+# How much of a (memory mapped or decompressed) log to search at a time.
+SCAN_WINDOW_SIZE = 64 * 1024 * 1024
+
+# Every line that parseLog cares about is logged by one of these classes.
+# Checking the logger (the text just before the '  - ' separator) is much cheaper than running a regex,
+# so everything else (mainly TRACE SQL dumps) is thrown out before any matching happens.
+LOGGERS = (
+    'org.linqs.psl.application.inference.InferenceApplication',
+    'org.linqs.psl.grounding.Grounding',
+    'org.linqs.psl.util.RuntimeStats',
+)
+
+LOGGER_SEPARATOR = '  - '
+
+# How far into a line to look for the logger separator.
+# The prefix is "<time> [<thread>] <level> <logger>", so this is plenty.
+LOGGER_SEARCH_LENGTH = 256
+
+# [(event, pattern), ...]
+# Each pattern is matched right after the timestamp and thread of a line.
+# Capture groups must be named (and unique across all events) so the events can share a single regex.
+EVENT_PATTERNS = [
+    ('grounding_start', r'INFO  org\.linqs\.psl\.application\.inference\.InferenceApplication  - Grounding out model\.'),
+    ('search_start', r'DEBUG org\.linqs\.psl\.grounding\.Grounding  - Generating candidates\.'),
+    ('search_end', r'DEBUG org\.linqs\.psl\.grounding\.Grounding  - Generated (?P<num_candidates>\d+) candidates'),
+    ('query', r'DEBUG org\.linqs\.psl\.grounding\.Grounding  - Grounding (?P<query_num_rules>\d+) rule\(s\) with query:'),
+    ('query_results', r'DEBUG org\.linqs\.psl\.grounding\.Grounding  - Generated (?P<query_num_ground_rules>\d+) ground rules from (?P<query_num_results>\d+) query results\.'),
+    ('ground_rules', r'\w+[ \t]+org\.linqs\.psl\.application\.inference\.InferenceApplication  - Generated (?P<num_ground_rules>\d+) ground rules\.'),
+    ('grounding_end', r'INFO  org\.linqs\.psl\.application\.inference\.InferenceApplication  - Grounding complete\.'),
+    ('memory', r'INFO  org\.linqs\.psl\.util\.RuntimeStats  - Used Memory \(bytes\)  -- Min:\s*(?P<memory_min>\d+), Max:\s*(?P<memory_max>\d+), Mean:\s*(?P<memory_mean>\d+), Count:\s*(?P<memory_count>\d+)[ \t\r]*$'),
+]
+
+# The timestamp and thread that start every line.
+EVENT_HEADER = r'(?P<time>\d+)[ \t]+\[[^\]\n]*\][ \t]+'
+
+# A single alternation over all the events.
+# Since each event is the outermost (and last closed) group, match.lastgroup gives the event name.
+EVENT_ALTERNATION = '(?:%s)' % ('|'.join(["(?P<%s>%s)" % (event, pattern) for (event, pattern) in EVENT_PATTERNS]))
+
+# For matching a single line.
+EVENT_REGEX = re.compile('^' + EVENT_HEADER + EVENT_ALTERNATION)
+
+# For searching a whole (mapped) log at once.
+# Events are anchored on the newline before them rather than a multiline '^',
+# since the regex engine can skip ahead to a literal but has to try a '^' at every byte.
+# None of the events are logged at TRACE, so those lines (the vast majority) are rejected right after the header.
+# The first line of a log has no newline before it, so it gets checked separately.
+EVENT_BYTES_REGEX = re.compile(('\n' + EVENT_HEADER + '(?!TRACE)' + EVENT_ALTERNATION).encode(), re.MULTILINE)
+EVENT_BYTES_FIRST_LINE_REGEX = re.compile(('^' + EVENT_HEADER + EVENT_ALTERNATION).encode(), re.MULTILINE)
+
+# If |tail| is true, then the end of the log is checked for the final RuntimeStats line before anything else is read.
+# Unfinished runs are rejected without scanning the log,
+# and finished runs are only scanned up to the end of grounding (the rest of the run is not used).
+def parseLog(logPath, tail = False):
+    results = getIdentifiersFromPath(logPath)
+
+    extension = os.path.splitext(logPath)[1]
+    if (extension in COMPRESSED_LOG_OPENERS):
+        # Compressed logs cannot be mapped or seeked, so they are always streamed in full.
+        # Only finished runs get compressed, so there is nothing for the tail fast path to save.
+        with COMPRESSED_LOG_OPENERS[extension](logPath) as file:
+            results = parseEvents(scanStream(file), results)
+    elif (not tail):
+        results = parseEvents(scanMapped(logPath), results)
+    else:
+        tailEvents = findTailEvents(logPath)
+        if (len(tailEvents) == 0):
+            return None
+
+        results = parseEvents(itertools.chain(untilGroundingEnd(scanMapped(logPath)), tailEvents[-1:]), results)
+
+    if (results is not None):
+        results.update(parseTimes(os.path.join(os.path.dirname(logPath), TIME_FILENAME)))
+        results.update(parseResources(os.path.join(os.path.dirname(logPath), RESOURCES_FILENAME)))
+
+    return results
+
+def getIdentifiersFromPath(logPath):
     results = {}
 
     # Fetch the run identifiers off of the path.
     for (key, value) in re.findall(r'([\w\-]+)::([\w\-]+)', logPath):
         results[key] = value
 
-    groundTimeStart = None
-    searchTimeStart = None
-    queryTimeStart = None
+    return results
 
-    rules = 0
-    queries = 0
-    queryResults = 0
-    groundRules = 0
+# Parse the output of `/usr/bin/time -v` (if there is any).
+# {column: value, ...}
+def parseTimes(timePath):
+    results = {}
+
+    if (not os.path.isfile(timePath)):
+        return results
 
-    with open(logPath, 'r') as file:
+    with open(timePath, 'r') as file:
         for line in file:
-            line = line.strip()
-            if (line == ''):
+            parts = line.strip().rsplit(': ', 1)
+            if (len(parts) != 2 or parts[0] not in TIME_FIELDS):
                 continue
 
-            match = re.search(r'^(\d+)\s+\[', line)
-            if (match is not None):
-                time = int(match.group(1))
+            column, multiplier = TIME_FIELDS[parts[0]]
+            results[column] = int(round(float(parts[1]) * multiplier))
 
-            match = re.search(r'INFO  org.linqs.psl.application.inference.InferenceApplication  - Grounding out model.', line)
-            if (match is not None):
-                groundTimeStart = time
+    return results
 
-            match = re.search(r'DEBUG org.linqs.psl.grounding.Grounding  - Generating candidates.', line)
-            if (match is not None):
-                searchTimeStart = time
+# Parse the peaks out of the resource samples of a run (if there are any).
+# Samples that could not be read (negative) are skipped, and the first sample wins ties.
+# {column: value, ...}
+def parseResources(resourcesPath):
+    results = {}
 
-            match = re.search(r'DEBUG org.linqs.psl.grounding.Grounding  - Generated (\d+) candidates', line)
-            if (match is not None and searchTimeStart is not None):
-                results['search_time'] = time - searchTimeStart
-                queryTimeStart = time
+    if (not os.path.isfile(resourcesPath)):
+        return results
+
+    sampler = scriptloader.loadScript('sample-resources')
+    fields, records = sampler.readSamples(resourcesPath)
+
+    for (series, (peakColumn, timeColumn)) in PEAK_FIELDS.items():
+        if (series not in fields):
+            continue
+
+        # The time is the first value of every record.
+        index = fields.index(series) + 1
+
+        peak = None
+        for record in records:
+            if (record[index] != sampler.UNKNOWN and (peak is None or record[index] > peak[index])):
+                peak = record
+
+        if (peak is not None):
+            results[peakColumn] = peak[index]
+            results[timeColumn] = peak[0]
+
+    return results
+
+# Check the end of an (uncompressed) log for the final RuntimeStats line.
+def isFinished(logPath):
+    return len(findTailEvents(logPath)) > 0
+
+def findTailEvents(logPath):
+    return [match for match in scanLines(readTail(logPath)) if match.lastgroup == 'memory']
+
+def openZstd(path):
+    if (zstandard is None):
+        raise ImportError("The zstandard package is required to read zstd-compressed logs: " + path)
+
+    return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd = True)
+
+# Get the (complete) lines in the last |size| bytes of a log.
+def readTail(logPath, size = TAIL_SIZE):
+    with open(logPath, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        start = max(0, file.tell() - size)
+
+        file.seek(start)
+        lines = file.read().decode(errors = 'replace').splitlines()
+
+    # Unless we started at the beginning of the file, the first line is probably partial.
+    if (start > 0):
+        lines = lines[1:]
 
-            match = re.search(r'DEBUG org.linqs.psl.grounding.Grounding  - Grounding (\d+) rule\(s\) with query:', line)
-            if (match is not None):
-                queries += 1
-                rules += int(match.group(1))
+    return lines
 
-            match = re.search(r'DEBUG org.linqs.psl.grounding.Grounding  - Generated (\d+) ground rules from (\d+) query results.', line)
-            if (match is not None):
-                queryResults += int(match.group(2))
+def untilGroundingEnd(events):
+    for match in events:
+        yield match
 
-            match = re.search(r'org.linqs.psl.application.inference.InferenceApplication  - Generated (\d+) ground rules.', line)
-            if (match is not None):
-                groundRules = int(match.group(1))
+        if (match.lastgroup == 'grounding_end'):
+            return
 
-            match = re.search(r'INFO  org.linqs.psl.application.inference.InferenceApplication  - Grounding complete.', line)
-            if (match is not None):
-                results['grounding_time'] = time - groundTimeStart
+# Yield an EVENT_REGEX match for every interesting line (str).
+def scanLines(lines):
+    for line in lines:
+        separator = line.find(LOGGER_SEPARATOR, 0, LOGGER_SEARCH_LENGTH)
+        if (separator == -1 or not line.endswith(LOGGERS, 0, separator)):
+            continue
 
-                if (queryTimeStart is None):
-                    # IG
-                    results['search_time'] = 0
-                    results['query_time'] = time - groundTimeStart
-                else:
-                    # CG
-                    results['query_time'] = time - queryTimeStart
+        match = EVENT_REGEX.match(line)
+        if (match is not None):
+            yield match
 
-            match = re.search(r'INFO  org.linqs.psl.util.RuntimeStats  - Used Memory \(bytes\)  -- Min:\s*(\d+), Max:\s*(\d+), Mean:\s*(\d+), Count:\s*(\d+)$', line)
-            if (match is not None):
-                results['runtime'] = time
-                results['memory'] = int(match.group(2))
+# Yield an EVENT_BYTES_REGEX match for every interesting line in a log.
+# The log is memory mapped and searched as bytes,
+# so the (mostly TRACE) lines that are not interesting are never decoded or copied.
+# The log is searched a window at a time, and the pages of each window are released once it has been searched
+# (otherwise every page of the log would stay resident until the end of the scan).
+# The other log parsers pass in their own |regex| (anchored on the newline before each line),
+# and a |firstLineRegex| of None if the first line of a log is never interesting to them.
+def scanMapped(logPath, regex = EVENT_BYTES_REGEX, firstLineRegex = EVENT_BYTES_FIRST_LINE_REGEX):
+    with open(logPath, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if (size == 0):
+            return
+
+        with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as mappedLog:
+            canRelease = hasattr(mappedLog, 'madvise')
+            if (canRelease):
+                mappedLog.madvise(mmap.MADV_SEQUENTIAL)
+
+            if (firstLineRegex is not None):
+                match = firstLineRegex.match(mappedLog)
+                if (match is not None):
+                    yield match
+
+            start = 0
+            released = 0
+
+            while (start < size):
+                # End the window on a newline, so every line is entirely in one window.
+                # Each window starts with the newline that anchors its first line.
+                end = mappedLog.rfind(b'\n', start + 1, start + SCAN_WINDOW_SIZE)
+                if (end == -1 or start + SCAN_WINDOW_SIZE >= size):
+                    end = mappedLog.find(b'\n', start + SCAN_WINDOW_SIZE)
+                    if (end == -1):
+                        end = size
+
+                yield from regex.finditer(mappedLog, start, end)
+
+                if (canRelease):
+                    releaseEnd = end - (end % mmap.PAGESIZE)
+                    if (releaseEnd > released):
+                        mappedLog.madvise(mmap.MADV_DONTNEED, released, releaseEnd - released)
+                        released = releaseEnd
+
+                start = end
+
+# Like scanMapped(), but for a binary stream (e.g. a decompressing reader).
+def scanStream(stream, regex = EVENT_BYTES_REGEX, firstLineRegex = EVENT_BYTES_FIRST_LINE_REGEX):
+    buffer = stream.read(SCAN_WINDOW_SIZE)
+    if (len(buffer) == 0):
+        return
+
+    if (firstLineRegex is not None):
+        match = firstLineRegex.match(buffer)
+        if (match is not None):
+            yield match
+
+    while (True):
+        chunk = stream.read(SCAN_WINDOW_SIZE)
+        if (len(chunk) == 0):
+            yield from regex.finditer(buffer)
+            return
+
+        buffer += chunk
+
+        # Only search up to the last newline, the rest of the buffer (starting with that newline) carries over.
+        end = buffer.rfind(b'\n')
+        if (end <= 0):
+            continue
+
+        yield from regex.finditer(buffer, 0, end)
+        buffer = buffer[end:]
+
+# Fill in |results| from a stream of EVENT_REGEX (or EVENT_BYTES_REGEX) matches.
+# Returns None if the run did not finish.
+def parseEvents(events, results):
+    groundTimeStart = None
+    searchTimeStart = None
+    queryTimeStart = None
+
+    rules = 0
+    queries = 0
+    queryResults = 0
+    groundRules = 0
+
+    for match in events:
+        event = match.lastgroup
+        time = int(match.group('time'))
+
+        if (event == 'query'):
+            queries += 1
+            rules += int(match.group('query_num_rules'))
+        elif (event == 'query_results'):
+            queryResults += int(match.group('query_num_results'))
+        elif (event == 'grounding_start'):
+            groundTimeStart = time
+        elif (event == 'search_start'):
+            searchTimeStart = time
+        elif (event == 'search_end'):
+            if (searchTimeStart is not None):
+                results['search_time'] = time - searchTimeStart
+                queryTimeStart = time
+        elif (event == 'ground_rules'):
+            groundRules = int(match.group('num_ground_rules'))
+        elif (event == 'grounding_end'):
+            results['grounding_time'] = time - groundTimeStart
+
+            if (queryTimeStart is None):
+                # IG
+                results['search_time'] = 0
+                results['query_time'] = time - groundTimeStart
+            else:
+                # CG
+                results['query_time'] = time - queryTimeStart
+        elif (event == 'memory'):
+            results['runtime'] = time
+            results['memory'] = int(match.group('memory_max'))
 
     # Check for an unfinished run.
     if ('runtime' not in results):
@@ -114,36 +480,209 @@ def parseLog(logPath):
 
     return results
 
-# [{key, value, ...}, ...]
-def fetchResults():
+# Log paths are sorted so that the output order does not depend on the filesystem or on the number of jobs.
+# If a run has both a compressed and uncompressed log, only the uncompressed one is used.
+def findLogs(resultsDir = RESULTS_DIR):
+    logPaths = {}
+
+    for filename in reversed(LOG_FILENAMES):
+        for logPath in glob.glob("%s/**/%s" % (glob.escape(resultsDir), filename), recursive = True):
+            logPaths[os.path.dirname(logPath)] = logPath
+
+    return sorted(logPaths.values())
+
+# Parse logs (in order), possibly in parallel.
+# [{key, value, ...} or None, ...]
+def parseLogs(logPaths, jobs = DEFAULT_JOBS, tail = False):
+    parse = functools.partial(parseLog, tail = tail)
+
+    if (jobs == 1 or len(logPaths) <= 1):
+        return list(map(parse, logPaths))
+
+    # Hand out logs in chunks to cut down on IPC, but keep chunks small enough that workers stay balanced
+    # (run logs vary in size by orders of magnitude).
+    chunkSize = max(1, min(MAX_CHUNK_SIZE, len(logPaths) // (jobs * CHUNKS_PER_JOB)))
+
+    with multiprocessing.Pool(jobs) as pool:
+        # imap keeps the input order.
+        return list(pool.imap(parse, logPaths, chunksize = chunkSize))
+
+def getRunMtime(logPath, logStat):
+    mtime = logStat.st_mtime_ns
+
+    for filename in SIDE_FILENAMES:
+        path = os.path.join(os.path.dirname(logPath), filename)
+        if (os.path.exists(path)):
+            mtime = max(mtime, os.stat(path).st_mtime_ns)
+
+    return mtime
+
+def openCache(path):
+    connection = sqlite3.connect(path)
+
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS ParsedLogs (
+            path TEXT PRIMARY KEY,
+            mtime INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            results TEXT
+        )
+    ''')
+
+    return connection
+
+# Same as parseLogs(), but only logs that are not in the cache (or have changed since they were cached) are parsed.
+# Logs are keyed by their path (relative to the results dir), mtime, and size.
+# The mtime is the latest of the log and its time.txt (which is written just after the log is finished).
+# Unfinished runs are also cached (as None), since their mtime/size will change when they get more output.
+def parseLogsCached(logPaths, cachePath, jobs = DEFAULT_JOBS, tail = False, resultsDir = RESULTS_DIR):
+    connection = openCache(cachePath)
+
+    cached = {}
+    for (path, mtime, size, version, results) in connection.execute("SELECT path, mtime, size, version, results FROM ParsedLogs"):
+        cached[path] = (mtime, size, version, results)
+
+    keys = []
     runs = []
+    staleIndexes = []
+
+    for i in range(len(logPaths)):
+        stat = os.stat(logPaths[i])
+        key = (os.path.relpath(logPaths[i], resultsDir), getRunMtime(logPaths[i], stat), stat.st_size)
+        keys.append(key)
+
+        entry = cached.get(key[0])
+        if (entry is not None and entry[0:3] == (key[1], key[2], CACHE_VERSION)):
+            runs.append(json.loads(entry[3]))
+        else:
+            runs.append(None)
+            staleIndexes.append(i)
 
-    for logPath in glob.glob("%s/**/%s" % (RESULTS_DIR, LOG_FILENAME), recursive = True):
-        run = parseLog(logPath)
-        if (run is not None):
-            runs.append(run)
+    parsedRuns = parseLogs([logPaths[i] for i in staleIndexes], jobs = jobs, tail = tail)
+
+    updates = []
+    for (i, run) in zip(staleIndexes, parsedRuns):
+        runs[i] = run
+        updates.append(keys[i] + (CACHE_VERSION, json.dumps(run)))
+
+    with connection:
+        connection.executemany("INSERT OR REPLACE INTO ParsedLogs(path, mtime, size, version, results) VALUES (?, ?, ?, ?, ?)", updates)
+
+        # Drop entries for logs that no longer exist.
+        connection.execute("CREATE TEMP TABLE CurrentLogs(path TEXT PRIMARY KEY)")
+        connection.executemany("INSERT INTO CurrentLogs(path) VALUES (?)", [(key[0],) for key in keys])
+        connection.execute("DELETE FROM ParsedLogs WHERE path NOT IN (SELECT path FROM CurrentLogs)")
+
+    connection.close()
+
+    print("Parsed %d logs (%d from cache)." % (len(logPaths), len(logPaths) - len(staleIndexes)), file = sys.stderr)
 
     return runs
 
-def main():
-    runs = fetchResults()
-    if (len(runs) == 0):
-        return
+# [{key, value, ...}, ...]
+def fetchResults(jobs = DEFAULT_JOBS, cachePath = None, tail = False, resultsDir = RESULTS_DIR):
+    logPaths = findLogs(resultsDir)
+
+    if (cachePath is None):
+        runs = parseLogs(logPaths, jobs = jobs, tail = tail)
+    else:
+        runs = parseLogsCached(logPaths, cachePath, jobs = jobs, tail = tail, resultsDir = resultsDir)
 
+    return [run for run in runs if run is not None]
+
+def writeTSV(runs, file):
     rows = []
     for run in runs:
         rows.append([run.get(key, '') for key in HEADER])
 
-    print("\t".join(HEADER))
+    print("\t".join(HEADER), file = file)
     for row in rows:
-        print("\t".join(map(str, row)))
+        print("\t".join(map(str, row)), file = file)
+
+# Write the runs as typed columns (a NumPy .npz file), so they can be loaded without any per-value conversion.
+def writeColumnar(runs, path):
+    if (numpy is None):
+        raise ImportError("The numpy package is required for columnar (.npz) output.")
+
+    arrays = {COLUMNS_KEY: numpy.array(HEADER)}
+
+    for column in HEADER:
+        values = [run.get(column) for run in runs]
+        nulls = numpy.array([value is None for value in values], dtype = bool)
+
+        if (column in BOOL_COLUMNS):
+            arrays[column] = numpy.array([value == 'true' for value in values], dtype = bool)
+        elif (column in INT_COLUMNS):
+            arrays[column] = numpy.array([0 if value is None else int(value) for value in values], dtype = numpy.int64)
+        else:
+            arrays[column] = numpy.array(['' if value is None else str(value) for value in values], dtype = str)
+
+        if (nulls.any()):
+            arrays[NULL_KEY_PREFIX + column] = nulls
+
+    with open(path, 'wb') as file:
+        numpy.savez(file, **arrays)
+
+def main(jobs = DEFAULT_JOBS, cachePath = None, tail = False, outputPath = None, resultsDir = RESULTS_DIR):
+    runs = fetchResults(jobs = jobs, cachePath = cachePath, tail = tail, resultsDir = resultsDir)
+    if (len(runs) == 0):
+        return
+
+    if (outputPath is None):
+        writeTSV(runs, sys.stdout)
+    elif (outputPath.endswith('.npz')):
+        writeColumnar(runs, outputPath)
+    else:
+        with open(outputPath, 'w') as file:
+            writeTSV(runs, file)
+
+def _usage(executable):
+    print("USAGE: python3 %s [--results-dir <dir>] [--jobs <num jobs>] [--cache [<cache path>]] [--tail] [--output <path>]" % (executable), file = sys.stderr)
+    print("    --results-dir - Where to look for run logs. Default: %s." % (RESULTS_DIR), file = sys.stderr)
+    print("    --jobs - The number of processes to parse logs with (0 for one per core). Default: %d." % (DEFAULT_JOBS), file = sys.stderr)
+    print("    --cache - Reuse results from previous parses for logs that have not changed. Default path: <results dir>/%s." % (CACHE_FILENAME), file = sys.stderr)
+    print("    --tail - Check the end of each log for a finished run before scanning it, and stop scanning after grounding.", file = sys.stderr)
+    print("    --output - Where to write the results instead of stdout. A path ending in '.npz' gets columnar (NumPy) output, anything else gets TSV.", file = sys.stderr)
+    sys.exit(1)
 
 def _load_args(args):
     executable = args.pop(0)
-    if (len(args) != 0 or ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args})):
-        print("USAGE: python3 %s" % (executable), file = sys.stderr)
-        sys.exit(1)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable)
+
+    options = {}
+
+    while (len(args) > 0):
+        arg = args.pop(0)
+
+        if (arg == '--jobs' and len(args) > 0):
+            options['jobs'] = int(args.pop(0))
+            if (options['jobs'] < 0):
+                raise ValueError("Number of jobs must be non-negative, got: %d." % (options['jobs']))
+
+            if (options['jobs'] == 0):
+                options['jobs'] = os.cpu_count()
+        elif (arg == '--cache'):
+            # The default cache path depends on the results dir, so it is filled in below.
+            options['cachePath'] = None
+            if (len(args) > 0 and not args[0].startswith('--')):
+                options['cachePath'] = args.pop(0)
+        elif (arg == '--results-dir' and len(args) > 0):
+            options['resultsDir'] = args.pop(0)
+            if (not os.path.isdir(options['resultsDir'])):
+                raise ValueError("Can't find the specified results dir: " + options['resultsDir'])
+        elif (arg == '--tail'):
+            options['tail'] = True
+        elif (arg == '--output' and len(args) > 0):
+            options['outputPath'] = args.pop(0)
+        else:
+            _usage(executable)
+
+    if ('cachePath' in options and options['cachePath'] is None):
+        options['cachePath'] = os.path.join(options.get('resultsDir', RESULTS_DIR), CACHE_FILENAME)
+
+    return options
 
 if (__name__ == '__main__'):
-    _load_args(sys.argv)
-    main()
+    main(**_load_args(sys.argv))
@@ -8,6 +8,10 @@ readonly EXAMPLES_DIR="${THIS_DIR}/../psl-examples"
 
 readonly CLEAR_CACHE_SCRIPT=$(realpath "${THIS_DIR}/clear_cache.sh")
 readonly BSOE_CLEAR_CACHE_SCRIPT=$(realpath "${THIS_DIR}/bsoe_clear_cache.sh")
+readonly SAMPLER_SCRIPT=$(realpath "${THIS_DIR}/sample-resources.py")
+
+# Seconds between samples of the resource usage of a run (see sample-resources.py), 0 to not sample.
+readonly SAMPLE_INTERVAL="${SAMPLE_INTERVAL:-1}"
 
 readonly ADDITIONAL_PSL_OPTIONS='-D inference.skip=true'
 
@@ -41,8 +45,10 @@ function run_psl() {
     local outPath="${outDir}/out.txt"
     local errPath="${outDir}/out.err"
     local timePath="${outDir}/time.txt"
+    local resourcesPath="${outDir}/resources.bin"
 
-    if [[ -e "${outPath}" ]]; then
+    # Finished runs may have had their logs compressed (see compress-results.py).
+    if [[ -e "${outPath}" || -e "${outPath}.gz" || -e "${outPath}.zst" ]]; then
         echo "Output file already exists, skipping: ${outPath}"
         return 0
     fi
@@ -52,9 +58,22 @@ function run_psl() {
     pushd . > /dev/null
         cd "${cliDir}"
 
+        # Sample the resource usage of this script (and so PSL) and Postgres while PSL runs.
+        local samplerPid=''
+        if [[ ! "${SAMPLE_INTERVAL}" =~ ^0*(\.0*)?$ ]]; then
+            "${SAMPLER_SCRIPT}" --interval "${SAMPLE_INTERVAL}" "${resourcesPath}" $$ &
+            samplerPid=$!
+        fi
+
         # Run PSL.
         /usr/bin/time -v --output="${timePath}" ./run.sh ${extraOptions} > "${outPath}" 2> "${errPath}"
 
+        # The sampler may have already stopped on its own (e.g. if /proc could not be read).
+        if [[ -n "${samplerPid}" ]]; then
+            kill "${samplerPid}" 2> /dev/null
+            wait "${samplerPid}" || true
+        fi
+
         # Copy any artifacts into the output directory.
         cp -r inferred-predicates "${outDir}/"
         cp *.data "${outDir}/"
@@ -123,6 +142,11 @@ function main() {
         exit 1
     fi
 
+    if [[ ! "${SAMPLE_INTERVAL}" =~ ^[0-9]+(\.[0-9]+)?$ ]]; then
+        echo "SAMPLE_INTERVAL must be a non-negative number of seconds, got: '${SAMPLE_INTERVAL}'."
+        exit 1
+    fi
+
     trap exit SIGINT
 
     # Clear existing jars.
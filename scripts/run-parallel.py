@@ -0,0 +1,716 @@
+#!/usr/bin/env python3
+
+# Run an experiment with several runs going at once.
+# This runs the same runs (into the same output layout) as ./scripts/run-<experiment>.sh,
+# and reads the experiment's settings (iterations and hyperparams) straight out of that script.
+# Like the run scripts, a run is skipped if its output (out.txt, possibly compressed) already exists.
+#
+# With one worker (the default), runs happen one at a time exactly like the run scripts
+# (in each example's cli dir, against the 'psl' database, with a full cache clear before every run).
+# With more workers, each worker gets:
+#  - its own copy of each example's cli dir (next to the original, since run.sh writes into its cli dir),
+#  - its own Postgres database (psl_<worker>), which is dropped and recreated before every run
+#    (Postgres can not be restarted or the page cache dropped while other runs are going),
+#  - its own set of CPUs (unless --no-pin is given).
+#
+# How the database is reset before each run can be picked with --reset (see RESET_POLICIES),
+# trading the cold caches of a full reset for less time between runs.
+# With one worker, --restart-every <N> does a full reset every N runs (and the cheaper reset otherwise).
+# The policy and time of every reset is written next to the run's output (reset.txt), and a summary is printed at the end.
+#
+# With more workers, runs are also packed under a memory budget (by default, the same Java memory that setup_psl_examples.sh gives a single run).
+# Each example gets a memory profile (its peak memory over its past runs), taken from either the output of parse-results.py (--profile)
+# or the max RSS in the time.txt of the runs already in the results dir.
+# Every run gets a heap (-Xmx/-Xms) sized to its example's profile, and a run is only started once its heap fits in what is left of the budget.
+# Examples without a profile get the whole budget (so run alone).
+#
+# Like the run scripts, the run's (and Postgres') resource usage is sampled while it goes (see sample-resources.py)
+# into resources.bin, every --sample-interval seconds (0 to not sample).
+# With more workers, only the Postgres backends of the worker's own database are counted.
+
+import collections
+import glob
+import math
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import scriptloader
+
+THIS_DIR = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+BASE_DIR = os.path.abspath(os.path.join(THIS_DIR, '..'))
+RESULTS_DIR = os.path.join(BASE_DIR, 'results')
+SAMPLER_PATH = os.path.join(THIS_DIR, 'sample-resources.py')
+EXAMPLES_DIR = os.path.join(BASE_DIR, 'psl-examples')
+
+CLEAR_CACHE_SCRIPT = os.path.join(THIS_DIR, 'clear_cache.sh')
+BSOE_CLEAR_CACHE_SCRIPT = os.path.join(THIS_DIR, 'bsoe_clear_cache.sh')
+
+# A directory that only exists on BSOE servers.
+BSOE_DIR = '/soe'
+
+EXPERIMENTS = ['all-splits', 'first-split', 'simple']
+
+# The experiments that run every split (instead of just the first one).
+ALL_SPLITS_EXPERIMENTS = {'all-splits'}
+
+# The experiments whose run script does not put its results under an experiment::<name> dir.
+NO_EXPERIMENT_DIR_EXPERIMENTS = {'all-splits'}
+
+DEFAULT_WORKERS = 1
+
+# Seconds between resource samples (the same as the run scripts).
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 1.0
+
+POSTGRES_DB = 'psl'
+POSTGRES_USER = 'psl'
+
+# How to reset the database before each run:
+#  - full - Restart Postgres, recreate the database, and drop the page cache (clear_cache.sh). Only with one worker.
+#  - recreate - Drop and recreate the database (dropdb/createdb).
+#  - schema - Keep the database, but drop and recreate its public schema (and so every table in it).
+RESET_POLICIES = ['full', 'recreate', 'schema']
+DEFAULT_RESET_POLICY = 'full'
+DEFAULT_CONCURRENT_RESET_POLICY = 'recreate'
+
+RESET_SCHEMA_SQL = 'DROP SCHEMA IF EXISTS public CASCADE; CREATE SCHEMA public;'
+
+CLI_DIRNAME = 'cli'
+WORKER_CLI_DIRNAME = 'cli-worker::%s'
+
+LOG_FILENAME = 'out.txt'
+ERR_FILENAME = 'out.err'
+TIME_FILENAME = 'time.txt'
+RESET_FILENAME = 'reset.txt'
+RESOURCES_FILENAME = 'resources.bin'
+
+# Finished runs may have had their logs compressed (see compress-results.py).
+LOG_FILENAMES = [LOG_FILENAME, LOG_FILENAME + '.gz', LOG_FILENAME + '.zst']
+
+TIME_COMMAND = ['/usr/bin/time', '-v']
+
+# Pins a command (and everything it starts) to a list of CPUs.
+# The affinity is set before the command runs, so there is no window where its children could start unpinned
+# (and, unlike a preexec_fn, it is safe to use from the worker threads).
+PIN_COMMAND = ['taskset', '--cpu-list']
+
+MEMINFO_PATH = '/proc/meminfo'
+
+# Like setup_psl_examples.sh, the budget is the total memory floored by multiples of 5 GB, less another 5 GB (for the OS and Postgres).
+MEMORY_BUDGET_ROUNDING_GB = 5
+MEMORY_RESERVE_GB = 5
+
+# How much bigger than an example's peak memory its heap is.
+HEAP_HEADROOM = 1.25
+MIN_HEAP_GB = 1
+
+# The memory a JVM uses on top of its heap.
+JVM_OVERHEAD_GB = 1
+
+# How many times a run that does not fit in the memory budget can be passed over by smaller (later) runs.
+# After that, no more runs are started until it fits (so large examples don't wait forever).
+MAX_BYPASSES = 16
+
+BYTES_PER_GB = 1024 ** 3
+
+MEMTOTAL_REGEX = re.compile(r'^MemTotal:\s+(\d+) kB$', re.MULTILINE)
+MAX_RSS_REGEX = re.compile(r'^\s*Maximum resident set size \(kbytes\): (\d+)\s*$', re.MULTILINE)
+HEAP_OPTIONS_REGEX = re.compile(r'-Xmx\S+ -Xms\S+')
+
+# The settings read out of the run scripts.
+SETTING_REGEX = re.compile(r"^readonly (\w+)=(?:'([^'\n]*)'|(\S*))\s*$", re.MULTILINE)
+POSTGRES_OPTION_REGEX = re.compile(r'--postgres \w+')
+
+class Run:
+    def __init__(self, exampleDir, iteration, split, outDir, options, dataSplit = None):
+        self.exampleDir = exampleDir
+        self.exampleName = os.path.basename(exampleDir)
+        self.iteration = iteration
+        self.split = split
+        self.outDir = outDir
+        self.options = options
+        # The split to point the example's data files at (None to leave them alone).
+        self.dataSplit = dataSplit
+        # The heap to run with (None to leave run.sh alone) and how much of the memory budget the run takes.
+        self.heapGB = None
+        self.reservedGB = 0
+
+    def describe(self):
+        return "%s -- Iteration: %s, Split: %s, %s" % (self.exampleName, self.iteration, self.split, os.path.relpath(self.outDir, RESULTS_DIR))
+
+    def isDone(self):
+        return any([os.path.exists(os.path.join(self.outDir, filename)) for filename in LOG_FILENAMES])
+
+# Read the (readonly) settings out of an experiment's run script.
+# {name: value, ...}
+def loadSettings(experiment):
+    with open(os.path.join(THIS_DIR, "run-%s.sh" % (experiment)), 'r') as file:
+        text = file.read()
+
+    settings = {}
+    for match in SETTING_REGEX.finditer(text):
+        value = match.group(2)
+        if (value is None):
+            value = match.group(3)
+
+        settings[match.group(1)] = value
+
+    return settings
+
+# Get all the runs of an experiment, in the same order as the run script.
+def getRuns(experiment):
+    settings = loadSettings(experiment)
+
+    numRuns = int(settings['NUM_RUNS'])
+    candidateCounts = settings['CANDIDATE_COUNTS'].split()
+    searchBudgets = settings['SEARCH_BUDGET'].split()
+    searchTypes = settings['SEARCH_TYPE'].split()
+    baseOptions = settings['ADDITIONAL_PSL_OPTIONS']
+
+    outDir = RESULTS_DIR
+    if (experiment not in NO_EXPERIMENT_DIR_EXPERIMENTS):
+        outDir = os.path.join(outDir, "experiment::%s" % (settings['RUN_ID']))
+
+    # The same as `seq -w 1 <num runs>`.
+    iterations = [str(i).zfill(len(str(numRuns))) for i in range(1, numRuns + 1)]
+
+    runs = []
+
+    for iteration in iterations:
+        for cliDir in sorted(glob.glob(os.path.join(glob.escape(EXAMPLES_DIR), '*', CLI_DIRNAME))):
+            exampleDir = os.path.dirname(cliDir)
+            exampleName = os.path.basename(exampleDir)
+
+            if (experiment in ALL_SPLITS_EXPERIMENTS):
+                dataDir = os.path.join(exampleDir, 'data', exampleName)
+                splits = [split for split in sorted(os.listdir(dataDir)) if os.path.isdir(os.path.join(dataDir, split))]
+            else:
+                splits = [None]
+
+            for split in splits:
+                splitName = '00' if split is None else split
+                baseOutDir = os.path.join(outDir, "example::%s" % (exampleName), "iteration::%s" % (iteration), "split::%s" % (splitName))
+
+                runs.append(Run(exampleDir, iteration, splitName,
+                        os.path.join(baseOutDir, 'collective::false'),
+                        "%s -D grounding.collective=false" % (baseOptions),
+                        split))
+
+                for candidateCount in candidateCounts:
+                    for searchBudget in searchBudgets:
+                        for searchType in searchTypes:
+                            runOutDir = os.path.join(baseOutDir, 'collective::true',
+                                    "candidate_count::%s" % (candidateCount), "search_budget::%s" % (searchBudget), "search_type::%s" % (searchType))
+
+                            options = "%s -D grounding.collective=true" % (baseOptions)
+                            options += " -D grounding.collective.candidate.count=%s" % (candidateCount)
+                            options += " -D grounding.collective.candidate.search.budget=%s" % (searchBudget)
+                            options += " -D grounding.collective.candidate.search.type=%s" % (searchType)
+
+                            runs.append(Run(exampleDir, iteration, splitName, runOutDir, options, split))
+
+    return runs
+
+def getDefaultMemoryBudget():
+    with open(MEMINFO_PATH, 'r') as file:
+        totalKB = int(MEMTOTAL_REGEX.search(file.read()).group(1))
+
+    totalGB = totalKB // 1024 // 1024
+    return max(MIN_HEAP_GB + JVM_OVERHEAD_GB, totalGB // MEMORY_BUDGET_ROUNDING_GB * MEMORY_BUDGET_ROUNDING_GB - MEMORY_RESERVE_GB)
+
+# Get the peak memory of each example from the 'memory' column of the output of parse-results.py (TSV or npz).
+# {example: bytes, ...}
+def loadResultsProfiles(path):
+    header, rows = scriptloader.loadScript('analyze-results').fetchResults(path)
+    exampleIndex = header.index('example')
+    memoryIndex = header.index('memory')
+
+    profiles = {}
+    for row in rows:
+        if (row[memoryIndex] is not None):
+            profiles[row[exampleIndex]] = max(profiles.get(row[exampleIndex], 0), int(row[memoryIndex]))
+
+    return profiles
+
+# Get the peak memory of each example from the max RSS in the time.txt of its runs.
+# {example: bytes, ...}
+def loadTimeProfiles(resultsDir = RESULTS_DIR):
+    profiles = {}
+
+    for path in glob.glob(os.path.join(glob.escape(resultsDir), '**', TIME_FILENAME), recursive = True):
+        example = None
+        for part in os.path.relpath(path, resultsDir).split(os.sep):
+            if (part.startswith('example::')):
+                example = part.split('::', 1)[1]
+                break
+
+        if (example is None):
+            continue
+
+        with open(path, 'r') as file:
+            match = MAX_RSS_REGEX.search(file.read())
+
+        if (match is not None):
+            profiles[example] = max(profiles.get(example, 0), int(match.group(1)) * 1024)
+
+    return profiles
+
+def loadProfiles(profilePath = None):
+    if (profilePath is not None):
+        return loadResultsProfiles(profilePath)
+
+    return loadTimeProfiles()
+
+# Size the heap of an example from its profile.
+# Returns (heap (GB), how much of the memory budget a run takes (GB)).
+def getHeapSize(example, profiles, memoryBudgetGB):
+    maxHeapGB = max(MIN_HEAP_GB, memoryBudgetGB - JVM_OVERHEAD_GB)
+
+    heapGB = maxHeapGB
+    if (example in profiles):
+        heapGB = min(maxHeapGB, max(MIN_HEAP_GB, math.ceil(profiles[example] * HEAP_HEADROOM / BYTES_PER_GB)))
+
+    return heapGB, min(memoryBudgetGB, heapGB + JVM_OVERHEAD_GB)
+
+def setHeapSizes(runs, profiles, memoryBudgetGB):
+    for run in runs:
+        run.heapGB, run.reservedGB = getHeapSize(run.exampleName, profiles, memoryBudgetGB)
+
+def printProfiles(examples, profiles, memoryBudgetGB):
+    print("Memory budget: %d GB." % (memoryBudgetGB), file = sys.stderr)
+
+    for example in sorted(examples):
+        heapGB, _ = getHeapSize(example, profiles, memoryBudgetGB)
+        if (example in profiles):
+            print("    %s -- Peak memory: %.1f GB, Heap: %d GB." % (example, profiles[example] / BYTES_PER_GB, heapGB), file = sys.stderr)
+        else:
+            print("    %s -- No memory profile, Heap: %d GB." % (example, heapGB), file = sys.stderr)
+
+# Hands out runs to workers, only starting a run once it fits in the memory budget.
+# Runs are started in order within each example, so only the next run of each example is considered.
+class AdmissionQueue:
+    def __init__(self, runs, memoryBudgetGB):
+        self.memoryBudgetGB = memoryBudgetGB
+        self.usedGB = 0
+        self.bypasses = 0
+        self.stopped = False
+        self.condition = threading.Condition()
+
+        # {example: deque([(index, run), ...]), ...}
+        self.pending = {}
+        for (index, run) in enumerate(runs):
+            self.pending.setdefault(run.exampleName, collections.deque()).append((index, run))
+
+    # Wait for the next run that fits (None once there are no more runs to start).
+    def take(self):
+        with self.condition:
+            while (True):
+                if (self.stopped or len(self.pending) == 0):
+                    return None
+
+                run = self._choose()
+                if (run is not None):
+                    self.usedGB += run.reservedGB
+                    return run
+
+                self.condition.wait()
+
+    def _choose(self):
+        heads = sorted([(runs[0][0], example) for (example, runs) in self.pending.items()])
+
+        for (i, (_, example)) in enumerate(heads):
+            run = self.pending[example][0][1]
+
+            if (self.usedGB + run.reservedGB > self.memoryBudgetGB):
+                # The oldest run has been passed over enough, wait for it.
+                if (i == 0 and self.bypasses >= MAX_BYPASSES):
+                    return None
+
+                continue
+
+            if (i == 0):
+                self.bypasses = 0
+            else:
+                self.bypasses += 1
+
+            self.pending[example].popleft()
+            if (len(self.pending[example]) == 0):
+                del self.pending[example]
+
+            return run
+
+        return None
+
+    def release(self, run, success = True):
+        with self.condition:
+            self.usedGB -= run.reservedGB
+            self.condition.notify_all()
+
+    # Don't start any more runs.
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+# Split the available CPUs evenly between the workers.
+# [{cpu, ...} or None, ...]
+def getWorkerCPUs(numWorkers, pin):
+    if (not pin or numWorkers == 1 or not hasattr(os, 'sched_getaffinity')):
+        return [None] * numWorkers
+
+    cpus = sorted(os.sched_getaffinity(0))
+    if (len(cpus) < numWorkers):
+        print("Only %d CPUs for %d workers, not pinning." % (len(cpus), numWorkers), file = sys.stderr)
+        return [None] * numWorkers
+
+    perWorker = len(cpus) // numWorkers
+    return [set(cpus[(i * perWorker):((i + 1) * perWorker)]) for i in range(numWorkers)]
+
+# A worker that is not shared runs from its own copies of the cli dirs (against its own database).
+# The name (the id by default) keeps the copies of workers on different hosts apart.
+class Worker:
+    def __init__(self, id, cpus, shared = False, name = None, resetPolicy = None, restartEvery = 0,
+            sampleInterval = DEFAULT_SAMPLE_INTERVAL_SECONDS):
+        self.id = id
+        self.cpus = cpus
+        self.shared = shared
+        self.sampleInterval = sampleInterval
+
+        self.name = name
+        if (self.name is None):
+            self.name = str(id)
+
+        self.resetPolicy = resetPolicy
+        if (self.resetPolicy is None):
+            self.resetPolicy = DEFAULT_RESET_POLICY if shared else DEFAULT_CONCURRENT_RESET_POLICY
+
+        if (self.resetPolicy not in RESET_POLICIES):
+            raise ValueError("Unknown reset policy: '%s'." % (self.resetPolicy))
+
+        if (not shared and (self.resetPolicy == 'full' or restartEvery > 0)):
+            raise ValueError("Postgres can only be restarted (a full reset) when there is a single worker.")
+
+        self.restartEvery = restartEvery
+        self.numResets = 0
+
+        # {policy: [seconds, ...], ...}
+        self.resetTimes = {}
+
+        self.database = POSTGRES_DB
+        if (not self.shared):
+            self.database = "%s_%d" % (POSTGRES_DB, id)
+
+        # {example dir: cli dir, ...}
+        self.cliDirs = {}
+        # The examples whose data files were pointed at another split.
+        self.splitExamples = set()
+
+    def log(self, message):
+        print("[worker %s] %s" % (self.name, message), flush = True)
+
+    # Get the cli dir this worker runs an example from.
+    # Other than the first worker, workers get their own copy of the cli dir (pointed at their own database).
+    def getCliDir(self, exampleDir):
+        if (exampleDir in self.cliDirs):
+            return self.cliDirs[exampleDir]
+
+        cliDir = os.path.join(exampleDir, CLI_DIRNAME)
+
+        if (not self.shared):
+            workerCliDir = os.path.join(exampleDir, WORKER_CLI_DIRNAME % (self.name))
+            if (os.path.exists(workerCliDir)):
+                shutil.rmtree(workerCliDir)
+
+            shutil.copytree(cliDir, workerCliDir, symlinks = True)
+
+            runScriptPath = os.path.join(workerCliDir, 'run.sh')
+            with open(runScriptPath, 'r') as file:
+                runScript = file.read()
+
+            with open(runScriptPath, 'w') as file:
+                file.write(POSTGRES_OPTION_REGEX.sub("--postgres %s" % (self.database), runScript))
+
+            cliDir = workerCliDir
+
+        self.cliDirs[exampleDir] = cliDir
+        return cliDir
+
+    def cleanup(self):
+        if (self.shared):
+            # Reset the data files back to split zero (like run-all-splits.sh does).
+            for exampleName in self.splitExamples:
+                self.setDataSplit(os.path.join(EXAMPLES_DIR, exampleName, CLI_DIRNAME), exampleName, '0')
+            return
+
+        for cliDir in self.cliDirs.values():
+            shutil.rmtree(cliDir, ignore_errors = True)
+
+    def clearCache(self):
+        if (os.path.isdir(BSOE_DIR)):
+            subprocess.run([BSOE_CLEAR_CACHE_SCRIPT], check = True)
+        else:
+            subprocess.run(['sudo', CLEAR_CACHE_SCRIPT], check = True)
+
+    def recreateDatabase(self):
+        subprocess.run(['dropdb', '-U', POSTGRES_USER, '--if-exists', self.database], check = True)
+        subprocess.run(['createdb', '-U', POSTGRES_USER, self.database], check = True)
+
+    # Reset the database before a run.
+    # Returns (the policy used, seconds).
+    def resetDatabase(self):
+        policy = self.resetPolicy
+        if (self.restartEvery > 0 and self.numResets % self.restartEvery == 0):
+            policy = 'full'
+
+        start = time.perf_counter()
+
+        if (policy == 'full'):
+            self.clearCache()
+        elif (policy == 'recreate'):
+            self.recreateDatabase()
+        elif (policy == 'schema'):
+            # The database may not exist yet.
+            if (self.numResets == 0):
+                self.recreateDatabase()
+            else:
+                subprocess.run(['psql', '-U', POSTGRES_USER, '-q', '-d', self.database, '-c', RESET_SCHEMA_SQL], check = True)
+        else:
+            raise ValueError("Unknown reset policy: '%s'." % (policy))
+
+        seconds = time.perf_counter() - start
+
+        self.numResets += 1
+        self.resetTimes.setdefault(policy, []).append(seconds)
+
+        return policy, seconds
+
+    def setHeapSize(self, cliDir, heapGB):
+        runScriptPath = os.path.join(cliDir, 'run.sh')
+        with open(runScriptPath, 'r') as file:
+            runScript = file.read()
+
+        with open(runScriptPath, 'w') as file:
+            file.write(HEAP_OPTIONS_REGEX.sub("-Xmx%dG -Xms%dG" % (heapGB, heapGB), runScript))
+
+    # Point the example's data files at a split (like run-all-splits.sh does).
+    def setDataSplit(self, cliDir, exampleName, split):
+        pattern = re.compile(r'data/%s/[0-9]+' % (re.escape(exampleName)))
+
+        for path in glob.glob(os.path.join(glob.escape(cliDir), glob.escape(exampleName) + '*.data')):
+            with open(path, 'r') as file:
+                text = file.read()
+
+            with open(path, 'w') as file:
+                file.write(pattern.sub("data/%s/%s" % (exampleName, split), text))
+
+    # Sample the resource usage of a running run (and its Postgres backends) into the run's output dir.
+    def startSampler(self, run, pid):
+        if (self.sampleInterval <= 0):
+            return None
+
+        command = [sys.executable, SAMPLER_PATH, '--interval', str(self.sampleInterval)]
+
+        # A shared worker has the whole Postgres server to itself.
+        if (not self.shared):
+            command += ['--database', self.database]
+
+        command += [os.path.join(run.outDir, RESOURCES_FILENAME), str(pid)]
+
+        return subprocess.Popen(command, stdout = subprocess.DEVNULL)
+
+    def run(self, run):
+        # Check again right before running, in case another process ran it in the meantime.
+        if (run.isDone()):
+            self.log("Output file already exists, skipping: %s" % (os.path.join(run.outDir, LOG_FILENAME)))
+            return
+
+        os.makedirs(run.outDir, exist_ok = True)
+
+        cliDir = self.getCliDir(run.exampleDir)
+        if (run.dataSplit is not None):
+            self.setDataSplit(cliDir, run.exampleName, run.dataSplit)
+            self.splitExamples.add(run.exampleName)
+
+        heap = ''
+        if (run.heapGB is not None):
+            self.setHeapSize(cliDir, run.heapGB)
+            heap = " (%d GB heap)" % (run.heapGB)
+
+        policy, seconds = self.resetDatabase()
+        with open(os.path.join(run.outDir, RESET_FILENAME), 'w') as file:
+            file.write("Policy: %s\nSeconds: %.3f\n" % (policy, seconds))
+
+        self.log("Running %s%s." % (run.describe(), heap))
+
+        command = TIME_COMMAND + ["--output=%s" % (os.path.join(run.outDir, TIME_FILENAME)), './run.sh'] + run.options.split()
+        if (self.cpus is not None):
+            command = PIN_COMMAND + [','.join(map(str, sorted(self.cpus)))] + command
+
+        with open(os.path.join(run.outDir, LOG_FILENAME), 'w') as outFile, open(os.path.join(run.outDir, ERR_FILENAME), 'w') as errFile:
+            process = subprocess.Popen(command, cwd = cliDir, stdout = outFile, stderr = errFile)
+            sampler = self.startSampler(run, process.pid)
+
+            try:
+                process.wait()
+            finally:
+                if (sampler is not None):
+                    sampler.terminate()
+                    sampler.wait()
+
+        # Copy any artifacts into the output directory.
+        inferredDir = os.path.join(cliDir, 'inferred-predicates')
+        if (os.path.isdir(inferredDir)):
+            shutil.copytree(inferredDir, os.path.join(run.outDir, 'inferred-predicates'), dirs_exist_ok = True)
+
+        for path in glob.glob(os.path.join(glob.escape(cliDir), '*.data')) + glob.glob(os.path.join(glob.escape(cliDir), '*.psl')):
+            shutil.copy(path, run.outDir)
+
+def work(worker, runs):
+    while (True):
+        run = runs.take()
+        if (run is None):
+            return
+
+        success = False
+        try:
+            worker.run(run)
+            success = True
+        except Exception as ex:
+            worker.log("Failed %s: %s" % (run.describe(), ex))
+        finally:
+            runs.release(run, success)
+
+# Run workers (each in its own thread) until there are no more runs.
+def runWorkers(workers, runQueue):
+    threads = [threading.Thread(target = work, args = (worker, runQueue)) for worker in workers]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for thread in threads:
+            while (thread.is_alive()):
+                thread.join(1.0)
+    except KeyboardInterrupt:
+        # Let the current runs finish, but don't start any more.
+        runQueue.stop()
+        print("Interrupted, waiting for the current runs to finish.", file = sys.stderr)
+        for thread in threads:
+            thread.join()
+    finally:
+        for worker in workers:
+            worker.cleanup()
+
+        printResetTimes(workers)
+
+def printResetTimes(workers):
+    resetTimes = {}
+    for worker in workers:
+        for (policy, times) in worker.resetTimes.items():
+            resetTimes.setdefault(policy, []).extend(times)
+
+    for (policy, times) in sorted(resetTimes.items()):
+        print("Database resets (%s) -- Count: %d, Mean: %.2f seconds, Max: %.2f seconds, Total: %.1f seconds." % (
+                policy, len(times), sum(times) / len(times), max(times), sum(times)), file = sys.stderr)
+
+def main(experiment, numWorkers = DEFAULT_WORKERS, pin = True, dryRun = False, memoryBudgetGB = None, profilePath = None,
+        resetPolicy = None, restartEvery = 0, sampleInterval = DEFAULT_SAMPLE_INTERVAL_SECONDS):
+    workers = [Worker(i, cpus, shared = (numWorkers == 1), resetPolicy = resetPolicy, restartEvery = restartEvery, sampleInterval = sampleInterval)
+            for (i, cpus) in enumerate(getWorkerCPUs(numWorkers, pin))]
+
+    runs = getRuns(experiment)
+    pending = [run for run in runs if not run.isDone()]
+
+    print("%d runs, %d already done." % (len(runs), len(runs) - len(pending)), file = sys.stderr)
+
+    if (memoryBudgetGB is None):
+        memoryBudgetGB = getDefaultMemoryBudget()
+
+    # A single worker runs with the heap from setup_psl_examples.sh (like the run scripts).
+    if (numWorkers > 1):
+        profiles = loadProfiles(profilePath)
+        setHeapSizes(pending, profiles, memoryBudgetGB)
+        printProfiles({run.exampleName for run in pending}, profiles, memoryBudgetGB)
+
+    if (dryRun):
+        for run in pending:
+            print(run.describe())
+        return
+
+    # Clear existing jars (the same as the run scripts).
+    for path in glob.glob(os.path.join(glob.escape(EXAMPLES_DIR), '**', '*.jar'), recursive = True):
+        os.remove(path)
+
+    runQueue = AdmissionQueue(pending, memoryBudgetGB)
+    runWorkers(workers, runQueue)
+
+def _usage(executable):
+    print("USAGE: python3 %s [--workers <num workers>] [--memory-budget <GB>] [--profile <results file>] [--reset <policy>] [--restart-every <num runs>] [--sample-interval <seconds>] [--no-pin] [--dry-run] <%s>" % (executable, '|'.join(EXPERIMENTS)), file = sys.stderr)
+    print("    --workers - The most runs to do at once (0 for one per core). Default: %d." % (DEFAULT_WORKERS), file = sys.stderr)
+    print("    --memory-budget - The memory (GB) that all the running runs can use. Default: the Java memory from setup_psl_examples.sh.", file = sys.stderr)
+    print("    --profile - Get the memory profile of each example from the output of parse-results.py (instead of the time.txt of finished runs).", file = sys.stderr)
+    print("    --reset - How to reset the database before each run, one of: %s. Default: %s (%s with more than one worker)." % (', '.join(RESET_POLICIES), DEFAULT_RESET_POLICY, DEFAULT_CONCURRENT_RESET_POLICY), file = sys.stderr)
+    print("    --restart-every - Do a full reset every this many runs (only with one worker).", file = sys.stderr)
+    print("    --sample-interval - Seconds between samples of each run's resource usage (0 to not sample). Default: %s." % (DEFAULT_SAMPLE_INTERVAL_SECONDS), file = sys.stderr)
+    print("    --no-pin - Don't pin each worker to its own CPUs.", file = sys.stderr)
+    print("    --dry-run - Just list the runs that still need to be done.", file = sys.stderr)
+    sys.exit(1)
+
+def _load_args(args):
+    executable = args.pop(0)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable)
+
+    options = {}
+
+    while (len(args) > 0 and args[0].startswith('--')):
+        arg = args.pop(0)
+
+        if (arg == '--workers' and len(args) > 0):
+            options['numWorkers'] = int(args.pop(0))
+            if (options['numWorkers'] < 0):
+                raise ValueError("Number of workers must be non-negative, got: %d." % (options['numWorkers']))
+
+            if (options['numWorkers'] == 0):
+                options['numWorkers'] = os.cpu_count()
+        elif (arg == '--memory-budget' and len(args) > 0):
+            options['memoryBudgetGB'] = int(args.pop(0))
+            if (options['memoryBudgetGB'] < MIN_HEAP_GB + JVM_OVERHEAD_GB):
+                raise ValueError("Memory budget must be at least %d GB, got: %d." % (MIN_HEAP_GB + JVM_OVERHEAD_GB, options['memoryBudgetGB']))
+        elif (arg == '--profile' and len(args) > 0):
+            options['profilePath'] = args.pop(0)
+            if (not os.path.isfile(options['profilePath'])):
+                raise ValueError("Can't find the specified profile (results) file: " + options['profilePath'])
+        elif (arg == '--reset' and len(args) > 0):
+            options['resetPolicy'] = args.pop(0)
+            if (options['resetPolicy'] not in RESET_POLICIES):
+                raise ValueError("Unknown reset policy: '%s'." % (options['resetPolicy']))
+        elif (arg == '--restart-every' and len(args) > 0):
+            options['restartEvery'] = int(args.pop(0))
+            if (options['restartEvery'] < 0):
+                raise ValueError("Number of runs between restarts must be non-negative, got: %d." % (options['restartEvery']))
+        elif (arg == '--sample-interval' and len(args) > 0):
+            options['sampleInterval'] = float(args.pop(0))
+            if (options['sampleInterval'] < 0):
+                raise ValueError("Sample interval must be non-negative, got: %f." % (options['sampleInterval']))
+        elif (arg == '--no-pin'):
+            options['pin'] = False
+        elif (arg == '--dry-run'):
+            options['dryRun'] = True
+        else:
+            _usage(executable)
+
+    if (len(args) != 1):
+        _usage(executable)
+
+    options['experiment'] = args.pop(0)
+    if (options['experiment'] not in EXPERIMENTS):
+        raise ValueError("Unknown experiment: '%s'." % (options['experiment']))
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
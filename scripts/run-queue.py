@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+
+# Split the runs of an experiment across several hosts with a shared work queue.
+# The queue is a SQLite database on a filesystem that every host can see (e.g. NFS),
+# next to a results dir that every host can also see (e.g. this repository on a shared home dir).
+#
+# A coordinator publishes the runs of an experiment into the queue (once):
+#     ./scripts/run-queue.py publish <queue> <experiment>
+# Then, on every host, workers claim runs from the queue and run them (the same way ./scripts/run-parallel.py does):
+#     ./scripts/run-queue.py work <queue> [--workers <num workers>] ...
+# And the progress can be checked from anywhere:
+#     ./scripts/run-queue.py status <queue>
+#
+# A claimed run is leased to the process that claimed it, and the lease is renewed while the run is going.
+# If a worker process dies (or its host does), its leases run out and its runs get claimed again (up to MAX_ATTEMPTS times).
+# Output is put in the same results dir layout as the run scripts (paths in the queue are relative to the results dir).
+# Since hosts share the psl-examples dir, every worker runs from its own copy of the cli dirs
+# (named after its host) against its own (host local) Postgres database.
+
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+
+import scriptloader
+
+COMMANDS = ['publish', 'work', 'status']
+
+DEFAULT_WORKERS = 1
+
+# How long a claim lasts without being renewed.
+LEASE_SECONDS = 300
+# How often leases are renewed.
+RENEW_SECONDS = LEASE_SECONDS / 5
+# How often to look for runs when all the runs that are left are claimed by someone else.
+POLL_SECONDS = 30
+
+# How many times a run is tried before it is marked as failed.
+MAX_ATTEMPTS = 3
+
+# How long to wait on a lock held by another host.
+QUEUE_TIMEOUT_SECONDS = 600
+
+STATUS_PENDING = 'pending'
+STATUS_CLAIMED = 'claimed'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+# The run outputs removed before an unfinished run is tried again.
+STALE_OUTPUT_FILENAMES = ['out.txt', 'out.txt.gz', 'out.txt.zst', 'out.err', 'time.txt', 'reset.txt', 'resources.bin']
+
+CREATE_QUEUE = '''
+    CREATE TABLE IF NOT EXISTS Runs (
+        id INTEGER PRIMARY KEY,
+        out_dir TEXT NOT NULL UNIQUE,
+        example TEXT NOT NULL,
+        iteration TEXT NOT NULL,
+        split TEXT NOT NULL,
+        data_split TEXT,
+        options TEXT NOT NULL,
+        status TEXT NOT NULL,
+        worker TEXT,
+        lease_expires REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        started REAL,
+        finished REAL
+    );
+
+    CREATE INDEX IF NOT EXISTS IX_Runs_status ON Runs (status, id);
+'''
+
+# The claimable runs (pending or with a lapsed lease) of some examples, in order.
+CLAIMABLE_QUERY = '''
+    SELECT
+        id,
+        out_dir,
+        example,
+        iteration,
+        split,
+        data_split,
+        options,
+        attempts
+    FROM Runs
+    WHERE
+        (status = 'pending' OR (status = 'claimed' AND lease_expires < ?))
+        AND example IN (%s)
+    ORDER BY id
+    LIMIT 1
+'''
+
+CLAIM_QUERY = '''
+    UPDATE Runs
+    SET
+        status = 'claimed',
+        worker = :worker,
+        lease_expires = :now + :lease,
+        attempts = attempts + 1,
+        started = :now
+    WHERE id = :id
+'''
+
+# Runs whose lease lapsed on their last attempt.
+FAIL_LAPSED_QUERY = '''
+    UPDATE Runs
+    SET status = 'failed'
+    WHERE
+        status = 'claimed'
+        AND lease_expires < :now
+        AND attempts >= :maxAttempts
+'''
+
+REMAINING_QUERY = '''
+    SELECT COUNT(*)
+    FROM Runs
+    WHERE status IN ('pending', 'claimed')
+'''
+
+RENEW_QUERY = '''
+    UPDATE Runs
+    SET lease_expires = :now + :lease
+    WHERE
+        status = 'claimed'
+        AND worker = :worker
+'''
+
+# Hand back a run that was claimed after the workers were stopped (as if it had never been claimed).
+UNCLAIM_QUERY = '''
+    UPDATE Runs
+    SET
+        status = 'pending',
+        worker = NULL,
+        lease_expires = NULL,
+        attempts = attempts - 1,
+        started = NULL
+    WHERE
+        id = :id
+        AND status = 'claimed'
+        AND worker = :worker
+'''
+
+# Only finish a run that is still ours (it may have been claimed by someone else after our lease lapsed).
+FINISH_QUERY = '''
+    UPDATE Runs
+    SET
+        status = :status,
+        lease_expires = NULL,
+        finished = :now
+    WHERE
+        id = :id
+        AND status = 'claimed'
+        AND worker = :worker
+'''
+
+STATUS_QUERY = '''
+    SELECT
+        status,
+        COUNT(*)
+    FROM Runs
+    GROUP BY status
+    ORDER BY status
+'''
+
+WORKERS_QUERY = '''
+    SELECT
+        worker,
+        COUNT(*),
+        MIN(lease_expires)
+    FROM Runs
+    WHERE status = 'claimed'
+    GROUP BY worker
+    ORDER BY worker
+'''
+
+# WAL does not work over network filesystems, so the queue sticks to the default (rollback) journal.
+def openQueue(queuePath):
+    connection = sqlite3.connect(queuePath, timeout = QUEUE_TIMEOUT_SECONDS, isolation_level = None, check_same_thread = False)
+    connection.execute('PRAGMA journal_mode = DELETE')
+    connection.executescript(CREATE_QUEUE)
+    return connection
+
+# Add the runs of an experiment to the queue (runs that are already in the queue are left alone).
+# Runs that already have output are added as done.
+def publish(queuePath, experiment):
+    scheduler = scriptloader.loadScript('run-parallel')
+    if (experiment not in scheduler.EXPERIMENTS):
+        raise ValueError("Unknown experiment: '%s'." % (experiment))
+
+    runs = scheduler.getRuns(experiment)
+
+    connection = openQueue(queuePath)
+    connection.execute('BEGIN IMMEDIATE')
+
+    nextId = connection.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM Runs').fetchone()[0]
+    rows = []
+    for (i, run) in enumerate(runs):
+        status = STATUS_DONE if run.isDone() else STATUS_PENDING
+        rows.append((nextId + i, os.path.relpath(run.outDir, scheduler.RESULTS_DIR), run.exampleName, run.iteration, run.split, run.dataSplit, run.options, status))
+
+    before = connection.total_changes
+    connection.executemany('INSERT OR IGNORE INTO Runs (id, out_dir, example, iteration, split, data_split, options, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+    added = connection.total_changes - before
+
+    connection.execute('COMMIT')
+    connection.close()
+
+    print("Published %d runs (%d were already in the queue)." % (added, len(runs) - added), file = sys.stderr)
+
+# Hands out runs from the queue to the workers in this process.
+# Has the same interface as run-parallel.py's AdmissionQueue, and packs runs under a memory budget the same way:
+# when the oldest claimable run does not fit (in this host's budget), later runs that do fit can be claimed ahead of it,
+# but only MAX_BYPASSES (from run-parallel.py) times in a row. After that, no more runs are claimed here until it fits (or another host claims it).
+class WorkQueue:
+    def __init__(self, scheduler, queuePath, memoryBudgetGB, profiles):
+        self.scheduler = scheduler
+        self.parser = scriptloader.loadScript('parse-results')
+        self.memoryBudgetGB = memoryBudgetGB
+        self.profiles = profiles
+        self.usedGB = 0
+        self.bypasses = 0
+        self.stopped = False
+        # How many runs have been released (so take() knows if a run finished while it was claiming).
+        self.releases = 0
+
+        self.worker = "%s:%d" % (socket.gethostname(), os.getpid())
+
+        self.connection = openQueue(queuePath)
+        # |lock| guards the connection, |claimLock| makes the workers in this process claim one at a time (so two claims can not count on the same free memory),
+        # and |condition| guards the memory bookkeeping (and is what the workers wait on).
+        self.lock = threading.Lock()
+        self.claimLock = threading.Lock()
+        self.condition = threading.Condition()
+
+        self.examples = [row[0] for row in self.connection.execute('SELECT DISTINCT example FROM Runs')]
+
+        self.renewer = threading.Thread(target = self._renew, daemon = True)
+        self.renewer.start()
+
+    # Wait for the next run that fits (None once there are no more runs to start).
+    # A claim can wait a long time on the (shared) queue database and clears out stale output,
+    # so it is made without holding |condition| (which release() and stop() need).
+    def take(self):
+        while (True):
+            with self.claimLock:
+                with self.condition:
+                    if (self.stopped):
+                        return None
+
+                    usedGB = self.usedGB
+                    releases = self.releases
+
+                run, remaining = self._claim(usedGB)
+
+                if (run is not None):
+                    with self.condition:
+                        if (not self.stopped):
+                            self.usedGB += run.reservedGB
+                            return run
+
+                    self._execute(UNCLAIM_QUERY, {'id': run.queueId, 'worker': self.worker})
+                    return None
+
+            if (remaining == 0):
+                return None
+
+            # Wait for one of our runs to finish (or for someone else's lease to lapse).
+            with self.condition:
+                if (not self.stopped and self.releases == releases):
+                    self.condition.wait(POLL_SECONDS)
+
+    # Returns (claimed run or None, the number of runs left to be done).
+    def _claim(self, usedGB):
+        fitting = []
+        for example in self.examples:
+            _, reservedGB = self.scheduler.getHeapSize(example, self.profiles, self.memoryBudgetGB)
+            if (usedGB + reservedGB <= self.memoryBudgetGB):
+                fitting.append(example)
+
+        with self.lock:
+            now = time.time()
+
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.connection.execute(FAIL_LAPSED_QUERY, {'now': now, 'maxAttempts': MAX_ATTEMPTS})
+
+                # The oldest claimable run (of any example).
+                row = self._findClaimable(now, self.examples)
+
+                if (row is not None and row[2] in fitting):
+                    self.bypasses = 0
+                elif (row is not None and self.bypasses < self.scheduler.MAX_BYPASSES):
+                    row = self._findClaimable(now, fitting)
+                    if (row is not None):
+                        self.bypasses += 1
+                else:
+                    # The oldest run has been passed over enough, wait for it.
+                    row = None
+
+                if (row is not None):
+                    self.connection.execute(CLAIM_QUERY, {'worker': self.worker, 'now': now, 'lease': LEASE_SECONDS, 'id': row[0]})
+
+                remaining = self.connection.execute(REMAINING_QUERY).fetchone()[0]
+                self.connection.execute('COMMIT')
+            except:
+                self.connection.execute('ROLLBACK')
+                raise
+
+        if (row is None):
+            return None, remaining
+
+        (id, outDir, example, iteration, split, dataSplit, options, attempts) = row
+
+        run = self.scheduler.Run(os.path.join(self.scheduler.EXAMPLES_DIR, example), iteration, split,
+                os.path.join(self.scheduler.RESULTS_DIR, outDir), options, dataSplit)
+        run.queueId = id
+        run.heapGB, run.reservedGB = self.scheduler.getHeapSize(example, self.profiles, self.memoryBudgetGB)
+
+        # An earlier attempt died part way through, clear out what it left so the run is not skipped.
+        # If it died after the run finished (but before it was released), then the run is left to be skipped (and marked as done).
+        if (attempts > 0 and not self._isFinished(run)):
+            for filename in STALE_OUTPUT_FILENAMES:
+                path = os.path.join(run.outDir, filename)
+                if (os.path.exists(path)):
+                    os.remove(path)
+
+        return run, remaining
+
+    # Returns the first claimable run (as a CLAIMABLE_QUERY row) of some examples, or None.
+    def _findClaimable(self, now, examples):
+        if (len(examples) == 0):
+            return None
+
+        query = CLAIMABLE_QUERY % (', '.join(['?'] * len(examples)))
+        return self.connection.execute(query, [now] + examples).fetchone()
+
+    # Check if a run's log is complete (with the same check as ./scripts/parse-results.py --tail).
+    def _isFinished(self, run):
+        for filename in self.parser.LOG_FILENAMES:
+            logPath = os.path.join(run.outDir, filename)
+            if (not os.path.isfile(logPath)):
+                continue
+
+            # Only finished runs get compressed.
+            if (filename != self.parser.LOG_FILENAME):
+                return True
+
+            return self.parser.isFinished(logPath)
+
+        return False
+
+    def release(self, run, success = True):
+        status = STATUS_DONE
+        if (not success):
+            attempts = self._execute('SELECT attempts FROM Runs WHERE id = ?', (run.queueId,))[0][0]
+            status = STATUS_PENDING if attempts < MAX_ATTEMPTS else STATUS_FAILED
+
+        self._execute(FINISH_QUERY, {'status': status, 'now': time.time(), 'id': run.queueId, 'worker': self.worker})
+
+        with self.condition:
+            self.usedGB -= run.reservedGB
+            self.releases += 1
+            self.condition.notify_all()
+
+    # Don't start any more runs.
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def _execute(self, query, parameters):
+        with self.lock:
+            return self.connection.execute(query, parameters).fetchall()
+
+    def _renew(self):
+        while (True):
+            time.sleep(RENEW_SECONDS)
+
+            # Keep trying, the lease is only lost if it can not be renewed for LEASE_SECONDS.
+            try:
+                self._execute(RENEW_QUERY, {'now': time.time(), 'lease': LEASE_SECONDS, 'worker': self.worker})
+            except sqlite3.Error as ex:
+                print("Failed to renew leases: %s" % (ex), file = sys.stderr)
+
+def work(queuePath, numWorkers = DEFAULT_WORKERS, pin = True, memoryBudgetGB = None, profilePath = None, resetPolicy = None, sampleInterval = None):
+    scheduler = scriptloader.loadScript('run-parallel')
+
+    if (sampleInterval is None):
+        sampleInterval = scheduler.DEFAULT_SAMPLE_INTERVAL_SECONDS
+
+    hostname = socket.gethostname()
+    workers = [scheduler.Worker(i, cpus, name = "%s-%d" % (hostname, i), resetPolicy = resetPolicy, sampleInterval = sampleInterval)
+            for (i, cpus) in enumerate(scheduler.getWorkerCPUs(numWorkers, pin))]
+
+    if (memoryBudgetGB is None):
+        memoryBudgetGB = scheduler.getDefaultMemoryBudget()
+
+    profiles = scheduler.loadProfiles(profilePath)
+    runQueue = WorkQueue(scheduler, queuePath, memoryBudgetGB, profiles)
+    scheduler.printProfiles(runQueue.examples, profiles, memoryBudgetGB)
+
+    scheduler.runWorkers(workers, runQueue)
+
+def status(queuePath):
+    connection = openQueue(queuePath)
+    now = time.time()
+
+    for (runStatus, count) in connection.execute(STATUS_QUERY):
+        print("%s\t%d" % (runStatus, count))
+
+    for (worker, count, leaseExpires) in connection.execute(WORKERS_QUERY):
+        lapsed = ''
+        if (leaseExpires < now):
+            lapsed = ' (lease lapsed)'
+
+        print("    %s -- %d claimed%s" % (worker, count, lapsed))
+
+    connection.close()
+
+def main(command, queuePath, **options):
+    if (command == 'publish'):
+        publish(queuePath, **options)
+    elif (command == 'work'):
+        work(queuePath, **options)
+    else:
+        status(queuePath)
+
+def _usage(executable):
+    print("USAGE: python3 %s publish <queue> <experiment>" % (executable), file = sys.stderr)
+    print("       python3 %s work <queue> [--workers <num workers>] [--memory-budget <GB>] [--profile <results file>] [--reset <policy>] [--sample-interval <seconds>] [--no-pin]" % (executable), file = sys.stderr)
+    print("       python3 %s status <queue>" % (executable), file = sys.stderr)
+    print("    publish - Add the runs of an experiment to the queue.", file = sys.stderr)
+    print("    work - Claim and run runs from the queue until there are none left (see ./scripts/run-parallel.py for the options).", file = sys.stderr)
+    print("    status - Show how many runs are in each state, and who has claimed them.", file = sys.stderr)
+    sys.exit(1)
+
+def _load_args(args):
+    executable = args.pop(0)
+    if (len(args) < 2 or ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args})):
+        _usage(executable)
+
+    options = {
+        'command': args.pop(0),
+        'queuePath': args.pop(0),
+    }
+
+    if (options['command'] not in COMMANDS):
+        _usage(executable)
+
+    if (options['command'] == 'publish'):
+        if (len(args) != 1):
+            _usage(executable)
+
+        options['experiment'] = args.pop(0)
+        return options
+
+    if (options['command'] == 'status'):
+        if (len(args) != 0):
+            _usage(executable)
+
+        return options
+
+    while (len(args) > 0):
+        arg = args.pop(0)
+
+        if (arg == '--workers' and len(args) > 0):
+            options['numWorkers'] = int(args.pop(0))
+            if (options['numWorkers'] < 0):
+                raise ValueError("Number of workers must be non-negative, got: %d." % (options['numWorkers']))
+
+            if (options['numWorkers'] == 0):
+                options['numWorkers'] = os.cpu_count()
+        elif (arg == '--memory-budget' and len(args) > 0):
+            options['memoryBudgetGB'] = int(args.pop(0))
+        elif (arg == '--profile' and len(args) > 0):
+            options['profilePath'] = args.pop(0)
+            if (not os.path.isfile(options['profilePath'])):
+                raise ValueError("Can't find the specified profile (results) file: " + options['profilePath'])
+        elif (arg == '--reset' and len(args) > 0):
+            options['resetPolicy'] = args.pop(0)
+        elif (arg == '--sample-interval' and len(args) > 0):
+            options['sampleInterval'] = float(args.pop(0))
+        elif (arg == '--no-pin'):
+            options['pin'] = False
+        else:
+            _usage(executable)
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
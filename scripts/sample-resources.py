@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+
+# Sample the resource usage of a run (and of Postgres) from /proc while it goes.
+# This is launched alongside PSL by the run scripts, and writes a time series to a compact binary file in the run's output dir.
+# parse-results.py pulls the peaks (and when they happened) out of the series.
+#
+# Every sample has the time (ms since sampling started) and then, for both the run and Postgres:
+# memory (bytes, see below), CPU time (user + system, ms), and bytes read from / written to storage.
+# Memory is not the sum of RSS, since every Postgres backend's RSS includes the pages of shared memory (shared_buffers) it has touched,
+# so shared memory would be counted once per backend. Instead there are two series:
+#  - pss - The proportional set size (from smaps_rollup), which splits every shared page between the processes that map it.
+#    Reading it needs the same permissions as ptrace, so it is -1 if any of the processes can not be read (e.g. Postgres when not running as its user or root).
+#  - private - The resident memory that is not shared (resident - shared from statm), which any user can read.
+#    This leaves out shared memory altogether (including shared_buffers).
+# The run is every process under the given pid (PSL's JVM, along with the shell and time processes around it).
+# Postgres is every postgres process (or, with --database, just the backends connected to that database).
+# Counters that could not be read (e.g. the I/O of processes owned by another user) are recorded as -1.
+# Sampling stops once the given pid exits (or the sampler is sent SIGTERM/SIGINT).
+#
+# The file is a header followed by fixed size records (all little endian):
+#   header: magic (4 bytes), version (uint16), interval (ms, uint32), number of fields (uint16),
+#           length of the field names (uint16), field names (comma separated ASCII).
+#   record: time (ms, uint32), one int64 per field.
+
+import os
+import signal
+import struct
+import sys
+import time
+
+DEFAULT_INTERVAL_SECONDS = 1.0
+
+MAGIC = b'CGRS'
+VERSION = 1
+
+FIELDS = [
+    'run_pss',
+    'run_private',
+    'run_cpu',
+    'run_read_bytes',
+    'run_write_bytes',
+    'postgres_pss',
+    'postgres_private',
+    'postgres_cpu',
+    'postgres_read_bytes',
+    'postgres_write_bytes',
+]
+
+HEADER_FORMAT = '<4sHIHH'
+RECORD_FORMAT = '<I' + ('q' * len(FIELDS))
+
+UNKNOWN = -1
+
+PROC_DIR = '/proc'
+POSTGRES_COMM = 'postgres'
+
+PSS_PREFIX = 'Pss:'
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+class Process:
+    def __init__(self, pid, comm, ppid, cpuTicks):
+        self.pid = pid
+        self.comm = comm
+        self.ppid = ppid
+        self.cpuTicks = cpuTicks
+
+# Read the status of every process.
+# {pid: process, ...}
+def readProcesses():
+    processes = {}
+
+    for name in os.listdir(PROC_DIR):
+        if (not name.isdigit()):
+            continue
+
+        try:
+            with open(os.path.join(PROC_DIR, name, 'stat'), 'r') as file:
+                stat = file.read()
+        except OSError:
+            # The process exited.
+            continue
+
+        # The command name is in parens (and may itself have spaces or parens in it).
+        commStart = stat.find('(')
+        commEnd = stat.rfind(')')
+        fields = stat[(commEnd + 2):].split()
+
+        # Fields (from `man proc`, counting from the state as 0): ppid (1), utime (11), stime (12).
+        processes[int(name)] = Process(int(name), stat[(commStart + 1):commEnd], int(fields[1]), int(fields[11]) + int(fields[12]))
+
+    return processes
+
+# Get the pid and all its descendants.
+def getTree(processes, rootPid):
+    children = {}
+    for process in processes.values():
+        children.setdefault(process.ppid, []).append(process.pid)
+
+    tree = []
+    pending = [rootPid]
+
+    while (len(pending) > 0):
+        pid = pending.pop()
+        if (pid in processes):
+            tree.append(pid)
+
+        pending += children.get(pid, [])
+
+    return tree
+
+def isDatabaseBackend(pid, database):
+    try:
+        with open(os.path.join(PROC_DIR, str(pid), 'cmdline'), 'rb') as file:
+            cmdline = file.read().decode(errors = 'replace')
+    except OSError:
+        return False
+
+    # Backends set their title to: "postgres: <user> <database> <client> <activity>".
+    parts = cmdline.replace('\0', ' ').split()
+    return len(parts) >= 3 and parts[0] == 'postgres:' and parts[2] == database
+
+# Returns the PSS (bytes) or None.
+def readPSS(pid):
+    try:
+        with open(os.path.join(PROC_DIR, str(pid), 'smaps_rollup'), 'r') as file:
+            for line in file:
+                if (line.startswith(PSS_PREFIX)):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return None
+
+# Returns the resident memory that is not shared (bytes) or None.
+def readPrivate(pid):
+    try:
+        with open(os.path.join(PROC_DIR, str(pid), 'statm'), 'r') as file:
+            fields = file.read().split()
+    except OSError:
+        return None
+
+    # Fields (in pages): size, resident, shared, ...
+    return (int(fields[1]) - int(fields[2])) * PAGE_SIZE
+
+# Returns (read bytes, written bytes) or None.
+def readIO(pid):
+    try:
+        with open(os.path.join(PROC_DIR, str(pid), 'io'), 'r') as file:
+            counters = dict([line.split(': ') for line in file.read().splitlines()])
+    except OSError:
+        return None
+
+    return int(counters['read_bytes']), int(counters['write_bytes'])
+
+# Returns [pss, private, cpu, read bytes, written bytes].
+def sumUsage(processes, pids):
+    pss = 0
+    private = None
+    cpuTicks = 0
+    readBytes = None
+    writeBytes = None
+
+    for pid in pids:
+        cpuTicks += processes[pid].cpuTicks
+
+        # A partial sum of PSS would look like a drop in memory, so it is all or nothing.
+        processPSS = readPSS(pid)
+        if (processPSS is None or pss is None):
+            pss = None
+        else:
+            pss += processPSS
+
+        processPrivate = readPrivate(pid)
+        if (processPrivate is not None):
+            private = (private or 0) + processPrivate
+
+        io = readIO(pid)
+        if (io is not None):
+            readBytes = (readBytes or 0) + io[0]
+            writeBytes = (writeBytes or 0) + io[1]
+
+    if (len(pids) == 0):
+        pss = None
+
+    usage = [pss, private, cpuTicks * 1000 // CLOCK_TICKS, readBytes, writeBytes]
+    return [UNKNOWN if value is None else value for value in usage]
+
+def sample(rootPid, database = None):
+    processes = readProcesses()
+
+    runPids = [pid for pid in getTree(processes, rootPid) if pid != os.getpid()]
+
+    postgresPids = [pid for pid in processes if processes[pid].comm == POSTGRES_COMM]
+    if (database is not None):
+        postgresPids = [pid for pid in postgresPids if isDatabaseBackend(pid, database)]
+
+    return sumUsage(processes, runPids) + sumUsage(processes, postgresPids)
+
+def writeHeader(file, intervalSeconds):
+    names = ','.join(FIELDS).encode()
+    file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, int(intervalSeconds * 1000), len(FIELDS), len(names)))
+    file.write(names)
+
+# Read a file written by this script.
+# Returns ([field, ...], [(time, value, ...), ...]).
+def readSamples(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    headerSize = struct.calcsize(HEADER_FORMAT)
+    if (len(data) < headerSize):
+        return [], []
+
+    magic, version, _, numFields, namesLength = struct.unpack_from(HEADER_FORMAT, data)
+    if (magic != MAGIC or version != VERSION):
+        raise ValueError("Not a resource sample file (or an unknown version): " + path)
+
+    fields = data[headerSize:(headerSize + namesLength)].decode().split(',')
+
+    recordFormat = '<I' + ('q' * numFields)
+    recordSize = struct.calcsize(recordFormat)
+
+    # The last record may be partial if the sampler was killed part way through writing it.
+    start = headerSize + namesLength
+    end = start + ((len(data) - start) // recordSize * recordSize)
+
+    return fields, list(struct.iter_unpack(recordFormat, data[start:end]))
+
+def main(outputPath, rootPid, intervalSeconds = DEFAULT_INTERVAL_SECONDS, database = None):
+    # Stop cleanly when the run is over.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    signal.signal(signal.SIGINT, lambda signum, frame: sys.exit(0))
+
+    startTime = time.monotonic()
+    sampleIndex = 0
+
+    with open(outputPath, 'wb') as file:
+        writeHeader(file, intervalSeconds)
+
+        while (os.path.exists(os.path.join(PROC_DIR, str(rootPid)))):
+            elapsed = int((time.monotonic() - startTime) * 1000)
+            file.write(struct.pack(RECORD_FORMAT, elapsed, *sample(rootPid, database)))
+
+            # Keep the file complete (up to the last sample) in case the sampler gets killed.
+            file.flush()
+
+            # Keep samples on the interval (skipping any that were missed because sampling took too long).
+            sampleIndex += 1
+            while (startTime + sampleIndex * intervalSeconds < time.monotonic()):
+                sampleIndex += 1
+
+            time.sleep(max(0.0, startTime + sampleIndex * intervalSeconds - time.monotonic()))
+
+def _usage(executable):
+    print("USAGE: python3 %s [--interval <seconds>] [--database <name>] <output path> <pid>" % (executable), file = sys.stderr)
+    print("    --interval - Seconds between samples. Default: %s." % (DEFAULT_INTERVAL_SECONDS), file = sys.stderr)
+    print("    --database - Only count the Postgres backends connected to this database (otherwise all Postgres processes are counted).", file = sys.stderr)
+    sys.exit(1)
+
+def _load_args(args):
+    executable = args.pop(0)
+    if ({'h', 'help'} & {arg.lower().strip().replace('-', '') for arg in args}):
+        _usage(executable)
+
+    options = {}
+
+    while (len(args) > 0 and args[0].startswith('--')):
+        arg = args.pop(0)
+
+        if (arg == '--interval' and len(args) > 0):
+            options['intervalSeconds'] = float(args.pop(0))
+            if (options['intervalSeconds'] <= 0):
+                raise ValueError("Interval must be positive, got: %f." % (options['intervalSeconds']))
+        elif (arg == '--database' and len(args) > 0):
+            options['database'] = args.pop(0)
+        else:
+            _usage(executable)
+
+    if (len(args) != 2):
+        _usage(executable)
+
+    options['outputPath'] = args.pop(0)
+    options['rootPid'] = int(args.pop(0))
+
+    return options
+
+if (__name__ == '__main__'):
+    main(**_load_args(sys.argv))
@@ -0,0 +1,23 @@
+'''
+Load another script in this directory as a module.
+The scripts have hyphenated names (e.g. parse-results.py), so they cannot be imported directly, ex:
+```
+import scriptloader
+parser = scriptloader.loadScript('parse-results')
+```
+'''
+
+import functools
+import importlib.util
+import os
+
+THIS_DIR = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+
+# Load |name|.py (from this directory) as a module.
+# Each script is only loaded once.
+@functools.lru_cache(maxsize = None)
+def loadScript(name):
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), os.path.join(THIS_DIR, name + '.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -7,194 +7,566 @@ const PADDING = 50;
 
 const COLOR_HOT = [255, 0, 0];
 const COLOR_COLD = [0, 0, 255];
-
-const GRADIENT_LOW = 'blue';
-const GRADIENT_HIGH = 'red';
-
-const OPTIMISTIC_QUERY_COST_MULTIPLIER = 0.018;
-const OPTIMISTIC_INSTANTIATION_COST_MULTIPLIER = 0.0010;
-const PESSIMISTIC_QUERY_COST_MULTIPLIER = 0.020;
-const PESSIMISTIC_INSTANTIATION_COST_MULTIPLIER = 0.0020;
+const NUM_COLORS = 256;
+
+const BACKGROUND_COLOR = '#ffffff';
+const NODE_STROKE_COLOR = '#cccccc';
+const NODE_STROKE_WIDTH = 2;
+const LINK_COLOR = '#cccccc';
+const LINK_WIDTH = 10;
+
+const LEGEND_WIDTH = 300;
+const LEGEND_HEIGHT = 20;
+const LEGEND_FONT = '13px sans-serif';
+
+// When the nodes of a level are closer together than this (in pixels),
+// runs of neighboring nodes (whole subtrees, since a level is in tree order) are drawn as a single block with the hottest cost in the run.
+const MIN_NODE_PIXELS = 3;
+
+// Links and node borders are only drawn once nodes are at least this big (in pixels).
+const MIN_DETAIL_PIXELS = 8;
+
+const ZOOM_SPEED = 0.002;
+const MAX_SCALE = 4;
+
+// The cost model used when there is no calibration for the example.
+const DEFAULT_COST_MODEL = {
+    'optimistic': {
+        'query_cost_multiplier': 0.018,
+        'instantiation_cost_multiplier': 0.0010,
+    },
+    'pessimistic': {
+        'query_cost_multiplier': 0.020,
+        'instantiation_cost_multiplier': 0.0020,
+    },
+};
+
+// Per-example cost models fit from measured runs (see scripts/calibrate-cost-model.py).
+const CALIBRATION_PATH = 'calibration.json';
 
 window.searchspace = window.searchspace || {};
 
+// The tree is drawn on a canvas, so search spaces with millions of nodes stay interactive:
+// only the nodes in view are drawn, and nodes too small to see are drawn aggregated with their neighbors.
+// Drag to pan, scroll to zoom, and double click to fit the whole tree back in view.
 function main() {
-    let maxWidth = parseMaxWidth();
+    let tree = buildTree(window.searchspace.data, window.searchspace.costModel);
+    window.searchspace.tree = tree;
+
+    let canvas = document.createElement('canvas');
+    document.querySelector('.tree-area').appendChild(canvas);
+
+    let state = {
+        'tree': tree,
+        'canvas': canvas,
+        'context': canvas.getContext('2d'),
+        'palette': buildPalette(),
+        'scale': 1,
+        'offsetX': 0,
+        'offsetY': 0,
+        'frameRequested': false,
+    };
+
+    resizeCanvas(state);
+    fitView(state);
+    addControls(state);
+
+    window.addEventListener('resize', function() {
+        resizeCanvas(state);
+        requestDraw(state);
+    });
+
+    requestDraw(state);
+}
+
+// Flatten the tree into arrays (in depth-first order) and lay it out.
+// Like the tree layout this replaces, every level (nodes with the same count) is spread evenly over the width of the widest level,
+// and each node is as deep as its depth in the tree.
+function buildTree(root, costModel) {
+    let parents = [];
+    let depths = [];
+    let counts = [];
+    let optimisticCosts = [];
+    let pessimisticCosts = [];
+    let firstChildren = [];
+    let lastChildren = [];
+
+    let range = [null, null];
+
+    // Iterative, so deep trees can not overflow the stack.
+    let nodeStack = [root];
+    let parentStack = [-1];
+    let depthStack = [0];
+
+    while (nodeStack.length > 0) {
+        let node = nodeStack.pop();
+        let parent = parentStack.pop();
+        let depth = depthStack.pop();
+
+        let id = parents.length;
+
+        parents.push(parent);
+        depths.push(depth);
+        counts.push(node.count);
+        firstChildren.push(-1);
+        lastChildren.push(-1);
+
+        let optimisticCost = estimateCost(node, costModel.optimistic);
+        let pessimisticCost = estimateCost(node, costModel.pessimistic);
+
+        optimisticCosts.push(optimisticCost);
+        pessimisticCosts.push(pessimisticCost);
+
+        if (range[0] == null || range[0] > optimisticCost) {
+            range[0] = optimisticCost;
+        }
+
+        if (range[1] == null || range[1] < pessimisticCost) {
+            range[1] = pessimisticCost;
+        }
+
+        if (parent != -1) {
+            if (firstChildren[parent] == -1) {
+                firstChildren[parent] = id;
+            }
+            lastChildren[parent] = id;
+        }
+
+        // Push the children in reverse, so they come off the stack in order.
+        let children = node.children || [];
+        for (let i = children.length - 1; i >= 0; i--) {
+            nodeStack.push(children[i]);
+            parentStack.push(id);
+            depthStack.push(depth + 1);
+        }
+    }
+
+    let numNodes = parents.length;
+
+    // {count: [id, ...], ...}
+    let levelIds = new Map();
+    for (let id = 0; id < numNodes; id++) {
+        if (!levelIds.has(counts[id])) {
+            levelIds.set(counts[id], []);
+        }
+        levelIds.get(counts[id]).push(id);
+    }
+
+    let maxWidth = 0;
+    levelIds.forEach(function(ids) {
+        maxWidth = Math.max(maxWidth, ids.length);
+    });
 
-    let height = window.searchspace.data.count * (LEVEL_HEIGHT + NODE_SIZE);
     let width = Math.trunc(maxWidth * (NODE_SIZE + NODE_MARGIN));
 
-    let tree = d3.layout.tree()
-        .size([height, width])
-    ;
+    let tree = {
+        'numNodes': numNodes,
+        'parents': Int32Array.from(parents),
+        'depths': Int32Array.from(depths),
+        'firstChildren': Int32Array.from(firstChildren),
+        'lastChildren': Int32Array.from(lastChildren),
+        'optimisticCosts': Float64Array.from(optimisticCosts),
+        'pessimisticCosts': Float64Array.from(pessimisticCosts),
+        'xs': new Float64Array(numNodes),
+        'levels': [],
+        'range': range,
+        'width': width,
+        'height': 0,
+    };
+
+    levelIds.forEach(function(ids) {
+        tree.levels.push(buildLevel(tree, Int32Array.from(ids)));
+    });
 
-    let dataNodes = parseNodes(tree);
-    let dataLinks = tree.links(dataNodes);
+    let maxDepth = 0;
+    for (let id = 0; id < numNodes; id++) {
+        maxDepth = Math.max(maxDepth, tree.depths[id]);
+    }
+    tree.height = maxDepth * LEVEL_HEIGHT;
 
-    window.searchspace.dataNodes = dataNodes;
+    return tree;
+}
 
-    let svg = d3.select(".tree-area").append("svg")
-        .attr("width", width + PADDING)
-        .attr("height", height + PADDING)
-        .append("g")
-        .attr("transform", `translate(${PADDING}, ${PADDING * 2})`)
-    ;
+// A level is its nodes (left to right), how far apart they are, and the hottest costs over runs of 2^k neighboring nodes.
+function buildLevel(tree, ids) {
+    let level = {
+        'ids': ids,
+        'spacing': tree.width / ids.length,
+        'minDepth': null,
+        'maxDepth': null,
+        // [[max cost of every run of 2^k nodes, ...], ...]
+        'optimisticPyramid': [new Float64Array(ids.length)],
+        'pessimisticPyramid': [new Float64Array(ids.length)],
+    };
 
-    let graphicalNodes = svg.selectAll("g.node")
-        .data(dataNodes, function(node) { return node.id; })
-    ;
+    for (let rank = 0; rank < ids.length; rank++) {
+        let id = ids[rank];
 
-    let displayNodes = graphicalNodes.enter()
-        .append("g")
-        .attr("class", "node")
-        .attr('data-id', function(node) { return node.id; })
-        .attr("transform", function(node) { return `translate(${node.x - (NODE_SIZE / 2)}, ${node.y - (NODE_SIZE / 2)})`; })
-    ;
+        tree.xs[id] = rank * level.spacing + (level.spacing / 2);
 
-    // Declare the links…
-    let graphicalLinks = svg.selectAll("path.link")
-        .data(dataLinks, function(link) { return link.target.id; })
-    ;
+        level.optimisticPyramid[0][rank] = tree.optimisticCosts[id];
+        level.pessimisticPyramid[0][rank] = tree.pessimisticCosts[id];
 
-    let diagonal = d3.svg.diagonal()
-        .projection(function(element) { return [element.x, element.y]; })
-    ;
+        if (level.minDepth == null || level.minDepth > tree.depths[id]) {
+            level.minDepth = tree.depths[id];
+        }
 
-    graphicalLinks.enter().insert("path", "g")
-        .attr("class", "link")
-        .attr("d", diagonal)
-    ;
+        if (level.maxDepth == null || level.maxDepth < tree.depths[id]) {
+            level.maxDepth = tree.depths[id];
+        }
+    }
 
-    // Establish the gradient legend.
+    buildPyramid(level.optimisticPyramid);
+    buildPyramid(level.pessimisticPyramid);
 
-    let defs = svg.append("defs");
+    return level;
+}
 
-    let linearGradient = defs.append("linearGradient")
-        .attr("id", "linear-gradient");
+function buildPyramid(pyramid) {
+    while (pyramid[pyramid.length - 1].length > 1) {
+        let below = pyramid[pyramid.length - 1];
+        let above = new Float64Array(Math.ceil(below.length / 2));
 
-    linearGradient
-        .attr("x1", "0%")
-        .attr("y1", "0%")
-        .attr("x2", "100%")
-        .attr("y2", "0%");
+        for (let i = 0; i < above.length; i++) {
+            above[i] = below[i * 2];
+            if (i * 2 + 1 < below.length) {
+                above[i] = Math.max(above[i], below[i * 2 + 1]);
+            }
+        }
 
-    linearGradient.append("stop")
-        .attr("offset", "0%")
-        .attr("stop-color", GRADIENT_LOW);
+        pyramid.push(above);
+    }
+}
 
-    linearGradient.append("stop")
-        .attr("offset", "100%")
-        .attr("stop-color", GRADIENT_HIGH);
+function estimateCost(node, multipliers) {
+    return node.count * (multipliers.query_cost_multiplier * node.cost + multipliers.instantiation_cost_multiplier * node.rows);
+}
 
-    svg.append("rect")
-        .attr("width", 300)
-        .attr("height", 20)
-        .style("fill", "url(#linear-gradient)");
+// Colors from cold to hot.
+function buildPalette() {
+    let palette = [];
 
-    let colorScale = d3.scale.linear()
-        .range([GRADIENT_LOW, GRADIENT_HIGH])
-        .domain(window.searchspace.range);
+    for (let i = 0; i < NUM_COLORS; i++) {
+        let weight = i / (NUM_COLORS - 1);
+        let color = COLOR_COLD.map(function(cold, channel) {
+            return Math.round(cold + (COLOR_HOT[channel] - cold) * weight);
+        });
 
-    // Color the nodes.
+        palette.push(`rgb(${color[0]}, ${color[1]}, ${color[2]})`);
+    }
 
-    displayNodes.append("rect")
-        .attr("y", 0)
-        .attr("width", NODE_SIZE)
-        .attr("height", NODE_SIZE / 2)
-        .style("fill", function(node) { return colorScale(node.pessimisticCost) })
-    ;
+    return palette;
+}
 
-    displayNodes.append("rect")
-        .attr("y", NODE_SIZE / 2)
-        .attr("width", NODE_SIZE)
-        .attr("height", NODE_SIZE / 2)
-        .style("fill", function(node) { return colorScale(node.optimisticCost) })
-    ;
+function getColor(state, cost) {
+    let range = state.tree.range;
+    if (range[1] <= range[0]) {
+        return state.palette[0];
+    }
+
+    let index = Math.round((cost - range[0]) / (range[1] - range[0]) * (NUM_COLORS - 1));
+    return state.palette[Math.max(0, Math.min(NUM_COLORS - 1, index))];
 }
 
-function parseNodes(tree) {
-    let levels = parseLevels();
+function resizeCanvas(state) {
+    let canvas = state.canvas;
+    let ratio = window.devicePixelRatio || 1;
 
-    let dataNodes = tree.nodes(window.searchspace.data);
+    state.width = canvas.parentElement.clientWidth;
+    state.height = Math.max(LEGEND_HEIGHT + PADDING * 2, window.innerHeight - canvas.getBoundingClientRect().top - PADDING);
 
-    window.searchspace.range = [null, null];
+    canvas.style.width = `${state.width}px`;
+    canvas.style.height = `${state.height}px`;
+    canvas.width = Math.round(state.width * ratio);
+    canvas.height = Math.round(state.height * ratio);
 
-    let id = 0;
-    dataNodes.forEach(function(node) {
-        node.y = node.depth * LEVEL_HEIGHT;
+    state.context.setTransform(ratio, 0, 0, ratio, 0, 0);
+}
 
-        node.name = node.index;
-        node.id = id++;
+// Fit the whole tree in view (below the legend).
+function fitView(state) {
+    let tree = state.tree;
 
-        node.optimisticCost =
-            node.count * (OPTIMISTIC_QUERY_COST_MULTIPLIER * node.cost + OPTIMISTIC_INSTANTIATION_COST_MULTIPLIER * node.rows);
-        node.pessimisticCost =
-            node.count * (PESSIMISTIC_QUERY_COST_MULTIPLIER * node.cost + PESSIMISTIC_INSTANTIATION_COST_MULTIPLIER * node.rows);
+    let treeWidth = tree.width;
+    let treeHeight = tree.height + NODE_SIZE;
 
-        if (window.searchspace.range[0] == null || window.searchspace.range[0] > node.optimisticCost) {
-            window.searchspace.range[0] = node.optimisticCost;
-        }
+    state.scale = Math.min(MAX_SCALE,
+            (state.width - PADDING * 2) / treeWidth,
+            (state.height - PADDING * 3) / treeHeight);
 
-        if (window.searchspace.range[1] == null || window.searchspace.range[1] < node.pessimisticCost) {
-            window.searchspace.range[1] = node.pessimisticCost;
+    state.offsetX = (state.width - treeWidth * state.scale) / 2;
+    state.offsetY = PADDING * 2 + (NODE_SIZE / 2) * state.scale;
+}
+
+function addControls(state) {
+    let canvas = state.canvas;
+    let drag = null;
+
+    canvas.addEventListener('mousedown', function(event) {
+        drag = {'x': event.clientX, 'y': event.clientY};
+    });
+
+    window.addEventListener('mousemove', function(event) {
+        if (drag == null) {
+            return;
         }
+
+        state.offsetX += event.clientX - drag.x;
+        state.offsetY += event.clientY - drag.y;
+        drag = {'x': event.clientX, 'y': event.clientY};
+
+        requestDraw(state);
     });
 
-    // Extra layout needs to be done for horizontal spacing.
-    dataNodes.sort(function(a, b) {
-        return a.x - b.x;
+    window.addEventListener('mouseup', function(event) {
+        drag = null;
     });
 
-    let maxWidth = parseMaxWidth(levels);
-    let width = Math.trunc(maxWidth * (NODE_SIZE + NODE_MARGIN));
+    // Zoom around the cursor.
+    canvas.addEventListener('wheel', function(event) {
+        event.preventDefault();
 
-    for (let count in levels) {
-        let widthPerNode = width / levels[count];
+        let bounds = canvas.getBoundingClientRect();
+        let x = event.clientX - bounds.left;
+        let y = event.clientY - bounds.top;
 
-        let i = 0;
-        dataNodes.forEach(function(dataNode) {
-            if (dataNode.count != count) {
-                return;
-            }
+        let scale = Math.min(MAX_SCALE, state.scale * Math.exp(-event.deltaY * ZOOM_SPEED));
+
+        state.offsetX = x - (x - state.offsetX) * (scale / state.scale);
+        state.offsetY = y - (y - state.offsetY) * (scale / state.scale);
+        state.scale = scale;
+
+        requestDraw(state);
+    }, {'passive': false});
+
+    canvas.addEventListener('dblclick', function(event) {
+        fitView(state);
+        requestDraw(state);
+    });
+}
+
+function requestDraw(state) {
+    if (state.frameRequested) {
+        return;
+    }
+
+    state.frameRequested = true;
+    window.requestAnimationFrame(function() {
+        state.frameRequested = false;
+        draw(state);
+    });
+}
+
+function draw(state) {
+    let context = state.context;
+
+    context.fillStyle = BACKGROUND_COLOR;
+    context.fillRect(0, 0, state.width, state.height);
+
+    context.save();
+    context.translate(state.offsetX, state.offsetY);
+    context.scale(state.scale, state.scale);
 
-            dataNode.x = Math.trunc(i * widthPerNode + (widthPerNode / 2));
-            i++;
+    // The part of the tree in view.
+    let view = {
+        'left': -state.offsetX / state.scale,
+        'right': (state.width - state.offsetX) / state.scale,
+        'top': -state.offsetY / state.scale,
+        'bottom': (state.height - state.offsetY) / state.scale,
+    };
+
+    let detailed = (NODE_SIZE * state.scale >= MIN_DETAIL_PIXELS);
+
+    let visibleLevels = [];
+    state.tree.levels.forEach(function(level) {
+        let top = level.minDepth * LEVEL_HEIGHT - (NODE_SIZE / 2);
+        let bottom = level.maxDepth * LEVEL_HEIGHT + (NODE_SIZE / 2);
+
+        if (bottom < view.top || top > view.bottom) {
+            return;
+        }
+
+        // The ranks of the nodes in view.
+        let first = Math.max(0, Math.ceil((view.left - (NODE_SIZE / 2)) / level.spacing - 0.5));
+        let last = Math.min(level.ids.length - 1, Math.floor((view.right + (NODE_SIZE / 2)) / level.spacing - 0.5));
+
+        if (first > last) {
+            return;
+        }
+
+        visibleLevels.push({'level': level, 'first': first, 'last': last});
+    });
+
+    if (detailed) {
+        visibleLevels.forEach(function(visible) {
+            if (visible.level.spacing * state.scale >= MIN_NODE_PIXELS) {
+                drawLinks(state, visible.level, visible.first, visible.last);
+            }
         });
     }
 
-    return dataNodes;
+    visibleLevels.forEach(function(visible) {
+        if (visible.level.spacing * state.scale >= MIN_NODE_PIXELS) {
+            drawNodes(state, visible.level, visible.first, visible.last, detailed);
+        } else {
+            drawAggregatedNodes(state, visible.level, visible.first, visible.last);
+        }
+    });
+
+    context.restore();
+
+    drawLegend(state);
 }
 
-function parseMaxWidth(levels) {
-    levels = levels || parseLevels();
+// Draw the links of the nodes in view: to their parent, and to their first and last child
+// (so the links of a node in view are drawn even when its children are out of view).
+function drawLinks(state, level, first, last) {
+    let context = state.context;
+    let tree = state.tree;
 
-    let maxWidth = 0;
-    for (let count in levels) {
-        if (levels[count] > maxWidth) {
-            maxWidth = levels[count];
+    context.beginPath();
+
+    for (let rank = first; rank <= last; rank++) {
+        let id = level.ids[rank];
+
+        if (tree.parents[id] != -1) {
+            addLink(context, tree, tree.parents[id], id);
+        }
+
+        if (tree.firstChildren[id] != -1) {
+            addLink(context, tree, id, tree.firstChildren[id]);
+            addLink(context, tree, id, tree.lastChildren[id]);
         }
     }
 
-    return maxWidth;
+    context.strokeStyle = LINK_COLOR;
+    context.lineWidth = LINK_WIDTH;
+    context.stroke();
 }
 
-function parseLevels() {
-    let levels = {};
-    parseLevelsHelper(levels, window.searchspace.data);
-    return levels;
+// A vertical diagonal (a cubic curve) from the parent to the child.
+function addLink(context, tree, parent, child) {
+    let sourceX = tree.xs[parent];
+    let sourceY = tree.depths[parent] * LEVEL_HEIGHT;
+    let targetX = tree.xs[child];
+    let targetY = tree.depths[child] * LEVEL_HEIGHT;
+    let middleY = (sourceY + targetY) / 2;
+
+    context.moveTo(sourceX, sourceY);
+    context.bezierCurveTo(sourceX, middleY, targetX, middleY, targetX, targetY);
 }
 
-function parseLevelsHelper(levels, node) {
-    if (!(node.count in levels)) {
-        levels[node.count] = 0;
+// Each node is split in two: the pessimistic cost on top, and the optimistic cost on the bottom.
+function drawNodes(state, level, first, last, detailed) {
+    let context = state.context;
+    let tree = state.tree;
+
+    for (let rank = first; rank <= last; rank++) {
+        let id = level.ids[rank];
+
+        let x = tree.xs[id] - (NODE_SIZE / 2);
+        let y = tree.depths[id] * LEVEL_HEIGHT - (NODE_SIZE / 2);
+
+        context.fillStyle = getColor(state, tree.pessimisticCosts[id]);
+        context.fillRect(x, y, NODE_SIZE, NODE_SIZE / 2);
+
+        context.fillStyle = getColor(state, tree.optimisticCosts[id]);
+        context.fillRect(x, y + (NODE_SIZE / 2), NODE_SIZE, NODE_SIZE / 2);
+
+        if (detailed) {
+            context.strokeStyle = NODE_STROKE_COLOR;
+            context.lineWidth = NODE_STROKE_WIDTH;
+            context.strokeRect(x, y, NODE_SIZE, NODE_SIZE / 2);
+            context.strokeRect(x, y + (NODE_SIZE / 2), NODE_SIZE, NODE_SIZE / 2);
+        }
     }
-    levels[node.count]++;
+}
+
+// Draw runs of neighboring nodes as single blocks (each at least MIN_NODE_PIXELS wide) with the hottest costs in the run.
+function drawAggregatedNodes(state, level, first, last) {
+    let context = state.context;
+    let tree = state.tree;
+
+    let pixelsPerNode = level.spacing * state.scale;
+    let power = Math.min(level.optimisticPyramid.length - 1, Math.ceil(Math.log2(MIN_NODE_PIXELS / pixelsPerNode)));
+    let runSize = Math.pow(2, power);
+
+    let optimisticCosts = level.optimisticPyramid[power];
+    let pessimisticCosts = level.pessimisticPyramid[power];
+
+    let firstRun = Math.floor(first / runSize);
+    let lastRun = Math.floor(last / runSize);
+
+    for (let run = firstRun; run <= lastRun; run++) {
+        let start = run * runSize;
+        let end = Math.min(level.ids.length, start + runSize);
+
+        let x = start * level.spacing;
+        let y = tree.depths[level.ids[start]] * LEVEL_HEIGHT - (NODE_SIZE / 2);
+        let width = (end - start) * level.spacing;
+
+        context.fillStyle = getColor(state, pessimisticCosts[run]);
+        context.fillRect(x, y, width, NODE_SIZE / 2);
+
+        context.fillStyle = getColor(state, optimisticCosts[run]);
+        context.fillRect(x, y + (NODE_SIZE / 2), width, NODE_SIZE / 2);
+    }
+}
+
+// The legend stays in the corner (it does not move with the tree).
+function drawLegend(state) {
+    let context = state.context;
+
+    let gradient = context.createLinearGradient(PADDING, 0, PADDING + LEGEND_WIDTH, 0);
+    gradient.addColorStop(0, state.palette[0]);
+    gradient.addColorStop(1, state.palette[NUM_COLORS - 1]);
+
+    context.fillStyle = gradient;
+    context.fillRect(PADDING, PADDING / 2, LEGEND_WIDTH, LEGEND_HEIGHT);
+
+    let range = state.tree.range;
+
+    context.fillStyle = '#000000';
+    context.font = LEGEND_FONT;
+    context.textBaseline = 'top';
+
+    context.textAlign = 'left';
+    context.fillText(formatCost(range[0]), PADDING, PADDING / 2 + LEGEND_HEIGHT + 4);
+
+    context.textAlign = 'right';
+    context.fillText(formatCost(range[1]), PADDING + LEGEND_WIDTH, PADDING / 2 + LEGEND_HEIGHT + 4);
+}
+
+function formatCost(cost) {
+    if (cost == null) {
+        return '';
+    }
+
+    return cost.toPrecision(4);
+}
+
+// Use the calibrated cost model of the example (if there is one).
+// The example comes from the data (window.searchspace.example) or the URL (?example=<name>).
+function loadCostModel(callback) {
+    window.searchspace.costModel = DEFAULT_COST_MODEL;
+
+    let example = window.searchspace.example || new URLSearchParams(window.location.search).get('example');
+    if (!example) {
+        callback();
+        return;
+    }
+
+    d3.json(CALIBRATION_PATH, function(error, calibration) {
+        if (error || !calibration.examples || !(example in calibration.examples)) {
+            console.warn(`No cost model calibration for '${example}', using the default cost model.`);
+        } else {
+            window.searchspace.costModel = calibration.examples[example];
+        }
 
-    node.children.forEach(function(child) {
-        parseLevelsHelper(levels, child);
+        callback();
     });
 }
 
 document.addEventListener("DOMContentLoaded", function(event) {
-    main();
+    loadCostModel(main);
 });